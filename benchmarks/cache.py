@@ -0,0 +1,100 @@
+"""Measure how much of the conjugation cost the cache removes in a simulated quiz.
+
+Run from the repository root:
+
+    python3 -m benchmarks.cache [-i vocab.json] [--engine jvc] [--maxsize 4096]
+"""
+
+import argparse
+import json
+import random
+import time
+
+import conjugator
+from conjugation_table import parse_word_type
+from inflection import (
+    AdjectiveType, AdjectiveInflection,
+    VerbType, VerbInflection
+)
+from benchmarks.verb_engine import SAMPLE_VERBS
+
+
+def quiz(
+    words: list[tuple[str, VerbType | AdjectiveType]], questions: int, seed: int
+) -> float:
+    """Conjugate `questions` random (word, inflection) pairs; return the elapsed
+    seconds.
+    """
+    rng = random.Random(seed)
+    start = time.perf_counter()
+    for _ in range(questions):
+        word, word_type = rng.choice(words)
+        if isinstance(word_type, VerbType):
+            conjugator.conjugate_verb(word, word_type, rng.choice(VerbInflection.all()))
+        else:
+            conjugator.conjugate_adjective(
+                word, word_type, rng.choice(AdjectiveInflection.all(word_type))
+            )
+    return time.perf_counter() - start
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(
+        description='Measure the conjugation cache in a simulated quiz.',
+        formatter_class=argparse.ArgumentDefaultsHelpFormatter
+    )
+    parser.add_argument(
+        '-i',
+        '--vocab-file',
+        help='take the words from this vocab JSON instead of a built-in sample',
+        type=str,
+        default=None,
+    )
+    parser.add_argument(
+        '-q',
+        '--questions',
+        help='how many questions to simulate',
+        type=int,
+        default=50_000,
+    )
+    parser.add_argument(
+        '--maxsize',
+        help='the maximum number of cached conjugations',
+        type=int,
+        default=4096,
+    )
+    parser.add_argument(
+        '--engine',
+        help='the verb engine to use',
+        choices=[engine.value for engine in conjugator.VerbEngine],
+        default=conjugator.VerbEngine.JVC.value,
+    )
+    parser.add_argument(
+        '--seed',
+        help='the seed for the random questions',
+        type=int,
+        default=0,
+    )
+    args = parser.parse_args()
+
+    words = list(SAMPLE_VERBS)
+    if args.vocab_file:
+        with open(args.vocab_file) as vocab_file:
+            words = [
+                (word['word'], parse_word_type(word['word'], word['type']))
+                for word in json.load(vocab_file)
+            ]
+
+    conjugator.set_verb_engine(conjugator.VerbEngine(args.engine))
+    uncached = quiz(words, args.questions, args.seed)
+    conjugator.enable_cache(args.maxsize)
+    cached = quiz(words, args.questions, args.seed)
+    stats = conjugator.cache_stats()
+
+    print(f'{len(words)} words, {args.questions} questions, {args.engine} engine')
+    print(f'uncached: {uncached:8.3f}s')
+    print(f'cached:   {cached:8.3f}s ({1 - cached / uncached:.0%} less)')
+    print(
+        f'hits: {stats.hits}  misses: {stats.misses}  evictions: {stats.evictions}'
+        + f'  hit rate: {stats.hit_rate:.1%}'
+    )
@@ -0,0 +1,205 @@
+"""Time how long kaeru-cli.py takes to start: the import time of each module it loads,
+from `python -X importtime`, and the wall-clock time until it prompts for the first
+answer. Save the results as JSON so that runs can be compared.
+
+Run from the repository root:
+
+    python3 -m benchmarks.cli_startup [-i vocab.json] [-o results.json] [-c base.json]
+
+Without a vocab file, a synthetic one of `--size` words is used. kaeru-cli.py is run
+in a temporary directory, so that the scores database isn't touched. With
+`--compare`, a time to first prompt or a total import time slower than in the baseline
+by more than `--threshold` is flagged as a regression, and the exit status is 1.
+"""
+
+import argparse
+import json
+import os
+import platform
+import subprocess
+import sys
+from sys import exit
+import tempfile
+import time
+
+from benchmarks.suite import compare
+from benchmarks.vocab_load import synthetic_words
+
+
+REPOSITORY_PATH = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+KAERU_CLI_PATH = os.path.join(REPOSITORY_PATH, 'kaeru-cli.py')
+
+PROMPT = b'your answer: '
+
+
+def import_times() -> dict[str, float]:
+    """Return the cumulative import time, in seconds, of every top-level import made
+    while loading kaeru-cli.py, the interpreter's own included, as reported by
+    `python -X importtime`.
+    """
+    result = subprocess.run(
+        [
+            sys.executable, '-X', 'importtime', '-c',
+            "import importlib; importlib.import_module('kaeru-cli')",
+        ],
+        cwd=REPOSITORY_PATH,
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+    times: dict[str, float] = {}
+    for line in result.stderr.splitlines():
+        if not line.startswith('import time:'):
+            continue
+        _, cumulative, name = line[len('import time:'):].split('|')
+        if not cumulative.strip().isdigit():
+            continue  # the header
+        # nested imports are indented further; their time is in their parent's
+        if not name.startswith('  '):
+            times[name.strip()] = int(cumulative) / 1e6
+    return times
+
+
+def seconds_to_first_prompt(vocab_path: str, directory: str) -> float:
+    """Return how many seconds kaeru-cli.py takes, from the given directory, to prompt
+    for the first answer.
+
+    Raise RuntimeError if it exits before prompting.
+    """
+    start = time.perf_counter()
+    process = subprocess.Popen(
+        [sys.executable, KAERU_CLI_PATH, '-i', vocab_path],
+        cwd=directory,
+        stdin=subprocess.PIPE,
+        stdout=subprocess.PIPE,
+        stderr=subprocess.DEVNULL,
+    )
+    assert process.stdout is not None
+    output = b''
+    try:
+        while not output.endswith(PROMPT):
+            chunk = process.stdout.read1(4096)
+            if not chunk:
+                raise RuntimeError(
+                    f'kaeru-cli.py exited with status {process.wait()}'
+                )
+            output += chunk
+        return time.perf_counter() - start
+    finally:
+        process.kill()
+        process.wait()
+
+
+def run_startup(vocab_path: str, directory: str, repeat: int) -> dict[str, float]:
+    """Return the best time to first prompt, the best total import time, and the best
+    import time of each top-level import, in seconds, by name.
+    """
+    results = {
+        'first_prompt': min(
+            seconds_to_first_prompt(vocab_path, directory) for _ in range(repeat)
+        ),
+    }
+    runs = [import_times() for _ in range(repeat)]
+    results['import[total]'] = min(sum(times.values()) for times in runs)
+    for name in runs[0]:
+        results[f'import[{name}]'] = min(times.get(name, 0.0) for times in runs)
+    return results
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(
+        description='Time the startup of kaeru-cli.py.',
+        formatter_class=argparse.ArgumentDefaultsHelpFormatter
+    )
+    parser.add_argument(
+        '-i',
+        '--vocab-file',
+        help='start with this vocab file instead of a synthetic one',
+        type=str,
+        default=None,
+    )
+    parser.add_argument(
+        '--size',
+        help='the number of words in the synthetic vocab file',
+        type=int,
+        default=1_000,
+    )
+    parser.add_argument(
+        '-o',
+        '--output',
+        help='where to save the results as JSON',
+        type=str,
+        default=None,
+    )
+    parser.add_argument(
+        '-c',
+        '--compare',
+        help='a results JSON from an earlier run to compare against',
+        type=str,
+        default=None,
+    )
+    parser.add_argument(
+        '-t',
+        '--threshold',
+        help='how much slower than the baseline counts as a regression',
+        type=float,
+        default=0.1,
+    )
+    parser.add_argument(
+        '-r',
+        '--repeat',
+        help='how many times to repeat each measurement; the best one is kept',
+        type=int,
+        default=10,
+    )
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as directory:
+        vocab_path = args.vocab_file and os.path.abspath(args.vocab_file)
+        if not vocab_path:
+            vocab_path = os.path.join(directory, 'vocab.json')
+            with open(vocab_path, 'w') as vocab_file:
+                json.dump(synthetic_words(args.size), vocab_file, ensure_ascii=False)
+        results = run_startup(vocab_path, directory, args.repeat)
+
+    baseline: dict[str, float] = {}
+    if args.compare:
+        with open(args.compare) as baseline_file:
+            baseline = json.load(baseline_file)['results']
+    # only the totals are checked; single modules are too noisy and come and go
+    regressions = compare(
+        {
+            name: seconds for name, seconds in results.items()
+            if name in ('first_prompt', 'import[total]')
+        },
+        baseline,
+        args.threshold,
+    )
+
+    for name, seconds in sorted(results.items(), key=lambda item: -item[1]):
+        line = f'{name:<40} {seconds * 1e3:9.2f} ms'
+        if name in baseline:
+            line += f'  {seconds / baseline[name] - 1:+7.1%}'
+        if name in regressions:
+            line += '  REGRESSION'
+        print(line)
+
+    if args.output:
+        with open(args.output, 'w') as output_file:
+            json.dump(
+                {
+                    'timestamp': time.strftime('%Y-%m-%dT%H:%M:%S%z'),
+                    'python': sys.version.split()[0],
+                    'platform': platform.platform(),
+                    'vocab_file': args.vocab_file,
+                    'size': None if args.vocab_file else args.size,
+                    'repeat': args.repeat,
+                    'results': results,
+                },
+                output_file,
+                indent=4,
+            )
+
+    if regressions:
+        print(f'{len(regressions)} regression(s) beyond {args.threshold:.0%}.')
+        exit(1)
@@ -0,0 +1,92 @@
+"""Show that the GUI's window is painted as soon after startup whatever the vocab size,
+while the time until the first question is asked grows with it.
+
+Run from the repository root:
+
+    python3 -m benchmarks.gui_startup [--sizes 1000 10000 100000] [-r 3]
+
+kaeru.py is started on synthetic JSON vocab files, in a temporary directory so that
+the scores database isn't touched, and its log is read for how long after startup it
+first painted its window and was ready to quiz. Qt's offscreen platform is used unless
+QT_QPA_PLATFORM is set.
+"""
+
+import argparse
+import json
+import os
+import re
+import subprocess
+import sys
+import tempfile
+
+from benchmarks.vocab_load import synthetic_words
+
+
+KAERU_PATH = os.path.join(os.path.dirname(os.path.dirname(__file__)), 'kaeru.py')
+
+_TIMING = re.compile(r'(first paint|ready to quiz) ([\d.]+)s after startup')
+
+
+def startup_seconds(vocab_path: str, directory: str) -> tuple[float, float]:
+    """Start kaeru.py on the given vocab file, from the given directory, and return
+    how many seconds after startup it first painted its window and was ready to quiz.
+
+    Raise RuntimeError if it exits before being ready.
+    """
+    process = subprocess.Popen(
+        [sys.executable, KAERU_PATH, '-i', vocab_path],
+        cwd=directory,
+        env={'QT_QPA_PLATFORM': 'offscreen', **os.environ},
+        stderr=subprocess.PIPE,
+        text=True,
+    )
+    timings: dict[str, float] = {}
+    try:
+        assert process.stderr is not None
+        for line in process.stderr:
+            match = _TIMING.search(line)
+            if match:
+                timings[match[1]] = float(match[2])
+            if len(timings) == 2:
+                break
+    finally:
+        process.terminate()
+        process.wait()
+    if len(timings) < 2:
+        raise RuntimeError(f'kaeru.py exited with status {process.returncode}')
+    return timings['first paint'], timings['ready to quiz']
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(
+        description='Time the GUI startup for growing vocab sizes.',
+        formatter_class=argparse.ArgumentDefaultsHelpFormatter
+    )
+    parser.add_argument(
+        '--sizes',
+        help='the vocab sizes to time',
+        type=int,
+        nargs='+',
+        default=[1_000, 10_000, 100_000],
+    )
+    parser.add_argument(
+        '-r',
+        '--repeat',
+        help='how many times to repeat each measurement; the best one is kept',
+        type=int,
+        default=3,
+    )
+    args = parser.parse_args()
+
+    print(f'{"words":>8} {"first paint":>12} {"ready to quiz":>14}')
+    with tempfile.TemporaryDirectory() as directory:
+        for size in args.sizes:
+            vocab_path = os.path.join(directory, f'vocab-{size}.json')
+            with open(vocab_path, 'w') as vocab_file:
+                json.dump(synthetic_words(size), vocab_file, ensure_ascii=False)
+            runs = [
+                startup_seconds(vocab_path, directory) for _ in range(args.repeat)
+            ]
+            first_paint = min(first_paint for first_paint, _ in runs)
+            ready = min(ready for _, ready in runs)
+            print(f'{size:>8,} {first_paint:>10.2f} s {ready:>12.2f} s')
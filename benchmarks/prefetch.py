@@ -0,0 +1,143 @@
+"""Compare how long moving on to the next question takes when it's made right then, as
+the GUI used to, and when it's taken from a prefetch buffer (see prefetch.py).
+
+Run from the repository root:
+
+    python3 -m benchmarks.prefetch [-i vocab.sqlite3] [-q 500] [--answer-ms 20]
+
+Questions are made like the GUI makes them from a SQLite vocab, which conjugates the
+word asked for every question: a frequency-weighted draw, then the word's answers and
+forms. Without a vocab file, a synthetic one of `--size` words is used. Answering
+takes `--answer-ms`, during which the buffer refills; like in the GUI, a question is
+made right away when the buffer is empty.
+"""
+
+import argparse
+from collections.abc import Callable
+import os
+import tempfile
+import time
+
+from benchmarks.vocab_load import synthetic_words
+from conjugation_table import ConjugationTable
+from deinflection import DeinflectionIndex
+from inflection import AdjectiveInflection, VerbInflection, VerbType
+from prefetch import Prefetcher
+import quiz_vocab
+import vocab
+
+
+def question_maker(
+    file_path: str
+) -> Callable[[], tuple[DeinflectionIndex, frozenset[str]]]:
+    """Return a function making a question from the given vocab file, as
+    kaeru.Kaeru.prepare_question() does.
+    """
+    quiz = quiz_vocab.prepare_quiz(quiz_vocab.read_quiz_words(file_path), 0.5)
+
+    def make() -> tuple[DeinflectionIndex, frozenset[str]]:
+        word_index = quiz.draw()
+        vocab_word = quiz.words[word_index]
+        table = quiz.table
+        index = quiz.index
+        if table is None or index is None:
+            table = ConjugationTable((vocab_word,))
+            index = DeinflectionIndex((vocab_word,), table)
+            word_index = 0
+        inflection: VerbInflection | AdjectiveInflection
+        if isinstance(vocab_word.type, VerbType):
+            inflection = VerbInflection.generate_random()
+        else:
+            inflection = AdjectiveInflection.generate_random(vocab_word.type)
+        return index, table.acceptable_answers(word_index, inflection)
+
+    return make
+
+
+def next_question_seconds(
+    take: Callable[[], object], questions: int, answer_seconds: float
+) -> list[float]:
+    """Return how long each of the given number of questions took to move on to,
+    answering each in the given time.
+    """
+    latencies = []
+    for _ in range(questions):
+        start = time.perf_counter()
+        take()
+        latencies.append(time.perf_counter() - start)
+        time.sleep(answer_seconds)
+    return latencies
+
+
+def formatted_latencies(name: str, latencies: list[float]) -> str:
+    """Return the median, 99th percentile and slowest of the given latencies."""
+    ordered = sorted(latencies)
+    median = ordered[len(ordered) // 2]
+    p99 = ordered[min(len(ordered) - 1, int(len(ordered) * 0.99))]
+    return (
+        f'{name:<10} {median * 1e6:>9.1f} µs {p99 * 1e6:>9.1f} µs'
+        + f' {ordered[-1] * 1e6:>9.1f} µs'
+    )
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(
+        description='Time moving on to the next question, with and without a buffer.',
+        formatter_class=argparse.ArgumentDefaultsHelpFormatter
+    )
+    parser.add_argument(
+        '-i',
+        '--vocab-file',
+        help='make the questions from this vocab file instead of a synthetic one',
+        type=str,
+        default=None,
+    )
+    parser.add_argument(
+        '--size',
+        help='the number of words in the synthetic SQLite vocab file',
+        type=int,
+        default=10_000,
+    )
+    parser.add_argument(
+        '-q',
+        '--questions',
+        help='how many questions to move on to',
+        type=int,
+        default=500,
+    )
+    parser.add_argument(
+        '--answer-ms',
+        help='how many milliseconds answering each question takes',
+        type=float,
+        default=20.0,
+    )
+    parser.add_argument(
+        '--capacity',
+        help='how many questions the buffer holds',
+        type=int,
+        default=4,
+    )
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as directory:
+        file_path = args.vocab_file
+        if not file_path:
+            file_path = os.path.join(directory, 'vocab.sqlite3')
+            vocab.write_sqlite_vocab(synthetic_words(args.size), file_path)
+        make = question_maker(file_path)
+
+        answer_seconds = args.answer_ms / 1e3
+        print(f'{"":<10} {"median":>12} {"p99":>12} {"slowest":>12}')
+        latencies = next_question_seconds(make, args.questions, answer_seconds)
+        print(formatted_latencies('made', latencies))
+
+        prefetcher = Prefetcher(make, args.capacity)
+        prefetcher.start()
+
+        def take() -> tuple[DeinflectionIndex, frozenset[str]]:
+            question = prefetcher.take_nowait()
+            return question if question is not None else make()
+
+        latencies = next_question_seconds(take, args.questions, answer_seconds)
+        print(formatted_latencies('prefetched', latencies))
+        print(f'buffer: {prefetcher.metrics().formatted()}')
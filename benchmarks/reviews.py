@@ -0,0 +1,108 @@
+"""Show that picking the next item due for review and rescheduling it cost the same
+whatever the number of reviews, and that starting a session only reads a page of them.
+
+Run from the repository root:
+
+    python3 -m benchmarks.reviews [--sizes 1000 10000 100000 300000] [-q 5000]
+
+Every size gets its own scores database in a temporary directory, with reviews due
+from a month ago to a month from now; the session then answers due items right or
+wrong at random, as fast as it can.
+"""
+
+import argparse
+import os
+import random
+import sqlite3
+import tempfile
+import time
+
+import dbapi
+from inflection import VerbInflection, VerbType
+import scheduling
+
+
+def write_reviews(connection: sqlite3.Connection, size: int, now: float) -> None:
+    """Store `size` reviews due from a month before to a month after the given time."""
+    dbapi.create_review_table_if_nexists(connection)
+    inflections = VerbInflection.all()
+    rng = random.Random(size)
+    dbapi.set_reviews(connection, (
+        (
+            f'{index}書く', f'{index}かく', VerbType.GODAN.value,
+            inflections[index % len(inflections)].id,
+            1, 1.0, scheduling.INITIAL_EASE,
+            now + rng.uniform(-30, 30) * scheduling.SECONDS_PER_DAY,
+        )
+        for index in range(size)
+    ))
+
+
+def time_session(
+    file_path: str, questions: int, now: float, seed: int
+) -> tuple[float, float, int]:
+    """Return how many seconds the first question took to pick, how many each of the
+    given number of questions took to pick and reschedule on average, and how many
+    were due.
+    """
+    rng = random.Random(seed)
+    connection = sqlite3.connect(file_path)
+    start = time.perf_counter()
+    scheduler = scheduling.Scheduler(connection)
+    item = scheduler.next_due(now)
+    first_seconds = time.perf_counter() - start
+
+    asked = 0
+    start = time.perf_counter()
+    while item is not None and asked < questions:
+        scheduler.review(item, rng.random() < 0.8, now)
+        asked += 1
+        item = scheduler.next_due(now)
+    scheduler.flush()
+    question_seconds = (time.perf_counter() - start) / max(asked, 1)
+    connection.close()
+    return first_seconds, question_seconds, asked
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(
+        description='Time spaced repetition reviews for growing numbers of reviews.',
+        formatter_class=argparse.ArgumentDefaultsHelpFormatter
+    )
+    parser.add_argument(
+        '--sizes',
+        help='the numbers of reviews to time',
+        type=int,
+        nargs='+',
+        default=[1_000, 10_000, 100_000, 300_000],
+    )
+    parser.add_argument(
+        '-q',
+        '--questions',
+        help='how many due items to answer in each session',
+        type=int,
+        default=5_000,
+    )
+    parser.add_argument(
+        '--seed',
+        help='the seed for the answers',
+        type=int,
+        default=0,
+    )
+    args = parser.parse_args()
+
+    now = time.time()
+    print(f'{"reviews":>8} {"first question":>15} {"per question":>14} {"asked":>7}')
+    with tempfile.TemporaryDirectory() as directory:
+        for size in args.sizes:
+            file_path = os.path.join(directory, f'scores-{size}.sqlite3')
+            with sqlite3.connect(file_path) as connection:
+                write_reviews(connection, size, now)
+            connection.close()
+            first_seconds, question_seconds, asked = time_session(
+                file_path, args.questions, now, args.seed
+            )
+            print(
+                f'{size:>8,} {first_seconds * 1e3:>12.2f} ms'
+                + f' {question_seconds * 1e6:>9.1f} µs/op {asked:>7,}'
+            )
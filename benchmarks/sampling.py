@@ -0,0 +1,137 @@
+"""Show that drawing a frequency-weighted word costs the same whatever the vocab size,
+from a list of ranks and from a SQLite vocab file.
+
+Run from the repository root:
+
+    python3 -m benchmarks.sampling [--sizes 200 1000 10000 100000] [-w 0.5]
+
+The SQLite vocab files are written to a temporary directory; their sampler is built
+from the bands of ranks (see sampling.BandSampler), so building it doesn't grow with
+the vocab size either.
+"""
+
+import argparse
+import os
+import random
+import tempfile
+import time
+import timeit
+
+import quiz_vocab
+from sampling import AliasSampler, Sampler, frequency_weights, vocab_sampler
+import vocab
+
+
+DRAWS_PER_ROUND = 100_000
+SQLITE_DRAWS_PER_ROUND = 10_000
+
+
+def time_draws(
+    sampler: Sampler, seed: int, repeat: int, draws: int = DRAWS_PER_ROUND
+) -> float:
+    """Return the best time, in seconds, of one draw from the given sampler."""
+    rng = random.Random(seed)
+
+    def draw_all() -> None:
+        for _ in range(draws):
+            sampler.draw(rng)
+
+    return min(timeit.repeat(draw_all, number=1, repeat=repeat)) / draws
+
+
+def time_uniform_draws(size: int, seed: int, repeat: int) -> float:
+    """Return the best time, in seconds, of one uniform random.randrange() draw, for
+    reference.
+    """
+    rng = random.Random(seed)
+
+    def draw_all() -> None:
+        for _ in range(DRAWS_PER_ROUND):
+            rng.randrange(size)
+
+    return min(timeit.repeat(draw_all, number=1, repeat=repeat)) / DRAWS_PER_ROUND
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(
+        description='Time frequency-weighted word draws for growing vocab sizes.',
+        formatter_class=argparse.ArgumentDefaultsHelpFormatter
+    )
+    parser.add_argument(
+        '--sizes',
+        help='the vocab sizes to time',
+        type=int,
+        nargs='+',
+        default=[200, 1_000, 10_000, 100_000],
+    )
+    parser.add_argument(
+        '-w',
+        '--frequency-weight',
+        help='the exponent of the weighting curve (see sampling.py)',
+        type=float,
+        default=0.5,
+    )
+    parser.add_argument(
+        '-r',
+        '--repeat',
+        help='how many times to repeat each measurement; the best one is kept',
+        type=int,
+        default=5,
+    )
+    parser.add_argument(
+        '--seed',
+        help='the seed for the frequency ranks and the draws',
+        type=int,
+        default=0,
+    )
+    args = parser.parse_args()
+
+    print(
+        f'{"words":>8} {"build":>10} {"weighted draw":>15} {"uniform draw":>14}'
+        + f' {"sqlite build":>13} {"sqlite draw":>14}'
+    )
+    with tempfile.TemporaryDirectory() as directory:
+        for size in args.sizes:
+            # sparse ranks, like the ones of the words kept out of the whole JPDB list
+            rng = random.Random(args.seed)
+            frequencies = sorted(rng.sample(range(1, size * 20), size))
+            weights = frequency_weights(frequencies, args.frequency_weight)
+
+            start = time.perf_counter()
+            sampler = AliasSampler(weights)
+            build_seconds = time.perf_counter() - start
+
+            draw_seconds = time_draws(sampler, args.seed, args.repeat)
+            uniform_seconds = time_uniform_draws(size, args.seed, args.repeat)
+
+            file_path = os.path.join(directory, f'vocab-{size}.sqlite3')
+            vocab.write_sqlite_vocab(
+                (
+                    {
+                        'word': f'{index}書く',
+                        'kana': None,
+                        'type': 'verb-godan',
+                        'frequency': frequency,
+                    }
+                    for index, frequency in enumerate(frequencies)
+                ),
+                file_path,
+            )
+            start = time.perf_counter()
+            sqlite_vocab = vocab.SQLiteVocab(file_path)
+            sqlite_sampler = vocab_sampler(
+                quiz_vocab.SQLiteWords(sqlite_vocab), args.frequency_weight
+            )
+            sqlite_build_seconds = time.perf_counter() - start
+            assert sqlite_sampler is not None
+            sqlite_draw_seconds = time_draws(
+                sqlite_sampler, args.seed, args.repeat, SQLITE_DRAWS_PER_ROUND
+            )
+            sqlite_vocab.close()
+            print(
+                f'{size:>8,} {build_seconds * 1e3:>7.2f} ms'
+                + f' {draw_seconds * 1e9:>9.0f} ns/op'
+                + f' {uniform_seconds * 1e9:>8.0f} ns/op'
+                + f' {sqlite_build_seconds * 1e3:>10.2f} ms'
+                + f' {sqlite_draw_seconds * 1e9:>8.0f} ns/op'
+            )
@@ -0,0 +1,291 @@
+"""Time the conjugation and question-generation hot paths with fixed seeds, and save the
+results as JSON so that runs can be compared.
+
+Run from the repository root:
+
+    python3 -m benchmarks.suite [-i vocab.json] [-o results.json] [-c baseline.json]
+
+With `--compare`, every benchmark that got slower than in the baseline by more than
+`--threshold` is flagged as a regression, and the exit status is 1.
+"""
+
+import argparse
+from collections.abc import Callable, Sequence
+import importlib
+import json
+import platform
+import random
+import sys
+from sys import exit
+import time
+import timeit
+from typing import Any
+
+import conjugator
+from conjugation_table import parse_word_type
+from inflection import (
+    AdjectiveType, AdjectiveInflection,
+    VerbType, VerbInflection
+)
+import quiz_vocab
+from vocab import VocabWord
+
+kaeru_cli = importlib.import_module('kaeru-cli')
+
+
+SAMPLE_WORDS = (
+    {'word': '書く', 'kana': 'かく', 'type': 'verb-godan'},
+    {'word': '話す', 'kana': 'はなす', 'type': 'verb-godan'},
+    {'word': '待つ', 'kana': 'まつ', 'type': 'verb-godan'},
+    {'word': '読む', 'kana': 'よむ', 'type': 'verb-godan'},
+    {'word': '分かる', 'kana': 'わかる', 'type': 'verb-godan'},
+    {'word': '行く', 'kana': 'いく', 'type': 'verb-godan'},
+    {'word': '食べる', 'kana': 'たべる', 'type': 'verb-ichidan'},
+    {'word': '考える', 'kana': 'かんがえる', 'type': 'verb-ichidan'},
+    {'word': '勉強する', 'kana': 'べんきょうする', 'type': 'verb-ichidan-irregular'},
+    {'word': '来る', 'kana': 'くる', 'type': 'verb-ichidan-irregular'},
+    {'word': '強い', 'kana': 'つよい', 'type': 'adjective-i'},
+    {'word': '新しい', 'kana': 'あたらしい', 'type': 'adjective-i'},
+    {'word': 'かっこいい', 'kana': None, 'type': 'adjective-i-yoi-ii'},
+    {'word': '良い', 'kana': 'よい', 'type': 'adjective-i-yoi-ii'},
+    {'word': '有名', 'kana': 'ゆうめい', 'type': 'adjective-na'},
+    {'word': '静か', 'kana': 'しずか', 'type': 'adjective-na'},
+)
+
+CALLS_PER_ROUND = 10_000
+
+
+def best_seconds_per_call(
+    function: Callable[[], Any], calls: int, repeat: int
+) -> float:
+    """Return the best time, in seconds, of one call out of `calls` to the given
+    function, over `repeat` rounds.
+    """
+    def run() -> None:
+        for _ in range(calls):
+            function()
+
+    return min(timeit.repeat(run, number=1, repeat=repeat)) / calls
+
+
+def conjugation_calls(
+    words: Sequence[dict[str, Any]],
+    word_type: VerbType | AdjectiveType,
+    seed: int,
+) -> list[tuple[str, VerbInflection | AdjectiveInflection]]:
+    """Return CALLS_PER_ROUND random (word, inflection) pairs of the given type."""
+    rng = random.Random(seed)
+    typed_words = [word['word'] for word in words if word['type'] == word_type.value]
+    if isinstance(word_type, VerbType):
+        inflections = VerbInflection.all()
+    else:
+        inflections = AdjectiveInflection.all(word_type)
+    return [
+        (rng.choice(typed_words), rng.choice(inflections))
+        for _ in range(CALLS_PER_ROUND)
+    ]
+
+
+def time_conjugation(
+    words: Sequence[dict[str, Any]],
+    word_type: VerbType | AdjectiveType,
+    seed: int,
+    repeat: int,
+) -> float:
+    """Return the best time, in seconds, of one conjugate_verb() or
+    conjugate_adjective() call for words of the given type.
+    """
+    calls = conjugation_calls(words, word_type, seed)
+    if isinstance(word_type, VerbType):
+        conjugate = conjugator.conjugate_verb
+    else:
+        conjugate = conjugator.conjugate_adjective
+
+    def conjugate_all() -> None:
+        for word, inflection in calls:
+            conjugate(word, word_type, inflection)
+
+    return min(timeit.repeat(conjugate_all, number=1, repeat=repeat)) / len(calls)
+
+
+def time_generate_random(
+    generate: Callable[[], Any], seed: int, repeat: int
+) -> float:
+    """Return the best time, in seconds, of one call to the given generate_random()."""
+    random.seed(seed)
+    return best_seconds_per_call(generate, CALLS_PER_ROUND, repeat)
+
+
+def time_question(quiz: quiz_vocab.QuizVocab, seed: int, repeat: int) -> float:
+    """Return the best time, in seconds, of asking one question in the CLI and grading
+    a correct answer to it.
+    """
+    def ask_and_grade() -> None:
+        question = kaeru_cli.random_question(quiz)
+        assert question.correct_answer in question.acceptable_answers
+
+    random.seed(seed)
+    return best_seconds_per_call(ask_and_grade, CALLS_PER_ROUND, repeat)
+
+
+def run_suite(
+    words: Sequence[dict[str, Any]], seed: int, repeat: int
+) -> dict[str, float]:
+    """Run every benchmark and return its best time per operation, in seconds, by
+    name.
+    """
+    present_types = {
+        parse_word_type(word['word'], word['type']) for word in words
+    }
+    results: dict[str, float] = {}
+    for verb_type in VerbType:
+        if verb_type in present_types:
+            results[f'conjugate_verb[{verb_type.value}]'] = time_conjugation(
+                words, verb_type, seed, repeat
+            )
+    for adjective_type in AdjectiveType:
+        if adjective_type in present_types:
+            results[f'conjugate_adjective[{adjective_type.value}]'] = (
+                time_conjugation(words, adjective_type, seed, repeat)
+            )
+
+    results['VerbInflection.generate_random'] = time_generate_random(
+        VerbInflection.generate_random, seed, repeat
+    )
+    for adjective_type in AdjectiveType:
+        results[f'AdjectiveInflection.generate_random[{adjective_type.value}]'] = (
+            time_generate_random(
+                lambda: AdjectiveInflection.generate_random(adjective_type),
+                seed,
+                repeat,
+            )
+        )
+
+    vocab_words = [VocabWord.from_dict(word_info) for word_info in words]
+    quiz = quiz_vocab.prepare_quiz(vocab_words, 0)
+    results['question'] = time_question(quiz, seed, repeat)
+    return results
+
+
+def compare(
+    results: dict[str, float], baseline: dict[str, float], threshold: float
+) -> list[str]:
+    """Return the names of the benchmarks that got slower than in the baseline by more
+    than `threshold` (e.g. 0.1 for 10%).
+
+    Benchmarks missing from either side are ignored.
+    """
+    return [
+        name for name, seconds in results.items()
+        if name in baseline and seconds > baseline[name] * (1 + threshold)
+    ]
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(
+        description='Time the conjugation and question-generation hot paths.',
+        formatter_class=argparse.ArgumentDefaultsHelpFormatter
+    )
+    parser.add_argument(
+        '-i',
+        '--vocab-file',
+        help='take the words from this vocab JSON instead of a built-in sample',
+        type=str,
+        default=None,
+    )
+    parser.add_argument(
+        '-o',
+        '--output',
+        help='where to save the results as JSON',
+        type=str,
+        default=None,
+    )
+    parser.add_argument(
+        '-c',
+        '--compare',
+        help='the results JSON of an earlier run to flag regressions against',
+        type=str,
+        default=None,
+    )
+    parser.add_argument(
+        '-t',
+        '--threshold',
+        help='how much slower than the baseline a benchmark may get (0.1 is 10%%)',
+        type=float,
+        default=0.1,
+    )
+    parser.add_argument(
+        '-r',
+        '--repeat',
+        help='how many times to repeat each measurement; the best one is kept',
+        type=int,
+        default=5,
+    )
+    parser.add_argument(
+        '--engine',
+        help='the verb engine to use',
+        choices=[engine.value for engine in conjugator.VerbEngine],
+        default=conjugator.VerbEngine.NATIVE.value,
+    )
+    parser.add_argument(
+        '--seed',
+        help='the seed for the random words and inflections',
+        type=int,
+        default=0,
+    )
+    args = parser.parse_args()
+
+    words: Sequence[dict[str, Any]] = SAMPLE_WORDS
+    if args.vocab_file:
+        with open(args.vocab_file) as vocab_file:
+            words = json.load(vocab_file)
+
+    conjugator.set_verb_engine(conjugator.VerbEngine(args.engine))
+    results = run_suite(words, args.seed, args.repeat)
+
+    baseline: dict[str, float] = {}
+    if args.compare:
+        with open(args.compare) as baseline_file:
+            baseline_run = json.load(baseline_file)
+        baseline = baseline_run['results']
+        for setting, value in (
+            ('engine', args.engine),
+            ('vocab_file', args.vocab_file),
+            ('seed', args.seed),
+        ):
+            if baseline_run.get(setting) != value:
+                print(
+                    f'warning: the baseline was run with {setting}'
+                    + f' {baseline_run.get(setting)!r}, not {value!r}.'
+                )
+    regressions = compare(results, baseline, args.threshold)
+
+    for name, seconds in results.items():
+        line = f'{name:<56} {seconds * 1e6:9.3f} µs/op  {1 / seconds:12,.0f} ops/s'
+        if name in baseline:
+            line += f'  {seconds / baseline[name] - 1:+7.1%}'
+        if name in regressions:
+            line += '  REGRESSION'
+        print(line)
+
+    if args.output:
+        with open(args.output, 'w') as output_file:
+            json.dump(
+                {
+                    'timestamp': time.strftime('%Y-%m-%dT%H:%M:%S%z'),
+                    'python': sys.version.split()[0],
+                    'platform': platform.platform(),
+                    'engine': args.engine,
+                    'vocab_file': args.vocab_file,
+                    'word_count': len(words),
+                    'seed': args.seed,
+                    'repeat': args.repeat,
+                    'results': results,
+                },
+                output_file,
+                indent=4,
+            )
+
+    if regressions:
+        print(f'{len(regressions)} regression(s) beyond {args.threshold:.0%}.')
+        exit(1)
@@ -0,0 +1,90 @@
+"""Compare the per-call cost of the native verb engine and japanese_verb_conjugator_v2.
+
+Run from the repository root:
+
+    python3 -m benchmarks.verb_engine [-i vocab.json]
+"""
+
+import argparse
+import json
+import timeit
+
+import conjugator
+from inflection import VerbType, VerbInflection
+
+
+SAMPLE_VERBS = (
+    ('書く', VerbType.GODAN),
+    ('話す', VerbType.GODAN),
+    ('待つ', VerbType.GODAN),
+    ('読む', VerbType.GODAN),
+    ('分かる', VerbType.GODAN),
+    ('行く', VerbType.GODAN),
+    ('食べる', VerbType.ICHIDAN),
+    ('考える', VerbType.ICHIDAN),
+    ('勉強する', VerbType.ICHIDAN_IRREGULAR),
+    ('来る', VerbType.ICHIDAN_IRREGULAR),
+)
+
+
+def time_per_call(
+    engine: conjugator.VerbEngine,
+    verbs: list[tuple[str, VerbType]],
+    inflections: list[VerbInflection],
+    repeat: int,
+) -> float:
+    """Return the best time, in seconds, of a single conjugate_verb() call."""
+    conjugator.set_verb_engine(engine)
+
+    def conjugate_all() -> None:
+        for verb, verb_type in verbs:
+            for inflection in inflections:
+                conjugator.conjugate_verb(verb, verb_type, inflection)
+
+    calls = len(verbs) * len(inflections)
+    return min(timeit.repeat(conjugate_all, number=1, repeat=repeat)) / calls
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(
+        description='Compare the native verb engine against jvc.',
+        formatter_class=argparse.ArgumentDefaultsHelpFormatter
+    )
+    parser.add_argument(
+        '-i',
+        '--vocab-file',
+        help='take the verbs from this vocab JSON instead of a built-in sample',
+        type=str,
+        default=None,
+    )
+    parser.add_argument(
+        '-r',
+        '--repeat',
+        help='how many times to repeat the measurement; the best one is kept',
+        type=int,
+        default=5,
+    )
+    args = parser.parse_args()
+
+    verbs = list(SAMPLE_VERBS)
+    if args.vocab_file:
+        with open(args.vocab_file) as vocab_file:
+            verbs = [
+                (word['word'], VerbType(word['type']))
+                for word in json.load(vocab_file) if word['type'].startswith('verb')
+            ]
+
+    inflections = [
+        VerbInflection.from_id(inflection_id)
+        for inflection_id in range(VerbInflection.COUNT)
+    ]
+
+    jvc_time = time_per_call(conjugator.VerbEngine.JVC, verbs, inflections, args.repeat)
+    native_time = time_per_call(
+        conjugator.VerbEngine.NATIVE, verbs, inflections, args.repeat
+    )
+
+    print(f'{len(verbs)} verbs × {len(inflections)} inflections')
+    print(f'jvc:     {jvc_time * 1e6:8.2f} µs/call')
+    print(f'native:  {native_time * 1e6:8.2f} µs/call')
+    print(f'speedup: {jvc_time / native_time:8.1f}×')
@@ -0,0 +1,182 @@
+"""Compare loading a vocab as word dicts with loading it as the records the quizzers
+use (see quiz_vocab.py): how long it takes, how much memory the words keep, and how
+long reading a word costs when asking a question.
+
+Run from the repository root:
+
+    python3 -m benchmarks.vocab_load [-i vocab.json] [--size 100000] [-r 5]
+
+Without a vocab file, a synthetic one of `--size` words is written to a temporary
+directory in every format.
+"""
+
+import argparse
+from collections.abc import Callable, Sequence
+import gc
+import json
+import os
+import random
+import tempfile
+import timeit
+import tracemalloc
+from typing import Any
+
+from benchmarks.suite import SAMPLE_WORDS
+from conjugation_table import parse_word_type
+import quiz_vocab
+import vocab
+
+
+READS_PER_ROUND = 100_000
+
+
+def synthetic_words(size: int) -> list[dict[str, Any]]:
+    """Return `size` distinct words, cycling through the types of SAMPLE_WORDS."""
+    words = []
+    for index in range(size):
+        word_info = SAMPLE_WORDS[index % len(SAMPLE_WORDS)]
+        kana_reading = word_info['kana']
+        words.append({
+            'word': f'{index}{word_info["word"]}',
+            'kana': f'{index}{kana_reading}' if kana_reading else None,
+            'type': word_info['type'],
+            'frequency': index + 1,
+        })
+    return words
+
+
+def write_vocab_files(words: Sequence[dict[str, Any]], directory: str) -> list[str]:
+    """Write the given words in every format to the given directory, and return the
+    paths of the files.
+    """
+    json_path = os.path.join(directory, 'vocab.json')
+    with open(json_path, 'w') as vocab_file:
+        json.dump(words, vocab_file, ensure_ascii=False)
+    binary_path = os.path.join(directory, 'vocab.bin')
+    with open(binary_path, 'wb') as vocab_file:
+        vocab.write_binary_vocab(words, vocab_file)
+    sqlite_path = os.path.join(directory, 'vocab.sqlite3')
+    vocab.write_sqlite_vocab(words, sqlite_path)
+    return [json_path, binary_path, sqlite_path]
+
+
+def load_dicts(file_path: str) -> Sequence[dict[str, Any]]:
+    """Return the words in the given vocab file as word dicts, all decoded, as the
+    quizzers used to keep them.
+    """
+    words = vocab.load_vocab(file_path)
+    return words if isinstance(words, vocab.SQLiteVocab) else list(words)
+
+
+def load_records(file_path: str) -> Sequence[vocab.VocabWord]:
+    """Return the words in the given vocab file as the quizzers load them."""
+    return quiz_vocab.quiz_words(vocab.load_vocab(file_path))
+
+
+def best_load_seconds(
+    load: Callable[[str], Sequence], file_path: str, repeat: int
+) -> float:
+    """Return the best time, in seconds, of loading the given vocab file."""
+    return min(timeit.repeat(lambda: load(file_path), number=1, repeat=repeat))
+
+
+def retained_bytes(load: Callable[[str], Sequence], file_path: str) -> int:
+    """Return how many bytes of memory the words loaded from the given vocab file keep
+    allocated.
+    """
+    gc.collect()
+    tracemalloc.start()
+    words = load(file_path)
+    gc.collect()
+    size, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    del words
+    return size
+
+
+def read_dict(word_info: dict[str, Any]) -> None:
+    """Read a word dict the way the quizzers used to for every question."""
+    word_info['kana']
+    parse_word_type(word_info['word'], word_info['type'])
+
+
+def read_record(vocab_word: vocab.VocabWord) -> None:
+    """Read a record the way the quizzers do for every question."""
+    vocab_word.word
+    vocab_word.kana
+    vocab_word.type
+
+
+def best_read_seconds(
+    read: Callable[[Any], None], words: Sequence, seed: int, repeat: int
+) -> float:
+    """Return the best time, in seconds, of reading one random word with the given
+    function.
+    """
+    rng = random.Random(seed)
+    drawn = [words[rng.randrange(len(words))] for _ in range(READS_PER_ROUND)]
+
+    def read_all() -> None:
+        for word in drawn:
+            read(word)
+
+    return min(timeit.repeat(read_all, number=1, repeat=repeat)) / READS_PER_ROUND
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(
+        description='Time and size vocab loading, as word dicts and as records.',
+        formatter_class=argparse.ArgumentDefaultsHelpFormatter
+    )
+    parser.add_argument(
+        '-i',
+        '--vocab-file',
+        help='measure this vocab file (in any format) instead of synthetic ones',
+        type=str,
+        default=None,
+    )
+    parser.add_argument(
+        '--size',
+        help='the number of words in the synthetic vocab files',
+        type=int,
+        default=100_000,
+    )
+    parser.add_argument(
+        '-r',
+        '--repeat',
+        help='how many times to repeat each measurement; the best one is kept',
+        type=int,
+        default=5,
+    )
+    parser.add_argument(
+        '--seed',
+        help='the seed for the words read',
+        type=int,
+        default=0,
+    )
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as directory:
+        if args.vocab_file:
+            file_paths = [args.vocab_file]
+        else:
+            file_paths = write_vocab_files(synthetic_words(args.size), directory)
+
+        print(
+            f'{"file":<16} {"words":>8} {"as":<8} {"load":>10} {"memory":>10}'
+            + f' {"read":>10}'
+        )
+        for file_path in file_paths:
+            for name, load, read in (
+                ('dicts', load_dicts, read_dict),
+                ('records', load_records, read_record),
+            ):
+                load_seconds = best_load_seconds(load, file_path, args.repeat)
+                memory = retained_bytes(load, file_path)
+                words = load(file_path)
+                read_seconds = best_read_seconds(read, words, args.seed, args.repeat)
+                print(
+                    f'{os.path.basename(file_path):<16} {len(words):>8,} {name:<8}'
+                    + f' {load_seconds * 1e3:>7.1f} ms {memory / 2**20:>6.1f} MiB'
+                    + f' {read_seconds * 1e9:>7.0f} ns'
+                )
@@ -0,0 +1,356 @@
+"""Precomputed answers for every word in a vocab, in every inflection it can be asked.
+
+Building the table conjugates the whole vocab once, at startup; afterwards, grading an
+answer is a constant-time lookup by word index and inflection.
+"""
+
+from array import array
+from collections.abc import Iterator, Sequence
+from itertools import accumulate
+import sys
+import time
+
+import conjugator
+from inflection import (
+    AdjectiveType, AdjectiveInflection,
+    VerbType, VerbInflection
+)
+from vocab import VocabWord
+
+
+# every word type maps to an inflection space: the inflections its words are asked in,
+# in the order their answers are stored
+_VERB_SPACE = 0
+_I_ADJECTIVE_SPACE = 1
+_NA_ADJECTIVE_SPACE = 2
+
+_SPACE_INFLECTIONS: tuple[tuple[VerbInflection | AdjectiveInflection, ...], ...] = (
+    VerbInflection.all(),
+    AdjectiveInflection.all(AdjectiveType.I),
+    AdjectiveInflection.all(AdjectiveType.NA),
+)
+
+
+def _columns(
+    inflections: tuple[VerbInflection | AdjectiveInflection, ...], inflection_count: int
+) -> tuple[int, ...]:
+    """Return the column of each inflection in a row of the given inflections, by
+    inflection id; -1 if it's not in the row.
+    """
+    columns = [-1] * inflection_count
+    for column, inflection in enumerate(inflections):
+        columns[inflection.id] = column
+    return tuple(columns)
+
+
+_SPACE_COLUMNS: tuple[tuple[int, ...], ...] = (
+    _columns(_SPACE_INFLECTIONS[_VERB_SPACE], VerbInflection.COUNT),
+    _columns(_SPACE_INFLECTIONS[_I_ADJECTIVE_SPACE], AdjectiveInflection.COUNT),
+    _columns(_SPACE_INFLECTIONS[_NA_ADJECTIVE_SPACE], AdjectiveInflection.COUNT),
+)
+
+_TYPE_SPACES: dict[VerbType | AdjectiveType, int] = {
+    VerbType.ICHIDAN: _VERB_SPACE,
+    VerbType.GODAN: _VERB_SPACE,
+    VerbType.ICHIDAN_IRREGULAR: _VERB_SPACE,
+    AdjectiveType.I: _I_ADJECTIVE_SPACE,
+    AdjectiveType.I_YOI_II: _I_ADJECTIVE_SPACE,
+    AdjectiveType.NA: _NA_ADJECTIVE_SPACE,
+}
+
+
+def parse_word_type(word: str, type_str: str) -> VerbType | AdjectiveType:
+    """Return the VerbType or AdjectiveType named by the given type string.
+
+    Raise ValueError if it's not a known type.
+    """
+    if type_str.startswith('verb'):
+        try:
+            return VerbType(type_str)
+        except ValueError:
+            raise ValueError(f'verb {word} of illegal type "{type_str}"') from None
+    if type_str.startswith('adjective'):
+        try:
+            return AdjectiveType(type_str)
+        except ValueError:
+            raise ValueError(
+                f'adjective {word} of illegal type "{type_str}"'
+            ) from None
+    raise ValueError(f'word {word} of illegal type "{type_str}"')
+
+
+def _conjugate_rows(
+    words: Sequence[tuple[str | None, VerbType | AdjectiveType]]
+) -> list[str]:
+    """Return each of the given words in every inflection of its type, word after word.
+
+    Words that are None get an empty string for each inflection instead.
+    """
+    # every answer is conjugated in 2 batches, one for verbs and one for adjectives,
+    # then put in its cell
+    verbs: list[str] = []
+    verb_types: list[VerbType] = []
+    verb_inflections: list[VerbInflection] = []
+    verb_cells: list[int] = []
+    adjectives: list[str] = []
+    adjective_types: list[AdjectiveType] = []
+    adjective_inflections: list[AdjectiveInflection] = []
+    adjective_cells: list[int] = []
+    cell_count = 0
+    for word, word_type in words:
+        inflections = _SPACE_INFLECTIONS[_TYPE_SPACES[word_type]]
+        cells = range(cell_count, cell_count + len(inflections))
+        cell_count += len(inflections)
+        if word is None:
+            continue
+
+        if isinstance(word_type, VerbType):
+            verbs.extend(word for _ in inflections)
+            verb_types.extend(word_type for _ in inflections)
+            verb_inflections.extend(inflections)
+            verb_cells.extend(cells)
+        else:
+            adjectives.extend(word for _ in inflections)
+            adjective_types.extend(word_type for _ in inflections)
+            adjective_inflections.extend(inflections)
+            adjective_cells.extend(cells)
+
+    answers = [''] * cell_count
+    conjugated_verbs = conjugator.conjugate_verbs_batch(
+        verbs, verb_types, verb_inflections
+    )
+    for cell, answer in zip(verb_cells, conjugated_verbs):
+        answers[cell] = answer
+    conjugated_adjectives = conjugator.conjugate_adjectives_batch(
+        adjectives, adjective_types, adjective_inflections
+    )
+    for cell, answer in zip(adjective_cells, conjugated_adjectives):
+        answers[cell] = answer
+    return answers
+
+
+class ConjugationTable:
+    """The correct answer for every (word, inflection) pair in a vocab, both as written
+    in the vocab and in its kana reading.
+
+    All answers are concatenated into a single string per spelling and located through
+    an array of offsets, so the table costs a few bytes per answer on top of the text
+    itself.
+    """
+    build_seconds: float
+    """How long it took to conjugate the whole vocab."""
+    reused_count: int
+    """How many words' answers were copied from a previous table."""
+
+    _pool: str
+    """Every answer, concatenated."""
+    _offsets: array
+    """Where each answer starts in the pool; one extra item marks the end."""
+    _kana_pool: str
+    """Every answer in its kana reading, concatenated. Words without a separate kana
+    reading have empty answers.
+    """
+    _kana_offsets: array
+    """Where each answer starts in the kana pool; one extra item marks the end."""
+    _row_starts: array
+    """The index of each word's first answer."""
+    _spaces: array
+    """The inflection space of each word."""
+
+    def __init__(
+        self,
+        words: Sequence[VocabWord],
+        previous: 'tuple[Sequence[VocabWord], ConjugationTable] | None' = None,
+    ):
+        """Conjugate every word, and its kana reading, in every inflection of its type.
+
+        Given a previous table and the words it was built from, the answers of the
+        words found there unchanged are copied rather than conjugated again.
+        """
+        start = time.perf_counter()
+
+        previous_rows: dict[tuple[str, str | None, VerbType | AdjectiveType], int] = {}
+        if previous is not None:
+            previous_words, previous_table = previous
+            previous_rows = {
+                (vocab_word.word, vocab_word.kana, vocab_word.type): word_index
+                for word_index, vocab_word in enumerate(previous_words)
+            }
+
+        row_starts = array('I')
+        spaces = array('B')
+        spellings: list[tuple[str, VerbType | AdjectiveType]] = []
+        readings: list[tuple[str | None, VerbType | AdjectiveType]] = []
+        # the index of each word in the previous words, or -1 to conjugate it
+        sources: list[int] = []
+        cell_count = 0
+        for vocab_word in words:
+            word = vocab_word.word
+            kana_reading = vocab_word.kana
+            word_type = vocab_word.type
+            space = _TYPE_SPACES[word_type]
+
+            row_starts.append(cell_count)
+            spaces.append(space)
+            cell_count += len(_SPACE_INFLECTIONS[space])
+            source = previous_rows.get((word, kana_reading, word_type), -1)
+            sources.append(source)
+            if source < 0:
+                spellings.append((word, word_type))
+                readings.append(
+                    (kana_reading if kana_reading != word else None, word_type)
+                )
+
+        answers = _conjugate_rows(spellings)
+        kana_answers = _conjugate_rows(readings)
+        self.reused_count = len(sources) - len(spellings)
+        if self.reused_count:
+            answers, kana_answers = previous_table._merged_rows(
+                spaces, sources, answers, kana_answers
+            )
+
+        self._pool = ''.join(answers)
+        self._offsets = array('I', [0])
+        self._offsets.extend(accumulate(map(len, answers)))
+
+        self._kana_pool = ''.join(kana_answers)
+        self._kana_offsets = array('I', [0])
+        self._kana_offsets.extend(accumulate(map(len, kana_answers)))
+
+        self._row_starts = row_starts
+        self._spaces = spaces
+        self.build_seconds = time.perf_counter() - start
+
+    def _merged_rows(
+        self,
+        spaces: array,
+        sources: list[int],
+        answers: list[str],
+        kana_answers: list[str],
+    ) -> tuple[list[str], list[str]]:
+        """Return the answers of the words in the given spaces, row after row: from
+        this table for the words with a source index, and from the given answers, in
+        order, for the others.
+        """
+        merged: list[str] = []
+        kana_merged: list[str] = []
+        position = 0
+        for space, source in zip(spaces, sources):
+            width = len(_SPACE_INFLECTIONS[space])
+            if source < 0:
+                merged += answers[position:position + width]
+                kana_merged += kana_answers[position:position + width]
+                position += width
+                continue
+
+            first_cell = self._row_starts[source]
+            for cell in range(first_cell, first_cell + width):
+                merged.append(self._pool[self._offsets[cell]:self._offsets[cell + 1]])
+                kana_merged.append(self._kana_pool[
+                    self._kana_offsets[cell]:self._kana_offsets[cell + 1]
+                ])
+        return merged, kana_merged
+
+    def __len__(self) -> int:
+        """Return the number of (word, inflection) pairs."""
+        return len(self._offsets) - 1
+
+    def inflections(
+        self, word_index: int
+    ) -> tuple[VerbInflection | AdjectiveInflection, ...]:
+        """Return every inflection the word at the given index in the vocab is asked in,
+        in the order its answers are stored.
+        """
+        return _SPACE_INFLECTIONS[self._spaces[word_index]]
+
+    def _cell(
+        self, word_index: int, inflection: VerbInflection | AdjectiveInflection
+    ) -> int:
+        """Return where the answer for the given word and inflection is stored.
+
+        Raise KeyError if the word is never asked in that inflection.
+        """
+        column = _SPACE_COLUMNS[self._spaces[word_index]][inflection.id]
+        if column < 0:
+            raise KeyError(inflection)
+        return self._row_starts[word_index] + column
+
+    def answer(
+        self, word_index: int, inflection: VerbInflection | AdjectiveInflection
+    ) -> str:
+        """Return the word at the given index in the vocab in the given conjugation.
+
+        Raise KeyError if the word is never asked in that inflection.
+        """
+        cell = self._cell(word_index, inflection)
+        return self._pool[self._offsets[cell]:self._offsets[cell + 1]]
+
+    def kana_answer(
+        self, word_index: int, inflection: VerbInflection | AdjectiveInflection
+    ) -> str | None:
+        """Return the kana reading of the word at the given index in the vocab in the
+        given conjugation, or None if the word has no separate kana reading.
+
+        Raise KeyError if the word is never asked in that inflection.
+        """
+        cell = self._cell(word_index, inflection)
+        kana_answer = self._kana_pool[
+            self._kana_offsets[cell]:self._kana_offsets[cell + 1]
+        ]
+        return kana_answer or None
+
+    def acceptable_answers(
+        self, word_index: int, inflection: VerbInflection | AdjectiveInflection
+    ) -> frozenset[str]:
+        """Return every correct answer for the word at the given index in the vocab in
+        the given conjugation: as written in the vocab, and in its kana reading.
+
+        Raise KeyError if the word is never asked in that inflection.
+        """
+        cell = self._cell(word_index, inflection)
+        answer = self._pool[self._offsets[cell]:self._offsets[cell + 1]]
+        kana_answer = self._kana_pool[
+            self._kana_offsets[cell]:self._kana_offsets[cell + 1]
+        ]
+        if not kana_answer:
+            return frozenset((answer,))
+        return frozenset((answer, kana_answer))
+
+    def items(
+        self
+    ) -> Iterator[tuple[int, VerbInflection | AdjectiveInflection, str]]:
+        """Yield the word index, inflection and answer of every stored answer, in
+        order; answers in kana come right after the ones they're the reading of.
+        """
+        for word_index, (row_start, space) in enumerate(
+            zip(self._row_starts, self._spaces)
+        ):
+            for column, inflection in enumerate(_SPACE_INFLECTIONS[space]):
+                cell = row_start + column
+                yield (
+                    word_index,
+                    inflection,
+                    self._pool[self._offsets[cell]:self._offsets[cell + 1]],
+                )
+                kana_answer = self._kana_pool[
+                    self._kana_offsets[cell]:self._kana_offsets[cell + 1]
+                ]
+                if kana_answer:
+                    yield (word_index, inflection, kana_answer)
+
+    @property
+    def nbytes(self) -> int:
+        """Return roughly how many bytes of memory the table takes up."""
+        return (
+            sys.getsizeof(self._pool)
+            + sys.getsizeof(self._kana_pool)
+            + sum(
+                column.itemsize * len(column)
+                for column in (
+                    self._offsets,
+                    self._kana_offsets,
+                    self._row_starts,
+                    self._spaces,
+                )
+            )
+        )
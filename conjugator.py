@@ -1,4 +1,7 @@
-import japanese_verb_conjugator_v2 as jvc
+from collections import OrderedDict
+from collections.abc import Callable, Hashable, Sequence
+from enum import Enum
+from typing import NamedTuple
 
 from inflection import (
     AdjectiveType, AdjectiveInflection,
@@ -76,10 +79,122 @@ def _conjugate_na_adjective(
     return conjugated
 
 
+# -- cache --
+#
+# opt-in memoisation of conjugate_adjective() and conjugate_verb(). the batch functions
+# don't go through it, as they're meant for lists where most pairs only appear once
+
+class CacheStats(NamedTuple):
+    """Counters of the conjugation cache since it was enabled."""
+    hits: int
+    """Conjugations returned from the cache."""
+    misses: int
+    """Conjugations that had to be computed."""
+    evictions: int
+    """Conjugations dropped to stay within the size limit."""
+    size: int
+    """Conjugations currently stored."""
+    maxsize: int
+    """The maximum number of conjugations stored."""
+
+    @property
+    def hit_rate(self) -> float:
+        """Return the fraction of lookups answered from the cache."""
+        lookups = self.hits + self.misses
+        return self.hits / lookups if lookups else 0.0
+
+
+class _ConjugationCache:
+    """A least-recently-used mapping of (word, type, inflection) to conjugations."""
+    maxsize: int
+    hits: int
+    misses: int
+    evictions: int
+    _entries: OrderedDict[tuple, str]
+
+    def __init__(self, maxsize: int):
+        if maxsize < 1:
+            raise ValueError('maxsize must be at least 1')
+        self.maxsize = maxsize
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self._entries = OrderedDict()
+
+    def get(self, key: tuple) -> str | None:
+        """Return the stored conjugation for the given key, or None if there's none."""
+        conjugated = self._entries.get(key)
+        if conjugated is None:
+            self.misses += 1
+            return None
+        self.hits += 1
+        self._entries.move_to_end(key)
+        return conjugated
+
+    def put(self, key: tuple, conjugated: str) -> None:
+        """Store the given conjugation, evicting the least recently used one if the
+        cache is full.
+        """
+        self._entries[key] = conjugated
+        if len(self._entries) > self.maxsize:
+            self._entries.popitem(last=False)
+            self.evictions += 1
+
+    def clear(self) -> None:
+        """Drop every stored conjugation, keeping the counters."""
+        self._entries.clear()
+
+
+_cache: _ConjugationCache | None = None
+
+
+def enable_cache(maxsize: int = 4096) -> None:
+    """Memoise up to `maxsize` conjugations, evicting the least recently used ones.
+
+    If the cache is already enabled, it's replaced by an empty one.
+    """
+    global _cache
+    _cache = _ConjugationCache(maxsize)
+
+def disable_cache() -> None:
+    """Stop memoising conjugations, dropping the ones stored."""
+    global _cache
+    _cache = None
+
+def cache_stats() -> CacheStats | None:
+    """Return the cache counters, or None if the cache is disabled."""
+    if _cache is None:
+        return None
+    return CacheStats(
+        hits=_cache.hits,
+        misses=_cache.misses,
+        evictions=_cache.evictions,
+        size=len(_cache._entries),
+        maxsize=_cache.maxsize,
+    )
+
+
 def conjugate_adjective(
     word: str, adjective_type: AdjectiveType, inflection: AdjectiveInflection
 ) -> str:
     """Return the given adjective of the given type in the given conjugation."""
+    if _cache is None:
+        return _conjugate_adjective(word, adjective_type, inflection)
+
+    key = (word, adjective_type, inflection)
+    conjugated = _cache.get(key)
+    if conjugated is None:
+        conjugated = _conjugate_adjective(word, adjective_type, inflection)
+        _cache.put(key, conjugated)
+    return conjugated
+
+
+def _conjugate_adjective(
+    word: str, adjective_type: AdjectiveType, inflection: AdjectiveInflection
+) -> str:
+    """Return the given adjective of the given type in the given conjugation, without
+    going through the cache.
+    """
     if adjective_type is AdjectiveType.I:
         return _conjugate_i_adjective(word, inflection)
 
@@ -92,12 +207,205 @@ def conjugate_adjective(
     raise ValueError("adjective_type doesn't refer to an adjective")
 
 
-def conjugate_verb(
+def _adjective_conjugation_function(
+    adjective_type: AdjectiveType
+) -> Callable[[str, AdjectiveInflection], str]:
+    """Return the function that conjugates adjectives of the given type."""
+    if adjective_type is AdjectiveType.I:
+        return _conjugate_i_adjective
+
+    if adjective_type is AdjectiveType.I_YOI_II:
+        return _conjugate_i_yoi_ii_adjective
+
+    if adjective_type is AdjectiveType.NA:
+        return _conjugate_na_adjective
+
+    raise ValueError("adjective_type doesn't refer to an adjective")
+
+
+def _indices_by_type(types: Sequence[Hashable]) -> dict[Hashable, list[int]]:
+    """Return the indices of the given types, grouped by type."""
+    indices: dict[Hashable, list[int]] = {}
+    for index, word_type in enumerate(types):
+        indices.setdefault(word_type, []).append(index)
+    return indices
+
+
+def conjugate_adjectives_batch(
+    words: Sequence[str],
+    adjective_types: Sequence[AdjectiveType],
+    inflections: Sequence[AdjectiveInflection],
+) -> list[str]:
+    """Return each of the given adjectives of the matching type in the matching
+    conjugation.
+
+    The sequences are parallel: the adjective at index `i` has the type at index `i`
+    and is conjugated to the inflection at index `i`. Adjectives are conjugated in
+    groups of the same type, so the type is only dispatched once per group.
+    """
+    if not len(words) == len(adjective_types) == len(inflections):
+        raise ValueError('words, adjective_types and inflections differ in length')
+
+    conjugated = [''] * len(words)
+    for adjective_type, indices in _indices_by_type(adjective_types).items():
+        conjugate = _adjective_conjugation_function(adjective_type)
+        for index in indices:
+            conjugated[index] = conjugate(words[index], inflections[index])
+    return conjugated
+
+
+class VerbEngine(Enum):
+    """An implementation of verb conjugation used by conjugate_verb()."""
+    NATIVE = 'native'
+    """The suffix tables in this module; the default."""
+    JVC = 'jvc'
+    """japanese_verb_conjugator_v2."""
+
+
+_verb_engine = VerbEngine.NATIVE
+
+
+def get_verb_engine() -> VerbEngine:
+    """Return the engine used by conjugate_verb()."""
+    return _verb_engine
+
+def set_verb_engine(engine: VerbEngine) -> None:
+    """Make conjugate_verb() use the given engine.
+
+    If the cache is enabled, it's emptied, so every verb is conjugated by the new
+    engine; its counters (see cache_stats()) keep counting from where they were.
+    """
+    global _verb_engine
+    _verb_engine = engine
+    if _cache is not None:
+        _cache.clear()
+
+
+# -- native verb engine --
+#
+# a verb is conjugated by replacing its ending (the last kana, or the last 2 for
+# irregular verbs) with a suffix looked up by the ending and the inflection's id. the
+# results match japanese_verb_conjugator_v2's for every inflection in VerbInflection's
+# space, quirks included: 有る is conjugated like a regular godan verb, and so are
+# compounds of 行く such as 出て行く
+
+def _verb_suffixes(
+    dictionary: str,
+    negative_stem: str,
+    polite_stem: str,
+    te: str,
+    ta: str,
+) -> tuple[str, ...]:
+    """Return the suffix for every verb inflection, by inflection id, given the
+    suffixes of the dictionary form, the negative (ない) stem, the polite (ます) stem,
+    and the て and た forms.
+    """
+    BaseForm = VerbInflection.BaseForm
+    Tense = VerbInflection.Tense
+    Polarity = VerbInflection.Polarity
+    suffixes = {
+        (BaseForm.PLAIN, Tense.NONPAST, Polarity.POSITIVE): dictionary,
+        (BaseForm.PLAIN, Tense.NONPAST, Polarity.NEGATIVE): negative_stem + 'ない',
+        (BaseForm.PLAIN, Tense.PAST, Polarity.POSITIVE): ta,
+        (BaseForm.PLAIN, Tense.PAST, Polarity.NEGATIVE): negative_stem + 'なかった',
+        (BaseForm.POLITE, Tense.NONPAST, Polarity.POSITIVE): polite_stem + 'ます',
+        (BaseForm.POLITE, Tense.NONPAST, Polarity.NEGATIVE): polite_stem + 'ません',
+        (BaseForm.POLITE, Tense.PAST, Polarity.POSITIVE): polite_stem + 'ました',
+        (BaseForm.POLITE, Tense.PAST, Polarity.NEGATIVE):
+            polite_stem + 'ませんでした',
+        (BaseForm.TE, None, Polarity.POSITIVE): te,
+        (BaseForm.TE, None, Polarity.NEGATIVE): negative_stem + 'なくて',
+    }
+    return tuple(
+        suffixes[(inflection.base_form, inflection.tense, inflection.polarity)]
+        for inflection in map(VerbInflection.from_id, range(VerbInflection.COUNT))
+    )
+
+
+_GODAN_SUFFIXES: dict[str, tuple[str, ...]] = {
+    ending: _verb_suffixes(ending, a_kana, i_kana, te, ta)
+    for ending, a_kana, i_kana, te, ta in (
+        ('う', 'わ', 'い', 'って', 'った'),
+        ('く', 'か', 'き', 'いて', 'いた'),
+        ('ぐ', 'が', 'ぎ', 'いで', 'いだ'),
+        ('す', 'さ', 'し', 'して', 'した'),
+        ('つ', 'た', 'ち', 'って', 'った'),
+        ('ぬ', 'な', 'に', 'んで', 'んだ'),
+        ('ぶ', 'ば', 'び', 'んで', 'んだ'),
+        ('む', 'ま', 'み', 'んで', 'んだ'),
+        ('る', 'ら', 'り', 'って', 'った'),
+    )
+}
+
+_ICHIDAN_SUFFIXES: tuple[str, ...] = _verb_suffixes('る', '', '', 'て', 'た')
+
+_ICHIDAN_IRREGULAR_SUFFIXES: dict[str, tuple[str, ...]] = {
+    'する': _verb_suffixes('する', 'し', 'し', 'して', 'した'),
+    'くる': _verb_suffixes('くる', 'こ', 'き', 'きて', 'きた'),
+    '来る': _verb_suffixes('来る', '来', '来', '来て', '来た'),
+}
+
+_GODAN_EXCEPTIONS: dict[str, tuple[str, ...]] = {
+    # ある's negative forms drop the verb entirely: ない, なかった, なくて
+    'ある': _verb_suffixes('ある', '', 'あり', 'あって', 'あった'),
+    # 行く is conjugated like a godan verb ending in つ or る in the て and た forms
+    '行く': _verb_suffixes('行く', '行か', '行き', '行って', '行った'),
+    'いく': _verb_suffixes('いく', 'いか', 'いき', 'いって', 'いった'),
+    # honorific verbs: なさいます, not なさります
+    **{
+        verb: _verb_suffixes(verb, verb[:-1] + 'ら', verb[:-1] + 'い',
+                             verb[:-1] + 'って', verb[:-1] + 'った')
+        for verb in (
+            'なさる', '為さる', 'くださる', '下さる', 'いらっしゃる', 'おっしゃる',
+            '仰る', '仰有る', 'ござる', 'ご座る', '御座る',
+        )
+    },
+}
+
+_VERB_ENDINGS = frozenset(_GODAN_SUFFIXES)
+"""The kana a verb can end in."""
+
+
+def _conjugate_godan_verb(verb: str, inflection: VerbInflection) -> str:
+    """Return the given godan verb in the given conjugation."""
+    exception = _GODAN_EXCEPTIONS.get(verb)
+    if exception is not None:
+        return exception[inflection.id]
+
+    if len(verb) < 2 or verb[-1] not in _VERB_ENDINGS:
+        raise ValueError(f'{verb} is not a godan verb')
+    return verb[:-1] + _GODAN_SUFFIXES[verb[-1]][inflection.id]
+
+def _conjugate_ichidan_verb(verb: str, inflection: VerbInflection) -> str:
+    """Return the given ichidan verb in the given conjugation."""
+    if len(verb) < 2 or not verb.endswith('る'):
+        raise ValueError(f'{verb} is not an ichidan verb')
+    return verb[:-1] + _ICHIDAN_SUFFIXES[inflection.id]
+
+def _conjugate_ichidan_irregular_verb(
+    verb: str, inflection: VerbInflection
+) -> str:
+    """Return the given irregular verb (ending in する, くる or 来る) in the given
+    conjugation.
+    """
+    try:
+        suffixes = _ICHIDAN_IRREGULAR_SUFFIXES[verb[-2:]]
+    except KeyError:
+        raise ValueError(f'{verb} is not an irregular verb') from None
+    return verb[:-2] + suffixes[inflection.id]
+
+
+def _conjugate_verb_with_jvc(
     verb: str,
     verb_type: VerbType,
     verb_inflection: VerbInflection,
 ) -> str:
-    """Return the given verb of the given type in the given conjugation."""
+    """Return the given verb of the given type in the given conjugation, using
+    japanese_verb_conjugator_v2.
+    """
+    # only imported once this engine is used; the native one is the default
+    import japanese_verb_conjugator_v2 as jvc
+
     verb_class = None
     if verb_type is VerbType.GODAN:
         verb_class = jvc.VerbClass.GODAN
@@ -115,3 +423,94 @@ def conjugate_verb(
     )
 
     return conjugated
+
+
+def conjugate_verb(
+    verb: str,
+    verb_type: VerbType,
+    verb_inflection: VerbInflection,
+) -> str:
+    """Return the given verb of the given type in the given conjugation.
+
+    The conjugation is done by the engine set with set_verb_engine().
+    """
+    if _cache is None:
+        return _conjugate_verb(verb, verb_type, verb_inflection)
+
+    key = (verb, verb_type, verb_inflection)
+    conjugated = _cache.get(key)
+    if conjugated is None:
+        conjugated = _conjugate_verb(verb, verb_type, verb_inflection)
+        _cache.put(key, conjugated)
+    return conjugated
+
+
+def _conjugate_verb(
+    verb: str,
+    verb_type: VerbType,
+    verb_inflection: VerbInflection,
+) -> str:
+    """Return the given verb of the given type in the given conjugation, without going
+    through the cache.
+    """
+    if _verb_engine is VerbEngine.JVC:
+        return _conjugate_verb_with_jvc(verb, verb_type, verb_inflection)
+
+    if verb_type is VerbType.GODAN:
+        return _conjugate_godan_verb(verb, verb_inflection)
+
+    if verb_type is VerbType.ICHIDAN:
+        return _conjugate_ichidan_verb(verb, verb_inflection)
+
+    if verb_type is VerbType.ICHIDAN_IRREGULAR:
+        return _conjugate_ichidan_irregular_verb(verb, verb_inflection)
+
+    raise ValueError("verb_type doesn't refer to a verb")
+
+
+def _verb_conjugation_function(
+    verb_type: VerbType
+) -> Callable[[str, VerbInflection], str]:
+    """Return the function that conjugates verbs of the given type with the current
+    engine.
+    """
+    if _verb_engine is VerbEngine.JVC:
+        if not isinstance(verb_type, VerbType):
+            raise ValueError("verb_type doesn't refer to a verb")
+        return lambda verb, inflection: _conjugate_verb_with_jvc(
+            verb, verb_type, inflection
+        )
+
+    if verb_type is VerbType.GODAN:
+        return _conjugate_godan_verb
+
+    if verb_type is VerbType.ICHIDAN:
+        return _conjugate_ichidan_verb
+
+    if verb_type is VerbType.ICHIDAN_IRREGULAR:
+        return _conjugate_ichidan_irregular_verb
+
+    raise ValueError("verb_type doesn't refer to a verb")
+
+
+def conjugate_verbs_batch(
+    verbs: Sequence[str],
+    verb_types: Sequence[VerbType],
+    inflections: Sequence[VerbInflection],
+) -> list[str]:
+    """Return each of the given verbs of the matching type in the matching
+    conjugation.
+
+    The sequences are parallel: the verb at index `i` has the type at index `i` and is
+    conjugated to the inflection at index `i`. Verbs are conjugated in groups of the
+    same type, so the type and engine are only dispatched once per group.
+    """
+    if not len(verbs) == len(verb_types) == len(inflections):
+        raise ValueError('verbs, verb_types and inflections differ in length')
+
+    conjugated = [''] * len(verbs)
+    for verb_type, indices in _indices_by_type(verb_types).items():
+        conjugate = _verb_conjugation_function(verb_type)
+        for index in indices:
+            conjugated[index] = conjugate(verbs[index], inflections[index])
+    return conjugated
@@ -1,3 +1,4 @@
+from collections.abc import Iterable
 import sqlite3
 
 
@@ -98,3 +99,193 @@ def set_reveal_answer_on_failure(
         (reveal_answer_on_failure,)
     )
     connection.commit()
+
+
+def create_vocab_table_if_nexists(connection: sqlite3.Connection) -> None:
+    """Create the vocab table and its index if they don't exist yet.
+
+    Words are sampled by id, so they must be inserted in (type, frequency) order for
+    the words matching a type and a frequency band to have consecutive ids; see
+    insert_vocab_words().
+    """
+    connection.execute("""
+        CREATE TABLE IF NOT EXISTS VocabWord (
+            id INTEGER PRIMARY KEY,
+            word TEXT NOT NULL,
+            kana TEXT,
+            type TEXT NOT NULL,
+            frequency INT NOT NULL
+        )
+    """)
+    connection.execute("""
+        CREATE INDEX IF NOT EXISTS VocabWordTypeFrequency
+        ON VocabWord (type, frequency)
+    """)
+    connection.execute("""
+        CREATE INDEX IF NOT EXISTS VocabWordWord ON VocabWord (word)
+    """)
+    connection.commit()
+
+def insert_vocab_words(
+    connection: sqlite3.Connection, words: Iterable[tuple[str, str | None, str, int]]
+) -> None:
+    """Replace the vocab with the given (word, kana, type, frequency) rows, sorted by
+    type then frequency, keeping the given order between equal ones.
+    """
+    connection.execute("""DELETE FROM VocabWord""")
+    connection.executemany(
+        """INSERT INTO VocabWord (word, kana, type, frequency) VALUES (?, ?, ?, ?)""",
+        sorted(words, key=lambda row: (row[2], row[3]))
+    )
+    connection.commit()
+
+def get_vocab_id_range(
+    connection: sqlite3.Connection,
+    word_type: str,
+    min_frequency: int,
+    max_frequency: int,
+) -> tuple[int, int] | None:
+    """Return the first and last ids of the words of the given type in the given
+    frequency band, or None if there are none.
+    """
+    first = connection.execute(
+        """
+            SELECT id FROM VocabWord
+            WHERE type = ? AND frequency BETWEEN ? AND ?
+            ORDER BY frequency, id LIMIT 1
+        """,
+        (word_type, min_frequency, max_frequency)
+    ).fetchone()
+    if first is None:
+        return None
+    last = connection.execute(
+        """
+            SELECT id FROM VocabWord
+            WHERE type = ? AND frequency BETWEEN ? AND ?
+            ORDER BY frequency DESC, id DESC LIMIT 1
+        """,
+        (word_type, min_frequency, max_frequency)
+    ).fetchone()
+    return first[0], last[0]
+
+def get_vocab_word(
+    connection: sqlite3.Connection, word_id: int
+) -> tuple[str, str | None, str, int]:
+    """Return the (word, kana, type, frequency) of the word with the given id."""
+    row = connection.execute(
+        """SELECT word, kana, type, frequency FROM VocabWord WHERE id = ?""",
+        (word_id,)
+    )
+    return row.fetchone()
+
+def get_vocab_frequency(connection: sqlite3.Connection, word_id: int) -> int:
+    """Return the frequency of the word with the given id."""
+    row = connection.execute(
+        """SELECT frequency FROM VocabWord WHERE id = ?""",
+        (word_id,)
+    )
+    return row.fetchone()[0]
+
+def get_vocab_ids(
+    connection: sqlite3.Connection, word: str, kana: str | None, type: str
+) -> list[int]:
+    """Return the ids of the words with the given spelling, kana reading and type."""
+    rows = connection.execute(
+        """SELECT id FROM VocabWord WHERE word = ? AND kana IS ? AND type = ?""",
+        (word, kana, type)
+    )
+    return [row[0] for row in rows]
+
+def get_vocab_frequencies(
+    connection: sqlite3.Connection, first_id: int, last_id: int
+) -> list[int]:
+    """Return the frequencies of the words with ids from first_id to last_id."""
+    rows = connection.execute(
+        """SELECT frequency FROM VocabWord WHERE id BETWEEN ? AND ? ORDER BY id""",
+        (first_id, last_id)
+    )
+    return [row[0] for row in rows]
+
+
+def create_review_table_if_nexists(connection: sqlite3.Connection) -> None:
+    """Create the table of spaced repetition reviews and its index if they don't exist
+    yet.
+
+    There's a review per (word, kana, type, inflection) item asked; kana is '' for
+    words without a kana reading, so that they're still unique.
+    """
+    connection.execute("""
+        CREATE TABLE IF NOT EXISTS Review (
+            id INTEGER PRIMARY KEY,
+            word TEXT NOT NULL,
+            kana TEXT NOT NULL,
+            type TEXT NOT NULL,
+            inflection INT NOT NULL,  -- the inflection's id
+            repetitions INT NOT NULL,
+            interval REAL NOT NULL,  -- in days
+            ease REAL NOT NULL,
+            due REAL NOT NULL,  -- in seconds since the epoch
+            UNIQUE (word, kana, type, inflection)
+        )
+    """)
+    connection.execute("""CREATE INDEX IF NOT EXISTS ReviewDue ON Review (due)""")
+    connection.commit()
+
+def get_review(
+    connection: sqlite3.Connection, word: str, kana: str, type: str, inflection: int
+) -> tuple[int, float, float, float] | None:
+    """Return the (repetitions, interval, ease, due) of the given item, or None if it
+    was never reviewed.
+    """
+    row = connection.execute(
+        """
+            SELECT repetitions, interval, ease, due FROM Review
+            WHERE word = ? AND kana = ? AND type = ? AND inflection = ?
+        """,
+        (word, kana, type, inflection)
+    )
+    return row.fetchone()
+
+def get_reviews_due_after(
+    connection: sqlite3.Connection, after: float, limit: int
+) -> list[tuple[str, str, str, int, int, float, float, float]]:
+    """Return the (word, kana, type, inflection, repetitions, interval, ease, due) of
+    the first `limit` items due after the given time, soonest first, and of any other
+    item due at the same time as the last one.
+    """
+    last = connection.execute(
+        """SELECT due FROM Review WHERE due > ? ORDER BY due LIMIT 1 OFFSET ?""",
+        (after, limit - 1)
+    ).fetchone()
+    rows = connection.execute(
+        """
+            SELECT word, kana, type, inflection, repetitions, interval, ease, due
+            FROM Review WHERE due > ? AND due <= ? ORDER BY due
+        """,
+        (after, float('inf') if last is None else last[0])
+    )
+    return rows.fetchall()
+
+def set_reviews(
+    connection: sqlite3.Connection,
+    reviews: Iterable[tuple[str, str, str, int, int, float, float, float]],
+) -> None:
+    """Store the given (word, kana, type, inflection, repetitions, interval, ease,
+    due) reviews, in a single transaction.
+    """
+    connection.executemany(
+        """
+            INSERT INTO Review (
+                word, kana, type, inflection, repetitions, interval, ease, due
+            ) VALUES (
+                ?, ?, ?, ?, ?, ?, ?, ?
+            )
+            ON CONFLICT (word, kana, type, inflection) DO UPDATE SET
+                repetitions = excluded.repetitions,
+                interval = excluded.interval,
+                ease = excluded.ease,
+                due = excluded.due
+        """,
+        reviews
+    )
+    connection.commit()
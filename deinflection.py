@@ -0,0 +1,122 @@
+"""Reverse lookup from conjugated forms to the words and inflections that produce them.
+
+This lets the quizzers tell a learner which form they gave when their answer is wrong
+(e.g. the past form instead of the negative one) with a single dictionary lookup.
+"""
+
+from collections.abc import Sequence
+import time
+
+import conjugator
+from conjugation_table import ConjugationTable
+from inflection import (
+    AdjectiveType, AdjectiveInflection,
+    VerbType, VerbInflection
+)
+from vocab import VocabWord
+
+
+_VERB_FLAG = 1 << 5
+"""Set in an entry when its inflection is a VerbInflection."""
+_ID_MASK = _VERB_FLAG - 1
+_WORD_INDEX_SHIFT = 6
+
+assert VerbInflection.COUNT <= _VERB_FLAG and AdjectiveInflection.COUNT <= _VERB_FLAG
+
+
+def _encode(word_index: int, inflection: VerbInflection | AdjectiveInflection) -> int:
+    """Pack the given word index and inflection into a single integer."""
+    entry = word_index << _WORD_INDEX_SHIFT | inflection.id
+    if isinstance(inflection, VerbInflection):
+        entry |= _VERB_FLAG
+    return entry
+
+def _decode(entry: int) -> tuple[int, VerbInflection | AdjectiveInflection]:
+    """Unpack a word index and inflection packed by _encode()."""
+    inflection_class = VerbInflection if entry & _VERB_FLAG else AdjectiveInflection
+    return (entry >> _WORD_INDEX_SHIFT, inflection_class.from_id(entry & _ID_MASK))
+
+
+class DeinflectionIndex:
+    """Every form of every word in a vocab, mapped back to the (word index, inflection)
+    pairs that produce it.
+
+    Both the spelling in the vocab and the kana reading are indexed. Besides the
+    inflections a word can be asked in, its dictionary form (the default inflection) is
+    indexed too, and so is the plain form of な-adjectives (e.g. 有名だ).
+    """
+    build_seconds: float
+    """How long it took to build the index."""
+
+    _entries: dict[str, int | tuple[int, ...]]
+    """The (word index, inflection) pairs of every form, packed by _encode(). Most
+    forms only come from 1 pair, so they're stored as a bare integer.
+    """
+
+    def __init__(self, words: Sequence[VocabWord], table: ConjugationTable):
+        """Index every answer in the given table of the given words, plus their
+        dictionary and plain forms.
+        """
+        start = time.perf_counter()
+        self._entries = {}
+
+        for word_index, inflection, form in table.items():
+            self._add(form, _encode(word_index, inflection))
+
+        plain = AdjectiveInflection(politeness=AdjectiveInflection.Politeness.PLAIN)
+        for word_index, vocab_word in enumerate(words):
+            word = vocab_word.word
+            kana_reading = vocab_word.kana
+            word_type = vocab_word.type
+            spellings = (
+                (word,) if kana_reading in (None, word) else (word, kana_reading)
+            )
+            for spelling in spellings:
+                if isinstance(word_type, VerbType):
+                    self._add(spelling, _encode(word_index, VerbInflection()))
+                    continue
+
+                self._add(spelling, _encode(word_index, AdjectiveInflection()))
+                if word_type is AdjectiveType.NA:
+                    self._add(
+                        conjugator.conjugate_adjective(spelling, word_type, plain),
+                        _encode(word_index, plain),
+                    )
+
+        self.build_seconds = time.perf_counter() - start
+
+    def _add(self, form: str, entry: int) -> None:
+        """Map the given form to the given entry, besides any previous ones."""
+        previous = self._entries.get(form)
+        if previous is None:
+            self._entries[form] = entry
+        elif isinstance(previous, int):
+            self._entries[form] = (previous, entry)
+        else:
+            self._entries[form] = (*previous, entry)
+
+    def __len__(self) -> int:
+        """Return the number of distinct forms."""
+        return len(self._entries)
+
+    def lookup(
+        self, form: str
+    ) -> tuple[tuple[int, VerbInflection | AdjectiveInflection], ...]:
+        """Return every (word index, inflection) pair that produces the given form."""
+        entries = self._entries.get(form)
+        if entries is None:
+            return ()
+        if isinstance(entries, int):
+            return (_decode(entries),)
+        return tuple(map(_decode, entries))
+
+    def diagnose(
+        self, word_index: int, answer: str
+    ) -> VerbInflection | AdjectiveInflection | None:
+        """Return which inflection of the word at the given index the given answer
+        is, or None if it's not a form of that word.
+        """
+        for found_word_index, inflection in self.lookup(answer):
+            if found_word_index == word_index:
+                return inflection
+        return None
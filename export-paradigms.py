@@ -0,0 +1,234 @@
+"""This script exports the full paradigm of every word in a vocab: every word in every
+inflection it can be asked in, one row per (word, inflection) pair. The output can be
+imported into Anki decks or used for external analysis.
+
+The conjugation work is split into chunks of words, spread across a pool of processes,
+and written in vocab order as each chunk is done; the output is never held in memory as
+a whole.
+
+The columns (CSV) or keys (JSONL) of each row are:
+{
+    "word": the dictionary form word
+    "kana": the kana reading if `word` contains kanji, else null (empty in CSV)
+    "type": the type of word (see AdjectiveType and VerbType)
+    "inflection": the inflection, formatted like in the quiz (e.g. "[POLITE] [PAST]")
+    "answer": the word in that inflection
+    "kana_answer": the kana reading in that inflection, if `kana` isn't null
+}
+"""
+
+import argparse
+from collections import deque
+from collections.abc import Iterable, Iterator, Sequence
+import csv
+import json
+from multiprocessing import Pool
+from multiprocessing.pool import AsyncResult
+import os
+from sys import exit
+import sys
+import time
+from typing import Any, TextIO
+import logging
+
+from conjugation_table import ConjugationTable
+import vocab
+
+
+COLUMNS = ('word', 'kana', 'type', 'inflection', 'answer', 'kana_answer')
+
+FORMATS = ('csv', 'jsonl')
+
+
+def paradigm_rows(words: Sequence[dict[str, Any]]) -> list[tuple[str | None, ...]]:
+    """Return a row with the values in COLUMNS for every word in every inflection it
+    can be asked in.
+
+    Raise ValueError if any of the words has an illegal type.
+    """
+    vocab_words = [vocab.VocabWord.from_dict(word_info) for word_info in words]
+    table = ConjugationTable(vocab_words)
+    rows = []
+    for word_index, vocab_word in enumerate(vocab_words):
+        for inflection in table.inflections(word_index):
+            rows.append((
+                vocab_word.word,
+                vocab_word.kana,
+                vocab_word.type.value,
+                inflection.formatted(),
+                table.answer(word_index, inflection),
+                table.kana_answer(word_index, inflection),
+            ))
+    return rows
+
+
+def chunked(
+    words: Sequence[dict[str, Any]], chunk_size: int
+) -> Iterator[Sequence[dict[str, Any]]]:
+    """Yield consecutive slices of the given words with up to `chunk_size` words."""
+    for start in range(0, len(words), chunk_size):
+        yield words[start:start + chunk_size]
+
+
+def iter_paradigm_rows(
+    words: Sequence[dict[str, Any]], jobs: int, chunk_size: int
+) -> Iterator[tuple[str | None, ...]]:
+    """Yield the paradigm rows of every word, in vocab order.
+
+    With more than 1 job, chunks are conjugated in a pool of `jobs` processes; only a
+    few chunks are ever in flight at once.
+
+    Raise ValueError if any of the words has an illegal type.
+    """
+    chunks = chunked(words, chunk_size)
+    if jobs <= 1:
+        for chunk in chunks:
+            yield from paradigm_rows(chunk)
+        return
+
+    # Pool.imap would queue every chunk up front and keep every finished one around
+    # until it's yielded, so at most 2 chunks per process are submitted at a time
+    with Pool(processes=jobs) as pool:
+        pending: deque[AsyncResult] = deque()
+        for chunk in chunks:
+            if len(pending) == 2*jobs:
+                yield from pending.popleft().get()
+            pending.append(pool.apply_async(paradigm_rows, (chunk,)))
+        while pending:
+            yield from pending.popleft().get()
+
+
+def write_csv(rows: Iterable[tuple[str | None, ...]], output_file: TextIO) -> int:
+    """Write the given rows as CSV, with a header, and return how many were written."""
+    writer = csv.writer(output_file)
+    writer.writerow(COLUMNS)
+    row_count = 0
+    for row in rows:
+        writer.writerow(row)
+        row_count += 1
+    return row_count
+
+
+def write_jsonl(rows: Iterable[tuple[str | None, ...]], output_file: TextIO) -> int:
+    """Write the given rows as JSON objects, one per line, and return how many were
+    written.
+    """
+    row_count = 0
+    for row in rows:
+        output_file.write(json.dumps(dict(zip(COLUMNS, row)), ensure_ascii=False))
+        output_file.write('\n')
+        row_count += 1
+    return row_count
+
+
+def export_paradigms(
+    words: Sequence[dict[str, Any]],
+    output_file: TextIO,
+    output_format: str,
+    jobs: int = 1,
+    chunk_size: int = 500,
+) -> int:
+    """Write the paradigm of every word to the given file in the given format (see
+    FORMATS), and return how many rows were written.
+
+    Raise ValueError if any of the words has an illegal type.
+    """
+    rows = iter_paradigm_rows(words, jobs, chunk_size)
+    if output_format == 'csv':
+        return write_csv(rows, output_file)
+    return write_jsonl(rows, output_file)
+
+
+if __name__ == '__main__':
+    logging.basicConfig(level=logging.INFO)
+
+    parser = argparse.ArgumentParser(
+        description='Export every vocab word in every inflection to CSV or JSONL.',
+        formatter_class=argparse.ArgumentDefaultsHelpFormatter
+    )
+    parser.add_argument(
+        '-i',
+        '--vocab-file',
+        help='path to the vocab file (JSON, binary or SQLite) with the words to export',
+        type=str,
+        default='vocab.json',
+    )
+    parser.add_argument(
+        '-o',
+        '--output',
+        help='where to save the paradigms ("-" for the standard output)',
+        type=str,
+        default='paradigms.csv',
+    )
+    parser.add_argument(
+        '-f',
+        '--format',
+        help='the output format (default: guessed from the output extension, or csv)',
+        choices=FORMATS,
+        default=None,
+    )
+    parser.add_argument(
+        '-j',
+        '--jobs',
+        help='the number of processes conjugating words',
+        type=int,
+        default=os.cpu_count() or 1,
+    )
+    parser.add_argument(
+        '--chunk-size',
+        help='the number of words each process conjugates at a time',
+        type=int,
+        default=500,
+    )
+    args = parser.parse_args()
+
+    if args.jobs < 1 or args.chunk_size < 1:
+        parser.error('--jobs and --chunk-size must be at least 1')
+
+    output_format: str = args.format or (
+        'jsonl' if args.output.endswith('.jsonl') else 'csv'
+    )
+
+    words: Sequence[dict]
+    try:
+        words = vocab.load_vocab(args.vocab_file)
+    except FileNotFoundError:
+        logging.error(
+            f'"{args.vocab_file}" does not exist. run `python3 gen-vocab.py`'
+            + ' to build a vocab file.'
+        )
+        exit(1)
+    except OSError:
+        logging.error(f'could not open "{args.vocab_file}".')
+        raise
+    except ValueError:
+        logging.error(
+            f'{args.vocab_file} is malformed. run `python3 gen-vocab.py`'
+            + ' to build a new vocab file.'
+        )
+        exit(2)
+
+    logging.info(f'{len(words)} words loaded.')
+
+    start = time.perf_counter()
+    try:
+        if args.output == '-':
+            row_count = export_paradigms(
+                words, sys.stdout, output_format, args.jobs, args.chunk_size
+            )
+        else:
+            with open(args.output, 'w', newline='') as output_file:
+                row_count = export_paradigms(
+                    words, output_file, output_format, args.jobs, args.chunk_size
+                )
+    except ValueError as error:
+        logging.error(f'{error}.')
+        exit(4)
+    except OSError:
+        logging.error(f'could not write the paradigms to "{args.output}".')
+        raise
+
+    logging.info(
+        f'{row_count} rows exported in {time.perf_counter() - start:.2f}s'
+        + f' with {args.jobs} job(s).'
+    )
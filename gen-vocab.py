@@ -4,70 +4,449 @@ It fetches both JPDB's word frequency list and the Simplified JMdict dictionary
 the `N` most frequent words of each type: verbs and adjectives. Therefore, the final
 word count should be `N`*2.
 
-Verb and adjective types are filtered to discard archaic or rare forms.
+Verb and adjective types are filtered to discard archaic or rare forms, and every word
+kept is conjugated in every inflection beforehand: the ones that can't be are reported
+and dropped, so that the quizzers never come across them.
 
-The keys for each entry in the final JSON are:
+Fetched archives are cached by the SHA-256 of their contents (in `~/.cache/kaeru` by
+default), so later runs don't download them again. Local archives can be used instead
+with `--jmdict-path` and `--jpdb-path`, e.g. to work offline.
+
+The vocab is saved as JSON, with `--format binary` in the compact binary format
+described in vocab.py, or with `--format sqlite` in an indexed SQLite table that the
+quizzers can filter by type and frequency. The keys for each entry in the final JSON
+are:
 {
     "word": the dictionary form word
     "kana": the kana reading if `word` contains kanji, else null
     "type": the type of word (see AdjectiveType and VerbType)
+    "frequency": the JPDB frequency rank (optional; 1 is the most frequent word)
 }
 
 For example:
 [
-    {"name": "考える", "kana": "かんがえる", "type": "verb-ichidan"},
-    {"name": "わかる", "kana": null, "type": "verb-godan"},
-    {"name": "強い", "kana": "つよい", "type": "adjective-i"},
+    {"name": "考える", "kana": "かんがえる", "type": "verb-ichidan", "frequency": 180},
+    {"name": "わかる", "kana": null, "type": "verb-godan", "frequency": 45},
+    {"name": "強い", "kana": "つよい", "type": "adjective-i", "frequency": 640},
     ...
 ]
 """
 
 import argparse
+from collections import deque
+from collections.abc import Iterable, Iterator, Sequence
+from contextlib import contextmanager
+import hashlib
+import heapq
+import io
 import json
 from multiprocessing import Pool
+from multiprocessing.pool import AsyncResult, ThreadPool
+import os
+import platform
+import re
 from sys import exit
-import urllib.request
-import shutil
+import sys
 import tempfile
-from typing import Any
+import threading
+import time
+from typing import Any, BinaryIO, NamedTuple, TextIO
+import urllib.request
+import zipfile
 from os import path
 import logging
 
-from inflection import VerbType, AdjectiveType
+import conjugator
+from conjugation_table import parse_word_type
+from inflection import (
+    AdjectiveType, AdjectiveInflection,
+    VerbType, VerbInflection
+)
+import vocab
 
 
-def get_simplified_jmdict_json() -> list[dict[str, Any]]:
-    """Fetch and return the Simplified JMdict JSON deserialised to a list."""
-    with (
-        tempfile.NamedTemporaryFile() as temp_file,
-        tempfile.TemporaryDirectory() as temp_dir,
-        urllib.request.urlopen(
-            'https://github.com/scriptin/jmdict-simplified/releases/download'
-            + '/3.6.1%2B20251013122507/jmdict-eng-common-3.6.1+20251013122507.json.zip'
-        ) as jmdict_zip
-    ):
-        temp_file.write(jmdict_zip.read())
-        shutil.unpack_archive(temp_file.name, temp_dir, 'zip')
-        extracted_json_path = path.join(temp_dir, 'jmdict-eng-common-3.6.1.json')
-        with open(extracted_json_path) as extracted_json:
-            return json.load(extracted_json)['words']
+JMDICT_URL = (
+    'https://github.com/scriptin/jmdict-simplified/releases/download'
+    + '/3.6.1%2B20251013122507/jmdict-eng-common-3.6.1+20251013122507.json.zip'
+)
+JMDICT_MEMBER = 'jmdict-eng-common-3.6.1.json'
+
+JPDB_URL = (
+    'https://github.com/Kuuuube/yomitan-dictionaries/raw/main/dictionaries'
+    + '/JPDB_v2.2_Frequency_2024-10-13.zip'
+)
+JPDB_MEMBER = 'term_meta_bank_1.json'
+
+_CHUNK_SIZE = 1 << 16
+
+
+def download(url: str, output_file: BinaryIO) -> str:
+    """Write the file at the given URL to the given file, a chunk at a time, and return
+    the SHA-256 hex digest of its contents.
+    """
+    digest = hashlib.sha256()
+    with urllib.request.urlopen(url) as response:
+        while chunk := response.read(_CHUNK_SIZE):
+            digest.update(chunk)
+            output_file.write(chunk)
+    output_file.seek(0)
+    return digest.hexdigest()
+
+
+def file_sha256(file_path: str) -> str:
+    """Return the SHA-256 hex digest of the given file's contents."""
+    digest = hashlib.sha256()
+    with open(file_path, 'rb') as file:
+        while chunk := file.read(_CHUNK_SIZE):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def default_cache_directory() -> str:
+    """Return where fetched archives are cached unless told otherwise."""
+    cache_home = os.environ.get('XDG_CACHE_HOME') or path.expanduser('~/.cache')
+    return path.join(cache_home, 'kaeru')
+
+
+# the cache index maps each URL to the hash of the archive fetched from it. both
+# downloads run at once, so updates to it are serialised
+_cache_index_lock = threading.Lock()
+
+
+def _read_cache_index(cache_directory: str) -> dict[str, str]:
+    """Return the cache index in the given directory; empty if there's none yet."""
+    try:
+        with open(path.join(cache_directory, 'index.json')) as index_file:
+            return json.load(index_file)
+    except (FileNotFoundError, json.decoder.JSONDecodeError):
+        return {}
+
+
+def _update_cache_index(cache_directory: str, url: str, sha256: str) -> None:
+    """Record that the archive at the given URL has the given hash."""
+    with _cache_index_lock:
+        index = _read_cache_index(cache_directory)
+        index[url] = sha256
+        with tempfile.NamedTemporaryFile(
+            'w', dir=cache_directory, suffix='.tmp', delete=False
+        ) as index_file:
+            json.dump(index, index_file, indent=4)
+        os.replace(index_file.name, path.join(cache_directory, 'index.json'))
+
+
+def cached_download(url: str, cache_directory: str) -> str:
+    """Return the path to a local copy of the archive at the given URL, downloading it
+    only if there's no intact copy in the cache yet.
+
+    Archives are stored under the SHA-256 of their contents, and checked against it
+    before being reused.
+    """
+    os.makedirs(cache_directory, exist_ok=True)
+    sha256 = _read_cache_index(cache_directory).get(url)
+    if sha256 is not None:
+        cached_path = path.join(cache_directory, f'{sha256}.zip')
+        if path.isfile(cached_path) and file_sha256(cached_path) == sha256:
+            logging.info(f'using the cached copy of {url}.')
+            return cached_path
+        logging.warning(f'the cached copy of {url} is missing or corrupt.')
+
+    with tempfile.NamedTemporaryFile(
+        dir=cache_directory, suffix='.tmp', delete=False
+    ) as temp_file:
+        try:
+            sha256 = download(url, temp_file)
+        except BaseException:
+            temp_file.close()
+            os.remove(temp_file.name)
+            raise
+    cached_path = path.join(cache_directory, f'{sha256}.zip')
+    os.replace(temp_file.name, cached_path)
+    _update_cache_index(cache_directory, url, sha256)
+    return cached_path
+
+
+def open_archive(
+    url: str, local_path: str | None, cache_directory: str | None
+) -> BinaryIO:
+    """Return the archive at the given local path, or else the one at the given URL:
+    from the cache if there's a cache directory, otherwise freshly downloaded to a
+    temporary file.
+    """
+    if local_path is not None:
+        return open(local_path, 'rb')
+    if cache_directory is not None:
+        return open(cached_download(url, cache_directory), 'rb')
+
+    temp_file = tempfile.TemporaryFile()
+    try:
+        download(url, temp_file)
+    except BaseException:
+        temp_file.close()
+        raise
+    return temp_file
 
 
-def get_jpdb_frequency_list_json() -> list[list]:
-    """Fetch and return the JPDB Frequency List JSON deserialised to a list."""
+class _JSONStreamReader:
+    """Decode JSON values one at a time from a text stream, keeping only the value
+    being decoded in memory.
+    """
+    _whitespace = re.compile(r'[ \t\n\r]*')
+    _decoder = json.JSONDecoder()
+
+    def __init__(self, stream: TextIO, chunk_size: int):
+        self._stream = stream
+        self._chunk_size = chunk_size
+        self._buffer = ''
+        self._position = 0
+
+    def _read_more(self) -> bool:
+        """Append the next chunk of the stream to the buffer, dropping what's already
+        been decoded. Return False if the stream is exhausted.
+        """
+        chunk = self._stream.read(self._chunk_size)
+        if not chunk:
+            return False
+        self._buffer = self._buffer[self._position:] + chunk
+        self._position = 0
+        return True
+
+    def take_buffered(self) -> str:
+        """Return the text read from the stream but not decoded yet, and forget it."""
+        buffered = self._buffer[self._position:]
+        self._buffer = ''
+        self._position = 0
+        return buffered
+
+    def peek(self) -> str:
+        """Skip whitespace and return the next character, or '' at the end."""
+        while True:
+            self._position = self._whitespace.match(
+                self._buffer, self._position
+            ).end()
+            if self._position < len(self._buffer) or not self._read_more():
+                return self._buffer[self._position:self._position + 1]
+
+    def expect(self, char: str) -> None:
+        """Skip whitespace and the given character.
+
+        Raise ValueError if the next character is a different one.
+        """
+        next_char = self.peek()
+        if next_char != char:
+            raise ValueError(f'expected "{char}" in JSON, got "{next_char}"')
+        self._position += 1
+
+    def decode(self) -> Any:
+        """Skip whitespace and decode the next JSON value.
+
+        Raise ValueError if it's malformed.
+        """
+        self.peek()
+        while True:
+            try:
+                value, end = self._decoder.raw_decode(self._buffer, self._position)
+            except json.JSONDecodeError:
+                # the value might just be cut off at the end of the buffer
+                if self._read_more():
+                    continue
+                raise
+            # a number cut off by the end of the buffer (e.g. "4" of "4.5e10") might go
+            # on in the next chunk
+            number_might_go_on = end == len(self._buffer) or (
+                isinstance(value, int | float) and self._buffer[end] in '.eE'
+            )
+            if number_might_go_on and self._read_more():
+                continue
+            self._position = end
+            return value
+
+
+def _seek_json_array(reader: _JSONStreamReader, key: str | None) -> None:
+    """Skip to right after the "[" of the array that's either the whole document, or
+    the value of the given key in the top-level object.
+
+    Raise ValueError if the JSON is malformed or the key is missing.
+    """
+    if key is not None:
+        reader.expect('{')
+        while True:
+            if reader.peek() == '}':
+                raise ValueError(f'no "{key}" key in the JSON object')
+            name = reader.decode()
+            reader.expect(':')
+            if name == key:
+                break
+            reader.decode()
+            if reader.peek() == ',':
+                reader.expect(',')
+
+    reader.expect('[')
+
+
+def _iter_json_array_items(
+    reader: _JSONStreamReader, partial: bool = False
+) -> Iterator[Any]:
+    """Yield the array items up to the closing "]", right after the "[" or a ",".
+
+    If `partial`, the items may also just stop at the end of the stream, with or
+    without a trailing ",".
+    """
+    ends = (']', '') if partial else (']',)
+    if reader.peek() in ends:
+        return
+    while True:
+        yield reader.decode()
+        if reader.peek() in ends:
+            return
+        reader.expect(',')
+        if partial and reader.peek() == '':
+            return
+
+
+def iter_json_array(
+    stream: TextIO, key: str | None = None, chunk_size: int = _CHUNK_SIZE
+) -> Iterator[Any]:
+    """Yield the items of a JSON array one by one as they're read from the stream.
+
+    The array is either the whole document, or the value of the given key in the
+    top-level object.
+
+    Raise ValueError if the JSON is malformed or the key is missing.
+    """
+    reader = _JSONStreamReader(stream, chunk_size)
+    _seek_json_array(reader, key)
+    yield from _iter_json_array_items(reader)
+
+
+def iter_archived_json_array(
+    archive_file: BinaryIO, member: str, key: str | None = None
+) -> Iterator[Any]:
+    """Yield the items of a JSON array inside a zip archive, decompressing and decoding
+    them as they're read; nothing is extracted to disk.
+
+    See iter_json_array().
+    """
     with (
-        tempfile.NamedTemporaryFile() as temp_file,
-        tempfile.TemporaryDirectory() as temp_dir,
-        urllib.request.urlopen(
-            'https://github.com/Kuuuube/yomitan-dictionaries/raw/main/dictionaries'
-            + '/JPDB_v2.2_Frequency_2024-10-13.zip'
-        ) as jpdb_zip
+        zipfile.ZipFile(archive_file) as archive,
+        archive.open(member) as member_file,
+        io.TextIOWrapper(member_file, encoding='utf-8') as json_file,
     ):
-        temp_file.write(jpdb_zip.read())
-        shutil.unpack_archive(temp_file.name, temp_dir, 'zip')
-        extracted_json_path = path.join(temp_dir, 'term_meta_bank_1.json')
-        with open(extracted_json_path) as extracted_json:
-            return json.load(extracted_json)
+        yield from iter_json_array(json_file, key)
+
+
+def iter_simplified_jmdict_words(archive_file: BinaryIO) -> Iterator[dict[str, Any]]:
+    """Yield the entries in the Simplified JMdict zip one by one."""
+    return iter_archived_json_array(archive_file, JMDICT_MEMBER, 'words')
+
+
+def read_jpdb_frequencies(archive_file: BinaryIO) -> dict[str, int]:
+    """Return the frequency rank of each word in the JPDB Frequency List zip."""
+    frequencies = {}
+    for entry in iter_archived_json_array(archive_file, JPDB_MEMBER):
+        word: str = entry[0]
+        if len(word) == 1:
+            # there are no 1-character-long verbs or adjectives
+            continue
+
+        try:
+            frequency: int = entry[2]['value']
+        except KeyError:
+            frequency: int = entry[2]['frequency']['value']
+        frequencies[word] = frequency
+    return frequencies
+
+
+def peak_memory_mib() -> float | None:
+    """Return the peak memory usage of this process so far in MiB, or None if the
+    platform can't tell.
+    """
+    try:
+        import resource
+    except ImportError:
+        return None
+    max_rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # bytes on macOS, KiB everywhere else
+    return max_rss / (1024*1024 if sys.platform == 'darwin' else 1024)
+
+
+def cpu_seconds() -> float:
+    """Return the CPU time used so far by this process and by its children that have
+    exited, in seconds.
+    """
+    try:
+        import resource
+    except ImportError:
+        return time.process_time()
+    own = resource.getrusage(resource.RUSAGE_SELF)
+    children = resource.getrusage(resource.RUSAGE_CHILDREN)
+    return own.ru_utime + own.ru_stime + children.ru_utime + children.ru_stime
+
+
+def children_peak_memory_mib() -> float | None:
+    """Return the peak memory usage of the largest child process that has exited so far
+    in MiB, or None if the platform can't tell.
+    """
+    try:
+        import resource
+    except ImportError:
+        return None
+    max_rss = resource.getrusage(resource.RUSAGE_CHILDREN).ru_maxrss
+    return max_rss / (1024*1024 if sys.platform == 'darwin' else 1024)
+
+
+class RunStats:
+    """The wall time, CPU time, peak memory and throughput of each stage of a run.
+
+    Peak memory is the high-water mark of the process when the stage ends, so it only
+    grows from a stage to the next; a jump shows which stage needed the memory.
+    """
+    stages: list[dict[str, Any]]
+    """A report per stage, in order."""
+    _start: float
+    """When the run started, from time.perf_counter()."""
+
+    def __init__(self):
+        self.stages = []
+        self._start = time.perf_counter()
+
+    @contextmanager
+    def stage(self, name: str, unit: str) -> Iterator[dict[str, int]]:
+        """Measure the stage run in the context. It's given a dict in which to set the
+        number of items the stage processed, as 'items'.
+        """
+        counts = {'items': 0}
+        wall_start = time.perf_counter()
+        cpu_start = cpu_seconds()
+        yield counts
+        wall = time.perf_counter() - wall_start
+        self.stages.append({
+            'stage': name,
+            'wall_seconds': round(wall, 3),
+            'cpu_seconds': round(cpu_seconds() - cpu_start, 3),
+            **self._peak_memory(),
+            'items': counts['items'],
+            'unit': unit,
+            'items_per_second': round(counts['items'] / wall, 1) if wall else None,
+        })
+
+    @staticmethod
+    def _peak_memory() -> dict[str, float | None]:
+        own, children = peak_memory_mib(), children_peak_memory_mib()
+        return {
+            'peak_rss_mib': None if own is None else round(own, 1),
+            'children_peak_rss_mib': None if children is None else round(children, 1),
+        }
+
+    def report(self) -> dict[str, Any]:
+        """Return every stage's report, and the totals."""
+        return {
+            'stages': self.stages,
+            'total': {
+                'wall_seconds': round(time.perf_counter() - self._start, 3),
+                'cpu_seconds': round(cpu_seconds(), 3),
+                **self._peak_memory(),
+            },
+        }
 
 
 # the type of words we want to keep based on JMdict's tags
@@ -92,6 +471,515 @@ wanted_word_types = {
 }
 
 
+# what the merge needs from a JMdict entry: its type (if it's wanted), its kana reading,
+# and each of its spellings that's in the JPDB frequency list, with its frequency
+_Candidate = tuple[VerbType | AdjectiveType | None, str, tuple[tuple[str, int], ...]]
+
+
+def _candidate(
+    entry: dict[str, Any], jpdb_frequencies: dict[str, int]
+) -> _Candidate | None:
+    """Return what the merge needs from the given JMdict entry, or None if none of its
+    spellings can be in the vocab.
+    """
+    # an entry might have multiple kanji & kana spellings. we'll stick with non-rare
+    # ones only and look each one up (so we can analyse each spelling's frequency)
+    spellings = []
+    for spelling in (*entry['kanji'], *entry['kana']):
+        if not spelling['common']:
+            continue
+
+        word = spelling['text']
+
+        if len(word) == 1:
+            # there are no 1-character-long verbs or adjectives
+            continue
+
+        frequency = jpdb_frequencies.get(word)
+        if frequency is not None:
+            spellings.append((word, frequency))
+    if not spellings:
+        return None
+
+    # is it the right type of word?
+    tags: list[str] = entry['sense'][0]['partOfSpeech']
+    word_type = next(
+        (wanted_word_types[tag] for tag in tags if tag in wanted_word_types), None
+    )
+    return word_type, entry['kana'][0]['text'], tuple(spellings)
+
+
+def _claim(candidate: _Candidate, claimed: set[str]) -> dict[str, Any] | None:
+    """Claim the candidate's spellings that no earlier entry has, and return its most
+    frequent one as a vocab word; None if it's not the right type of word or all of
+    its spellings were already claimed.
+    """
+    word_type, kana_reading, spellings = candidate
+    best_spelling = None
+    best_frequency = None
+    for word, frequency in spellings:
+        if word in claimed:
+            continue
+        claimed.add(word)
+        if best_frequency is None or frequency < best_frequency:
+            best_spelling = word
+            best_frequency = frequency
+
+    if word_type is None or best_spelling is None:
+        return None
+    return {
+        'word': best_spelling,
+        'kana': kana_reading if kana_reading != best_spelling else None,
+        'type': word_type,
+        'frequency': best_frequency,
+    }
+
+
+def iter_merged_words(
+    jmdict_words: Iterator[dict[str, Any]], jpdb_frequencies: dict[str, int]
+) -> Iterator[dict[str, Any]]:
+    """Yield the verbs and adjectives in JMdict that are in the JPDB frequency list,
+    with their type, kana reading and frequency, as JMdict entries come.
+
+    Each entry yields at most its most frequent spelling, and each spelling belongs to
+    the first entry that has it.
+    """
+    claimed: set[str] = set()
+    for entry in jmdict_words:
+        candidate = _candidate(entry, jpdb_frequencies)
+        if candidate is None:
+            continue
+        word_info = _claim(candidate, claimed)
+        if word_info is not None:
+            yield word_info
+
+
+# every entry of the Simplified JMdict is an object whose first key is "id", and no
+# other object is. an unescaped '"' can't be inside a string, so this only ever
+# matches the start of an entry
+_JMDICT_ENTRY_START = re.compile(r'\{\s*"id"\s*:')
+
+
+def iter_simplified_jmdict_text_chunks(
+    archive_file: BinaryIO, chunk_size: int = 1 << 20
+) -> Iterator[str]:
+    """Yield the JSON text of the entries in the Simplified JMdict zip, in chunks of
+    about `chunk_size` characters split between entries, undecoded. Each chunk is a
+    run of entries separated by commas, maybe followed by the rest of the document.
+    """
+    with (
+        zipfile.ZipFile(archive_file) as archive,
+        archive.open(JMDICT_MEMBER) as member_file,
+        io.TextIOWrapper(member_file, encoding='utf-8') as json_file,
+    ):
+        reader = _JSONStreamReader(json_file, _CHUNK_SIZE)
+        _seek_json_array(reader, 'words')
+        pending = reader.take_buffered()
+        scan_start = 0
+        while True:
+            # a chunk ends right before the first entry that starts `chunk_size` or more
+            # characters after it, since that entry might not be complete yet
+            chunk_start = 0
+            for match in _JMDICT_ENTRY_START.finditer(pending, scan_start):
+                if match.start() - chunk_start >= chunk_size:
+                    yield pending[chunk_start:match.start()]
+                    chunk_start = match.start()
+            pending = pending[chunk_start:]
+            # entries found so far won't end a chunk; only look again at the end, where
+            # the start of an entry might be cut off
+            scan_start = max(len(pending) - 64, 0)
+
+            text = json_file.read(chunk_size)
+            if not text:
+                break
+            pending += text
+        if pending:
+            yield pending
+
+
+_worker_frequencies: dict[str, int] = {}
+"""The JPDB frequency list in merge worker processes."""
+
+
+def _set_worker_frequencies(jpdb_frequencies: dict[str, int]) -> None:
+    """Give this merge worker process read-only access to the JPDB frequency list."""
+    global _worker_frequencies
+    _worker_frequencies = jpdb_frequencies
+
+
+def _candidates_in_text_chunk(text: str) -> list[_Candidate]:
+    """Decode a chunk of JMdict entries and return the candidate of each one that has
+    any, in order.
+    """
+    reader = _JSONStreamReader(io.StringIO(text), len(text))
+    candidates = []
+    for entry in _iter_json_array_items(reader, partial=True):
+        candidate = _candidate(entry, _worker_frequencies)
+        if candidate is not None:
+            candidates.append(candidate)
+    return candidates
+
+
+def iter_merged_words_parallel(
+    jmdict_archive_file: BinaryIO,
+    jpdb_frequencies: dict[str, int],
+    jobs: int,
+    chunk_size: int = 1 << 20,
+) -> Iterator[dict[str, Any]]:
+    """Like iter_merged_words() over the entries in the Simplified JMdict zip, but
+    decode and look up chunks of entries in a pool of `jobs` processes.
+
+    Spellings are claimed in entry order as chunks come back, so the words yielded are
+    exactly the same as in a serial run.
+    """
+    claimed: set[str] = set()
+    with Pool(
+        processes=jobs,
+        initializer=_set_worker_frequencies,
+        initargs=(jpdb_frequencies,),
+    ) as pool:
+        # at most 2 chunks per process are in flight, so memory stays bounded
+        pending: deque[AsyncResult] = deque()
+
+        def claim_oldest() -> Iterator[dict[str, Any]]:
+            for candidate in pending.popleft().get():
+                word_info = _claim(candidate, claimed)
+                if word_info is not None:
+                    yield word_info
+
+        for text in iter_simplified_jmdict_text_chunks(jmdict_archive_file, chunk_size):
+            if len(pending) == 2*jobs:
+                yield from claim_oldest()
+            pending.append(pool.apply_async(_candidates_in_text_chunk, (text,)))
+        while pending:
+            yield from claim_oldest()
+
+
+class WordSelection:
+    """The most frequent verbs and adjectives seen so far, up to a limit per category,
+    and optionally a quota per type.
+
+    Each type keeps a bounded heap, so memory scales with the limits rather than with
+    the number of words seen.
+    """
+    limit_per_category: int
+    """The maximum number of verbs, and of adjectives."""
+    quotas: dict[VerbType | AdjectiveType, int]
+    """The maximum number of words of each type, for types that have one."""
+
+    _heaps: dict[VerbType | AdjectiveType, list[tuple[int, int, dict[str, Any]]]]
+    """The best words of each type, as a max-heap by frequency then arrival order."""
+    _word_count: int
+    """How many words have been added, to break ties between equal frequencies."""
+
+    def __init__(
+        self,
+        limit_per_category: int,
+        quotas: dict[VerbType | AdjectiveType, int] | None = None,
+    ):
+        self.limit_per_category = limit_per_category
+        self.quotas = quotas or {}
+        self._heaps = {}
+        self._word_count = 0
+
+    def add(self, word_info: dict[str, Any]) -> None:
+        """Keep the given word if it's among the most frequent of its type so far.
+
+        Words with equal frequencies are ranked in the order they're added.
+        """
+        word_type: VerbType | AdjectiveType = word_info['type']
+        limit = min(
+            self.quotas.get(word_type, self.limit_per_category),
+            self.limit_per_category,
+        )
+        if limit <= 0:
+            return
+
+        # heapq is a min-heap, so the least frequent (highest) ranks are negated to
+        # be popped first
+        item = (-word_info['frequency'], -self._word_count, word_info)
+        self._word_count += 1
+        heap = self._heaps.setdefault(word_type, [])
+        if len(heap) < limit:
+            heapq.heappush(heap, item)
+        else:
+            heapq.heappushpop(heap, item)
+
+    def _best(
+        self, category: type[VerbType] | type[AdjectiveType]
+    ) -> list[dict[str, Any]]:
+        """Return the most frequent words of the given category, most frequent first."""
+        items = [
+            item
+            for word_type, heap in self._heaps.items()
+            if isinstance(word_type, category)
+            for item in heap
+        ]
+        items.sort(reverse=True)
+        return [word_info for *_, word_info in items[:self.limit_per_category]]
+
+    def verbs(self) -> list[dict[str, Any]]:
+        """Return the most frequent verbs, most frequent first."""
+        return self._best(VerbType)
+
+    def adjectives(self) -> list[dict[str, Any]]:
+        """Return the most frequent adjectives, most frequent first."""
+        return self._best(AdjectiveType)
+
+
+def parse_quota(quota: str) -> tuple[VerbType | AdjectiveType, int]:
+    """Return the word type and limit in a quota like "verb-godan=50".
+
+    Raise argparse.ArgumentTypeError if it's malformed.
+    """
+    type_str, separator, limit = quota.partition('=')
+    try:
+        word_type = (
+            VerbType(type_str) if type_str.startswith('verb')
+            else AdjectiveType(type_str)
+        )
+        if not separator or int(limit) < 0:
+            raise ValueError
+    except ValueError:
+        raise argparse.ArgumentTypeError(
+            f'"{quota}" is not a quota like "verb-godan=50"'
+        ) from None
+    return word_type, int(limit)
+
+
+class ValidationFailure(NamedTuple):
+    """A word that can't be asked in a quiz."""
+    word_info: dict[str, Any]
+    """The word."""
+    reason: str
+    """Why it can't be asked."""
+
+
+def validation_error(word_info: dict[str, Any]) -> str | None:
+    """Return why the given word can't be asked in a quiz, or None if its type is
+    legal and it, and its kana reading, can be conjugated in every inflection of its
+    type.
+    """
+    try:
+        word_type = parse_word_type(word_info['word'], word_info['type'])
+    except ValueError as error:
+        return str(error)
+
+    if isinstance(word_type, VerbType):
+        inflections = VerbInflection.all()
+        conjugate = conjugator.conjugate_verb
+    else:
+        inflections = AdjectiveInflection.all(word_type)
+        conjugate = conjugator.conjugate_adjective
+    for spelling in (word_info['word'], word_info['kana']):
+        if spelling is None:
+            continue
+        for inflection in inflections:
+            try:
+                conjugated = conjugate(spelling, word_type, inflection)
+            except Exception as error:
+                return f'{spelling} {inflection.formatted()}: {error}'
+            if not conjugated:
+                return f'{spelling} {inflection.formatted()}: no conjugation'
+    return None
+
+
+def _validation_errors(words: Sequence[dict[str, Any]]) -> list[tuple[int, str]]:
+    """Return the index in the given words and the validation error of each invalid
+    one.
+    """
+    errors = []
+    for index, word_info in enumerate(words):
+        error = validation_error(word_info)
+        if error is not None:
+            errors.append((index, error))
+    return errors
+
+
+def validate_words(
+    words: Sequence[dict[str, Any]], jobs: int, chunk_size: int = 200
+) -> list[ValidationFailure]:
+    """Return the words that can't be asked in a quiz, and why, in order.
+
+    With more than 1 job, chunks of words are conjugated in a pool of `jobs` processes;
+    only their invalid indices and errors are sent back.
+    """
+    chunk_starts = range(0, len(words), chunk_size)
+    failures = []
+    if jobs <= 1:
+        for start in chunk_starts:
+            for index, error in _validation_errors(words[start:start + chunk_size]):
+                failures.append(ValidationFailure(words[start + index], error))
+        return failures
+
+    with Pool(processes=jobs) as pool:
+        # at most 2 chunks per process are in flight, like while merging
+        pending: deque[tuple[int, AsyncResult]] = deque()
+
+        def collect_oldest() -> None:
+            start, result = pending.popleft()
+            for index, error in result.get():
+                failures.append(ValidationFailure(words[start + index], error))
+
+        for start in chunk_starts:
+            if len(pending) == 2*jobs:
+                collect_oldest()
+            pending.append((start, pool.apply_async(
+                _validation_errors, (words[start:start + chunk_size],)
+            )))
+        while pending:
+            collect_oldest()
+    return failures
+
+
+class VocabDiff(NamedTuple):
+    """The entries that differ between two vocabs. Entries are told apart by their
+    word and kana reading.
+    """
+    added: list[dict[str, Any]]
+    """The entries only in the new vocab."""
+    removed: list[dict[str, Any]]
+    """The entries only in the old vocab."""
+    retyped: list[tuple[dict[str, Any], dict[str, Any]]]
+    """The old and new entries whose type changed."""
+
+    def __bool__(self) -> bool:
+        return bool(self.added or self.removed or self.retyped)
+
+    def to_json(self) -> dict[str, Any]:
+        """Return the diff as a JSON-serialisable dict."""
+        return {
+            'added': [_vocab_entry(word_info) for word_info in self.added],
+            'removed': [_vocab_entry(word_info) for word_info in self.removed],
+            'retyped': [
+                {**_vocab_entry(new), 'old_type': old['type']}
+                for old, new in self.retyped
+            ],
+        }
+
+    def formatted(self) -> str:
+        """Return the diff as a line per entry, then a summary."""
+        def entry(word_info: dict[str, Any]) -> str:
+            kana_reading = word_info['kana']
+            return word_info['word'] + (f' ({kana_reading})' if kana_reading else '')
+
+        lines = [
+            *(f'+ {entry(new)} {new["type"]}' for new in self.added),
+            *(f'- {entry(old)} {old["type"]}' for old in self.removed),
+            *(
+                f'~ {entry(new)} {old["type"]} → {new["type"]}'
+                for old, new in self.retyped
+            ),
+        ]
+        lines.append(
+            f'{len(self.added)} added, {len(self.removed)} removed,'
+            + f' {len(self.retyped)} retyped.'
+        )
+        return '\n'.join(lines)
+
+
+def _vocab_entry(word_info: dict[str, Any]) -> dict[str, Any]:
+    """Return the given word without any field but the ones in vocab files."""
+    entry = {
+        'word': word_info['word'],
+        'kana': word_info['kana'],
+        'type': word_info['type'],
+    }
+    if word_info.get('frequency') is not None:
+        entry['frequency'] = word_info['frequency']
+    return entry
+
+
+def _vocab_key(word_info: dict[str, Any]) -> tuple[str, str | None]:
+    return word_info['word'], word_info['kana']
+
+
+def diff_vocab(
+    old_words: Iterable[dict[str, Any]], new_words: Iterable[dict[str, Any]]
+) -> VocabDiff:
+    """Return the entries that differ between the given vocabs, in the order they
+    come in.
+    """
+    old_by_key: dict[tuple[str, str | None], dict[str, Any]] = {}
+    for word_info in old_words:
+        old_by_key.setdefault(_vocab_key(word_info), word_info)
+    new_by_key: dict[tuple[str, str | None], dict[str, Any]] = {}
+    for word_info in new_words:
+        new_by_key.setdefault(_vocab_key(word_info), word_info)
+
+    return VocabDiff(
+        added=[
+            new for key, new in new_by_key.items() if key not in old_by_key
+        ],
+        removed=[
+            old for key, old in old_by_key.items() if key not in new_by_key
+        ],
+        retyped=[
+            (old_by_key[key], new) for key, new in new_by_key.items()
+            if key in old_by_key and old_by_key[key]['type'] != new['type']
+        ],
+    )
+
+
+def patch_vocab(
+    old_words: Iterable[dict[str, Any]], new_words: Sequence[dict[str, Any]]
+) -> list[dict[str, Any]]:
+    """Return the new vocab with the entries already in the old one kept in their
+    order, followed by the added ones, so that patching a file moves as little as
+    possible.
+    """
+    new_by_key: dict[tuple[str, str | None], dict[str, Any]] = {}
+    for word_info in new_words:
+        new_by_key.setdefault(_vocab_key(word_info), word_info)
+
+    patched = []
+    for word_info in old_words:
+        new = new_by_key.pop(_vocab_key(word_info), None)
+        if new is not None:
+            patched.append(new)
+    patched.extend(new_by_key.values())
+    return patched
+
+
+def write_vocab(
+    words: Sequence[dict[str, Any]], file_path: str, output_format: str
+) -> None:
+    """Write the given words to a vocab file in the given format, atomically: they're
+    written to a temporary file next to it, then moved over it, so that the file is
+    never left half-written.
+    """
+    directory = path.dirname(path.abspath(file_path))
+    with tempfile.NamedTemporaryFile(
+        dir=directory, suffix='.tmp', delete=False
+    ) as temp_file:
+        try:
+            if output_format == 'binary':
+                vocab.write_binary_vocab(
+                    [_vocab_entry(word_info) for word_info in words], temp_file
+                )
+            elif output_format == 'json':
+                temp_file.write(json.dumps(
+                    [_vocab_entry(word_info) for word_info in words],
+                    ensure_ascii=False,
+                    indent=0,
+                ).encode())
+        except BaseException:
+            os.remove(temp_file.name)
+            raise
+
+    try:
+        if output_format == 'sqlite':
+            vocab.write_sqlite_vocab(words, temp_file.name)
+        # temporary files are only readable by their owner
+        umask = os.umask(0)
+        os.umask(umask)
+        os.chmod(temp_file.name, 0o666 & ~umask)
+        os.replace(temp_file.name, file_path)
+    except BaseException:
+        os.remove(temp_file.name)
+        raise
+
+
 if __name__ == '__main__':
     logging.basicConfig(level=logging.INFO)
 
@@ -109,13 +997,98 @@ if __name__ == '__main__':
     parser.add_argument(
         '-o',
         '--output',
-        help='where to save the final JSON',
+        help='where to save the final vocab file',
         type=str,
         default='vocab.json',
     )
+    parser.add_argument(
+        '-f',
+        '--format',
+        help="""the vocab file format; binary files are memory-mapped by the quizzers,
+        and sqlite files let them filter words by type and frequency (default: binary
+        if the output ends in .bin, sqlite if it ends in .sqlite3 or .db, else json)""",
+        choices=('json', 'binary', 'sqlite'),
+        default=None,
+    )
+    parser.add_argument(
+        '-u',
+        '--update',
+        action='store_true',
+        help="""patch the existing output with only the entries that were added,
+        removed or retyped, and print them, instead of overwriting it""",
+    )
+    parser.add_argument(
+        '--diff-output',
+        help="""where to save the added, removed and retyped entries as JSON, e.g. to
+        invalidate caches entry by entry""",
+        type=str,
+        default=None,
+    )
+    parser.add_argument(
+        '--stats',
+        help="""where to save the wall time, CPU time, peak memory and throughput of
+        each stage of the run as JSON""",
+        type=str,
+        default=None,
+    )
+    parser.add_argument(
+        '--keep-invalid',
+        action='store_true',
+        help="""keep the words that can't be conjugated in every inflection instead of
+        dropping them; they're reported either way""",
+    )
+    parser.add_argument(
+        '--validation-output',
+        help="""where to save a summary of the conjugation check of every word, with
+        the words that failed it, as JSON""",
+        type=str,
+        default=None,
+    )
+    parser.add_argument(
+        '-q',
+        '--quota',
+        help="""the maximum number of words of a type, like "verb-godan=50"; can be
+        repeated""",
+        type=parse_quota,
+        action='append',
+    )
+    parser.add_argument(
+        '-j',
+        '--jobs',
+        help="""the number of processes decoding and merging JMdict entries, then
+        conjugating the words kept""",
+        type=int,
+        default=os.cpu_count() or 1,
+    )
+    parser.add_argument(
+        '--jmdict-path',
+        help='use this Simplified JMdict zip instead of fetching it',
+        type=str,
+        default=None,
+    )
+    parser.add_argument(
+        '--jpdb-path',
+        help='use this JPDB frequency list zip instead of fetching it',
+        type=str,
+        default=None,
+    )
+    parser.add_argument(
+        '--cache-dir',
+        help='where to keep fetched archives for later runs',
+        type=str,
+        default=default_cache_directory(),
+    )
+    parser.add_argument(
+        '--no-cache',
+        action='store_true',
+        help="don't cache fetched archives, nor use cached ones",
+    )
     args = parser.parse_args()
 
-    if path.isfile(args.output):
+    if args.jobs < 1:
+        parser.error('--jobs must be at least 1')
+
+    if path.isfile(args.output) and not args.update:
         answer = input(
             f'warning: "{args.output}" already exists. do you want to overwrite it?'
             + ' (y/N): '
@@ -124,139 +1097,170 @@ if __name__ == '__main__':
             print('cancelled.')
             exit(0)
 
+    stats = RunStats()
     print(
         f'building "{args.output}" with the {args.limit_per_type} most frequent verbs &'
         + f' adjectives (total {args.limit_per_type*2})\n'
     )
 
     print(
-        '[1/3] fetching the JPDB frequency list'
+        '[1/4] fetching the JPDB frequency list'
         + ' @ https://github.com/Kuuuube/yomitan-dictionaries…'
         '\n      fetching the Simplified JMdict'
         + '   @ https://github.com/scriptin/jmdict-simplified…'
     )
 
-    with Pool(processes=2) as pool:
-        jpdb_process = pool.apply_async(get_jpdb_frequency_list_json)
-        jmdict_process = pool.apply_async(get_simplified_jmdict_json)
-
+    # both archives are fetched at once, then decoded an entry at a time straight from
+    # the zip
+    cache_directory = None if args.no_cache else args.cache_dir
+    with ThreadPool(processes=2) as pool, stats.stage('fetch', 'byte') as counts:
+        jpdb_fetch = pool.apply_async(
+            open_archive, (JPDB_URL, args.jpdb_path, cache_directory)
+        )
+        jmdict_fetch = pool.apply_async(
+            open_archive, (JMDICT_URL, args.jmdict_path, cache_directory)
+        )
         try:
-            frequency_json = jpdb_process.get()
+            jpdb_zip = jpdb_fetch.get()
         except Exception:
             logging.error('could not fetch the JPDB frequency list.')
             raise
-
         try:
-            jmdict_json = jmdict_process.get()
+            jmdict_zip = jmdict_fetch.get()
         except Exception:
+            jpdb_zip.close()
             logging.error('could not fetch the Simplified JMdict.')
             raise
-
-    # first, we load the words from the JPDB frequency list json
-    jpdb_words = {}
-    for entry in frequency_json:
-        word: str = entry[0]
-        if len(word) == 1:
-            # there are no 1-character-long verbs or adjectives
-            continue
-
-        try:
-            frequency: int = entry[2]['value']
-        except KeyError:
-            frequency: int = entry[2]['frequency']['value']
-        # we'll copy it to the appropriate dict (or discard the word altogether) later
-        jpdb_words[word] = {'frequency': frequency}
-
-    # the whole json is a bit heavy. we don't need it anymore
-    del frequency_json
-
-    # now we separate them into verbs and adjectives, also filling the type, kana, and
-    # frequency data
-
-    jpdb_verbs = []
-    jpdb_adjectives = []
-
-    print('[2/3] merging word + frequency data…')
-    for entry in jmdict_json:
-        # an entry might have multiple kanji & kana spellings. we'll stick with non-rare
-        # ones only and treat them as distinct words (so we can analyse each spelling's
-        # frequency)
-        spellings = (
-            *entry['kanji'],
-            *entry['kana']
+        counts['items'] = sum(
+            os.fstat(archive.fileno()).st_size for archive in (jpdb_zip, jmdict_zip)
         )
-        for spelling in spellings:
-            if not spelling['common']:
-                continue
 
-            word = spelling['text']
+    with jpdb_zip, stats.stage('parse frequencies', 'word') as counts:
+        try:
+            jpdb_frequencies = read_jpdb_frequencies(jpdb_zip)
+        except Exception:
+            jmdict_zip.close()
+            logging.error('could not read the JPDB frequency list.')
+            raise
+        counts['items'] = len(jpdb_frequencies)
 
-            if len(word) == 1:
-                # there are no 1-character-long verbs or adjectives
-                continue
+    print('[2/4] merging word + frequency data and keeping the most frequent…')
+    selection = WordSelection(args.limit_per_type, dict(args.quota or ()))
+    with jmdict_zip, stats.stage('parse & merge', 'merged word') as counts:
+        try:
+            if args.jobs > 1:
+                merged_words = iter_merged_words_parallel(
+                    jmdict_zip, jpdb_frequencies, args.jobs
+                )
+            else:
+                merged_words = iter_merged_words(
+                    iter_simplified_jmdict_words(jmdict_zip), jpdb_frequencies
+                )
+            for word_info in merged_words:
+                selection.add(word_info)
+                counts['items'] += 1
+        except Exception:
+            logging.error('could not read the Simplified JMdict.')
+            raise
 
-            if word not in jpdb_words:
-                continue
+    # the frequency list is a bit heavy. we don't need it anymore
+    del jpdb_frequencies
 
-            # it's at least in the JPDB frequency list - but is it the right type?
-            tags: list[str] = entry['sense'][0]['partOfSpeech']
-            for tag in tags:
-                if tag in wanted_word_types:
-                    kana_reading = entry['kana'][0]['text']
-                    word_info = {
-                        'word': word,
-                        'kana': kana_reading if kana_reading != word else None,
-                        'type': wanted_word_types[tag],
-                        'frequency': jpdb_words[word]['frequency']
-                    }
-                    is_verb = tag.startswith('v')
-                    if is_verb:
-                        jpdb_verbs.append(word_info)
-                    else:
-                        jpdb_adjectives.append(word_info)
-                    continue
+    with stats.stage('sort & trim', 'word') as counts:
+        words = [
+            {**word_info, 'type': word_info['type'].value}
+            for word_info in (*selection.verbs(), *selection.adjectives())
+        ]
+        counts['items'] = len(words)
 
-            # this isn't the right type of word; discard it
-            del jpdb_words[word]
-
-    # finally, we limit both verbs and adjectives to `args.limit_per_type` items
-
-    def sort_by_frequency(word_list: list[dict[str, str]]) -> None:
-        """Sort the given word list by frequency in ascending order."""
-        word_list.sort(key=lambda x: x['frequency'])
-
-    print('[3/3] sorting and trimming the final output…')
-    sort_by_frequency(jpdb_verbs)
-    jpdb_verbs = jpdb_verbs[:args.limit_per_type]
-    # we don't need the 'frequency' field anymore
-    jpdb_verbs = tuple(
-        {
-            'word': verb['word'],
-            'kana': verb['kana'],
-            'type': verb['type'].value,
-        } for verb in jpdb_verbs
+    print('[3/4] conjugating every word in every inflection…')
+    with stats.stage('validate', 'word') as counts:
+        validation_start = time.perf_counter()
+        checked_count = counts['items'] = len(words)
+        failures = validate_words(words, args.jobs)
+        for failure in failures:
+            logging.warning(f'{failure.reason}.')
+        if failures and not args.keep_invalid:
+            invalid = {id(failure.word_info) for failure in failures}
+            words = [word_info for word_info in words if id(word_info) not in invalid]
+    validation_summary = {
+        'checked': checked_count,
+        'invalid': len(failures),
+        'dropped': 0 if args.keep_invalid else len(failures),
+        'engine': conjugator.get_verb_engine().value,
+        'seconds': round(time.perf_counter() - validation_start, 3),
+        'failures': [
+            {**_vocab_entry(failure.word_info), 'reason': failure.reason}
+            for failure in failures
+        ],
+    }
+    print(
+        f'      {validation_summary["checked"]} words checked,'
+        + f' {validation_summary["invalid"]} invalid,'
+        + f' {validation_summary["dropped"]} dropped.'
     )
+    if args.validation_output:
+        with open(args.validation_output, 'w') as validation_file:
+            json.dump(validation_summary, validation_file, ensure_ascii=False, indent=4)
 
-    sort_by_frequency(jpdb_adjectives)
-    jpdb_adjectives = jpdb_adjectives[:args.limit_per_type]
-    jpdb_adjectives = tuple(
-        {
-            'word': adjective['word'],
-            'kana': adjective['kana'],
-            'type': adjective['type'].value
-        } for adjective in jpdb_adjectives
+    print('[4/4] writing the final output…')
+    output_format: str = args.format or (
+        'binary' if args.output.endswith('.bin')
+        else 'sqlite' if args.output.endswith(('.sqlite3', '.db'))
+        else 'json'
     )
 
-    try:
-        with open(args.output, 'w') as output_file:
+    with stats.stage('write', 'word') as counts:
+        old_words: list[dict[str, Any]] = []
+        if args.update and path.isfile(args.output):
+            try:
+                old_vocab = vocab.load_vocab(args.output)
+                old_words = list(old_vocab)
+                if isinstance(old_vocab, (vocab.BinaryVocab, vocab.SQLiteVocab)):
+                    old_vocab.close()
+            except ValueError:
+                logging.error(
+                    f'{args.output} is malformed. run without --update to overwrite it.'
+                )
+                exit(2)
+            words = patch_vocab(old_words, words)
+        diff = diff_vocab(old_words, words)
+        if args.update:
+            print(diff.formatted())
+
+        if args.diff_output:
+            with open(args.diff_output, 'w') as diff_file:
+                json.dump(diff.to_json(), diff_file, ensure_ascii=False, indent=4)
+
+        # the frequencies can change without any entry being added, removed or retyped
+        if args.update and old_words and words == old_words:
+            print(f'"{args.output}" is already up to date.')
+        else:
+            try:
+                write_vocab(words, args.output, output_format)
+            except OSError:
+                logging.error(f'could not write the result to "{args.output}".')
+                raise
+            counts['items'] = len(words)
+
+    report = stats.report()
+    if args.stats:
+        with open(args.stats, 'w') as stats_file:
             json.dump(
-                (*jpdb_verbs, *jpdb_adjectives),
-                output_file,
-                ensure_ascii=False,
-                indent=0,
+                {
+                    'timestamp': time.strftime('%Y-%m-%dT%H:%M:%S%z'),
+                    'python': sys.version.split()[0],
+                    'platform': platform.platform(),
+                    'jobs': args.jobs,
+                    'limit_per_type': args.limit_per_type,
+                    **report,
+                },
+                stats_file,
+                indent=4,
             )
-    except OSError:
-        logging.error(f'could not write the result to "{args.output}".')
-        raise
 
-    print('done.')
+    peak_memory = report['total']['peak_rss_mib']
+    print(
+        f'done in {report["total"]["wall_seconds"]:.1f}s'
+        + ('.' if peak_memory is None else f' (peak memory: {peak_memory:.0f} MiB).')
+    )
@@ -42,36 +42,51 @@ li.checked::marker { content: &quot;\2612&quot;; }
 <context>
     <name>Kaeru</name>
     <message>
-        <location filename="../kaeru.py" line="115"/>
-        <location filename="../kaeru.py" line="133"/>
+        <location filename="../kaeru.py" line="207"/>
+        <source>Loading…</source>
+        <translation>Carregando…</translation>
+    </message>
+    <message>
+        <location filename="../kaeru.py" line="254"/>
+        <location filename="../kaeru.py" line="272"/>
         <source>POLITE</source>
         <translation>FORMAL</translation>
     </message>
     <message>
-        <location filename="../kaeru.py" line="117"/>
+        <location filename="../kaeru.py" line="256"/>
         <source>て-FORM</source>
         <translatorcomment>Apesar de não ser ideal, o hífen &quot;une&quot; as duas palavras, separando-as dos outros itens da conjugação apresentada.</translatorcomment>
         <translation>FORMA-て</translation>
     </message>
     <message>
-        <location filename="../kaeru.py" line="120"/>
-        <location filename="../kaeru.py" line="131"/>
+        <location filename="../kaeru.py" line="259"/>
+        <location filename="../kaeru.py" line="270"/>
         <source>PAST</source>
         <translation>PASSADO</translation>
     </message>
     <message>
-        <location filename="../kaeru.py" line="122"/>
-        <location filename="../kaeru.py" line="129"/>
+        <location filename="../kaeru.py" line="261"/>
+        <location filename="../kaeru.py" line="268"/>
         <source>NEGATIVE</source>
         <translation>NEGATIVO</translation>
     </message>
     <message>
-        <location filename="../kaeru.py" line="209"/>
+        <location filename="../kaeru.py" line="382"/>
+        <source>That is the dictionary form.</source>
+        <translation>Essa é a forma de dicionário.</translation>
+    </message>
+    <message>
+        <location filename="../kaeru.py" line="383"/>
+        <source>That is the {} form.</source>
+        <translation>Essa é a forma {}.</translation>
+    </message>
+    <message>
+        <location filename="../kaeru.py" line="400"/>
         <source>The correct answer is</source>
         <translation>A resposta correta é</translation>
     </message>
     <message>
-        <location filename="../kaeru.py" line="213"/>
+        <location filename="../kaeru.py" line="405"/>
         <source>Incorrect answer; try again.</source>
         <translation>Resposta incorreta; tente novamente.</translation>
     </message>
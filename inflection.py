@@ -1,9 +1,33 @@
 """Inflections for adjectives and verbs."""
 
+from collections.abc import Iterable
 from enum import Enum
+from fractions import Fraction
+import math
 import random
+from typing import ClassVar, TypeVar
 
-import japanese_verb_conjugator_v2 as jvc
+
+T = TypeVar('T')
+
+
+def _draw_table(outcomes: Iterable[tuple[T, Fraction]]) -> tuple[T, ...]:
+    """Return the given outcomes, each repeated in proportion to its probability, so
+    that a uniform draw from the tuple has the same distribution.
+
+    An outcome can be given several times; its probabilities add up.
+    """
+    probabilities: dict[T, Fraction] = {}
+    for outcome, probability in outcomes:
+        probabilities[outcome] = probabilities.get(outcome, Fraction(0)) + probability
+    denominator = math.lcm(
+        *(probability.denominator for probability in probabilities.values())
+    )
+    return tuple(
+        outcome
+        for outcome, probability in probabilities.items()
+        for _ in range(probability.numerator * denominator // probability.denominator)
+    )
 
 
 class AdjectiveType(Enum):
@@ -61,7 +85,11 @@ class VerbType(Enum):
 
 
 class AdjectiveInflection:
-    """Inflection (tense, polarity, politeness) for an adjective."""
+    """Inflection (tense, polarity, politeness) for an adjective.
+
+    Inflections are immutable and interned: constructing one returns the single shared
+    instance for that combination of features, identified by a small integer `id`.
+    """
     class Tense(Enum):
         """The time of the state."""
         NONPAST = 'nonpast'
@@ -87,20 +115,160 @@ class AdjectiveInflection:
         POLITE = 'polite'
         """Formal. E.g. 高いです, 立派です."""
 
+    __slots__ = ('tense', 'polarity', 'politeness', 'id')
+
     tense: Tense
     polarity: Polarity
     politeness: Politeness | None
-
-    def __init__(
-        self,
+    id: int
+    """Stable identifier, from 0 to COUNT - 1."""
+
+    COUNT: ClassVar[int]
+    """The number of distinct adjective inflections."""
+    _instances: ClassVar[dict[tuple, 'AdjectiveInflection']]
+    """Every inflection, by its features."""
+    _instances_by_id: ClassVar[tuple['AdjectiveInflection', ...]]
+    """Every inflection, by id."""
+    _valid_inflections: ClassVar[dict[AdjectiveType, tuple['AdjectiveInflection', ...]]]
+    """The inflections each adjective type can be conjugated to."""
+    _random_inflections: ClassVar[
+        dict[AdjectiveType, tuple['AdjectiveInflection', ...]]
+    ]
+    """The inflections each adjective type is asked in, each repeated in proportion to
+    how likely it is (see _random_outcomes())."""
+
+    def __new__(
+        cls,
         *,
         tense: Tense = Tense.NONPAST,
         polarity: Polarity = Polarity.POSITIVE,
         politeness: Politeness | None = None,
-    ):
-        self.tense = tense
-        self.polarity = polarity
-        self.politeness = politeness
+    ) -> 'AdjectiveInflection':
+        return cls._instances[(tense, polarity, politeness)]
+
+    @classmethod
+    def _create_instances(cls) -> None:
+        """Create the instance for every combination of features, numbered in the
+        order the enums are declared.
+        """
+        instances = []
+        for tense in cls.Tense:
+            for polarity in cls.Polarity:
+                for politeness in (None, *cls.Politeness):
+                    inflection = object.__new__(cls)
+                    object.__setattr__(inflection, 'tense', tense)
+                    object.__setattr__(inflection, 'polarity', polarity)
+                    object.__setattr__(inflection, 'politeness', politeness)
+                    object.__setattr__(inflection, 'id', len(instances))
+                    instances.append(inflection)
+
+        cls.COUNT = len(instances)
+        cls._instances_by_id = tuple(instances)
+        cls._instances = {
+            (inflection.tense, inflection.polarity, inflection.politeness): inflection
+            for inflection in instances
+        }
+        cls._valid_inflections = {}
+        for adjective_type in AdjectiveType:
+            accepts_plain_copula = adjective_type is AdjectiveType.NA
+            cls._valid_inflections[adjective_type] = tuple(
+                inflection for inflection in instances
+                if inflection.is_nondefault()
+                and (
+                    accepts_plain_copula
+                    or inflection.politeness is not cls.Politeness.PLAIN
+                )
+                and (
+                    not accepts_plain_copula
+                    or inflection.politeness is not None
+                )
+            )
+        cls._random_inflections = {
+            adjective_type: _draw_table(cls._random_outcomes(adjective_type))
+            for adjective_type in AdjectiveType
+        }
+
+    @classmethod
+    def _random_outcomes(
+        cls, adjective_type: AdjectiveType
+    ) -> Iterable[tuple['AdjectiveInflection', Fraction]]:
+        """Yield every inflection generate_random() can return for the given adjective
+        type with the probability of each way of getting it.
+
+        The features are drawn one at a time: a random tense, polarity and politeness
+        (always POLITE for い-adjectives, which don't accept the plain copula), then a
+        random one of them is forced to its nondefault value.
+        """
+        politeness_choices = [cls.Politeness.POLITE]
+        if adjective_type is AdjectiveType.NA:
+            politeness_choices.append(cls.Politeness.PLAIN)
+        features = ('tense', 'polarity', 'politeness')
+        probability = Fraction(
+            1, len(cls.Tense) * len(cls.Polarity) * len(politeness_choices)
+            * len(features)
+        )
+        for tense in cls.Tense:
+            for polarity in cls.Polarity:
+                for politeness in politeness_choices:
+                    for feature in features:
+                        match feature:
+                            case 'tense':
+                                yield cls(
+                                    tense=cls.Tense.PAST,
+                                    polarity=polarity,
+                                    politeness=politeness,
+                                ), probability
+                            case 'polarity':
+                                yield cls(
+                                    tense=tense,
+                                    polarity=cls.Polarity.NEGATIVE,
+                                    politeness=politeness,
+                                ), probability
+                            case 'politeness':
+                                yield cls(
+                                    tense=tense,
+                                    polarity=polarity,
+                                    politeness=cls.Politeness.POLITE,
+                                ), probability
+
+    def __setattr__(self, name, value):
+        raise AttributeError(f'{type(self).__name__} is immutable')
+
+    def __delattr__(self, name):
+        raise AttributeError(f'{type(self).__name__} is immutable')
+
+    def __reduce__(self):
+        return (AdjectiveInflection.from_id, (self.id,))
+
+    def __repr__(self) -> str:
+        return (
+            f'AdjectiveInflection(tense={self.tense}, polarity={self.polarity},'
+            + f' politeness={self.politeness})'
+        )
+
+    @classmethod
+    def from_id(cls, inflection_id: int) -> 'AdjectiveInflection':
+        """Return the inflection with the given id."""
+        return cls._instances_by_id[inflection_id]
+
+    @classmethod
+    def all(cls, adjective_type: AdjectiveType) -> tuple['AdjectiveInflection', ...]:
+        """Return every inflection the given adjective type can be conjugated to, in
+        order of id.
+
+        That's every inflection with at least 1 nondefault feature; い-adjectives never
+        have Politeness.PLAIN (it'll be None), and な-adjectives always have a
+        politeness. generate_random() only draws some of them.
+        """
+        return cls._valid_inflections[adjective_type]
+
+    def is_nondefault(self) -> bool:
+        """Return whether at least 1 of the features has a nondefault value."""
+        return (
+            self.tense is not AdjectiveInflection.Tense.NONPAST
+            or self.polarity is not AdjectiveInflection.Polarity.POSITIVE
+            or self.politeness is AdjectiveInflection.Politeness.POLITE
+        )
 
     def formatted(self):
         """Return each nondefault feature inside brackets, separated by spaces."""
@@ -121,65 +289,175 @@ class AdjectiveInflection:
         or else there'd be no inflection at all.
 
         い-adjectives never have Politeness.PLAIN (it'll be None).
+
+        The inflections are drawn with the probabilities of _random_outcomes(), from
+        a table built at import time.
         """
-        tense = random.choice(list(AdjectiveInflection.Tense))
-        polarity = random.choice(list(AdjectiveInflection.Polarity))
-        valid_features = ['tense', 'polarity', 'politeness']
+        return random.choice(AdjectiveInflection._random_inflections[adjective_type])
 
-        politeness_choices = [AdjectiveInflection.Politeness.POLITE]
 
-        accepts_plain_copula = adjective_type is AdjectiveType.NA
-        if accepts_plain_copula:
-            politeness_choices.append(
-                AdjectiveInflection.Politeness.PLAIN
-            )
-        politeness = random.choice(politeness_choices)
-
-        required_nondefault_feature = random.choice(valid_features)
-        # force at least one nondefault value
-        match required_nondefault_feature:
-            case 'tense':
-                tense = AdjectiveInflection.Tense.PAST
-            case 'polarity':
-                polarity = AdjectiveInflection.Polarity.NEGATIVE
-            case 'politeness':
-                politeness = AdjectiveInflection.Politeness.POLITE
-
-        return AdjectiveInflection(
-            tense=tense, polarity=polarity, politeness=politeness
-        )
+AdjectiveInflection._create_instances()
 
 
 class VerbInflection:
-    """Inflection (base form, tense, polarity) for a verb."""
+    """Inflection (base form, tense, polarity) for a verb.
+
+    Inflections are immutable and interned: constructing one returns the single shared
+    instance for that combination of features, identified by a small integer `id`.
+    """
+    # the values are japanese_verb_conjugator_v2's, which is only imported when it
+    # conjugates (see conjugator.VerbEngine.JVC)
     class BaseForm(Enum):
         """The base for the conjugation."""
-        PLAIN = jvc.BaseForm.PLAIN.value
-        POLITE = jvc.BaseForm.POLITE.value
-        TE = jvc.BaseForm.TE.value
+        PLAIN = 'pla'
+        POLITE = 'pol'
+        TE = 'te'
+
+    class Tense(Enum):
+        """The time of the action."""
+        NONPAST = 'nonpast'
+        PAST = 'past'
 
-    Tense = jvc.Tense
-    """The time of the action."""
+    class Polarity(Enum):
+        """Whether the verb is positive or negative."""
+        POSITIVE = 'pos'
+        NEGATIVE = 'neg'
 
-    Polarity = jvc.Polarity
-    """Whether the verb is positive or negative."""
+    __slots__ = ('base_form', 'tense', 'polarity', 'id')
 
     base_form: BaseForm
     tense: Tense | None
     polarity: Polarity
-
-    def __init__(
-        self,
+    id: int
+    """Stable identifier, from 0 to COUNT - 1."""
+
+    COUNT: ClassVar[int]
+    """The number of distinct verb inflections."""
+    _instances: ClassVar[dict[tuple, 'VerbInflection']]
+    """Every inflection, by its features."""
+    _instances_by_id: ClassVar[tuple['VerbInflection', ...]]
+    """Every inflection, by id."""
+    _valid_inflections: ClassVar[tuple['VerbInflection', ...]]
+    """The inflections verbs can be conjugated to."""
+    _random_inflections: ClassVar[tuple['VerbInflection', ...]]
+    """The inflections verbs are asked in, each repeated in proportion to how likely it
+    is (see _random_outcomes())."""
+
+    def __new__(
+        cls,
         *,
         base_form: BaseForm = BaseForm.PLAIN,
         tense: Tense | None = None,
         polarity: Polarity = Polarity.POSITIVE,
-    ):
+    ) -> 'VerbInflection':
         if base_form is VerbInflection.BaseForm.TE:
             assert tense is None, 'BaseForm.TE requires Tense to be None'
-        self.base_form = base_form
-        self.tense = tense
-        self.polarity = polarity
+        elif tense is None:
+            tense = VerbInflection.Tense.NONPAST
+        return cls._instances[(base_form, tense, polarity)]
+
+    @classmethod
+    def _create_instances(cls) -> None:
+        """Create the instance for every combination of features, numbered in the
+        order the enums are declared.
+        """
+        instances = []
+        for base_form in cls.BaseForm:
+            tenses = (None,) if base_form is cls.BaseForm.TE else tuple(cls.Tense)
+            for tense in tenses:
+                for polarity in cls.Polarity:
+                    inflection = object.__new__(cls)
+                    object.__setattr__(inflection, 'base_form', base_form)
+                    object.__setattr__(inflection, 'tense', tense)
+                    object.__setattr__(inflection, 'polarity', polarity)
+                    object.__setattr__(inflection, 'id', len(instances))
+                    instances.append(inflection)
+
+        cls.COUNT = len(instances)
+        cls._instances_by_id = tuple(instances)
+        cls._instances = {
+            (inflection.base_form, inflection.tense, inflection.polarity): inflection
+            for inflection in instances
+        }
+        cls._valid_inflections = tuple(
+            inflection for inflection in instances if inflection.is_nondefault()
+        )
+        cls._random_inflections = _draw_table(cls._random_outcomes())
+
+    @classmethod
+    def _random_outcomes(cls) -> Iterable[tuple['VerbInflection', Fraction]]:
+        """Yield every inflection generate_random() can return with the probability of
+        each way of getting it.
+
+        The features are drawn one at a time: a random base form, tense and polarity,
+        then either the base form is redrawn as POLITE or TE, or the polarity is forced
+        to NEGATIVE. The て-form has no tense.
+        """
+        features = ('base_form', 'polarity')
+        forced_base_forms = (cls.BaseForm.POLITE, cls.BaseForm.TE)
+        probability = Fraction(
+            1, len(cls.BaseForm) * len(cls.Tense) * len(cls.Polarity) * len(features)
+        )
+        for base_form in cls.BaseForm:
+            for tense in cls.Tense:
+                for polarity in cls.Polarity:
+                    for feature in features:
+                        match feature:
+                            case 'base_form':
+                                outcomes = [
+                                    (forced, polarity, probability / 2)
+                                    for forced in forced_base_forms
+                                ]
+                            case 'polarity':
+                                outcomes = [
+                                    (base_form, cls.Polarity.NEGATIVE, probability)
+                                ]
+                        for outcome_base_form, outcome_polarity, p in outcomes:
+                            yield cls(
+                                base_form=outcome_base_form,
+                                tense=(
+                                    None if outcome_base_form is cls.BaseForm.TE
+                                    else tense
+                                ),
+                                polarity=outcome_polarity,
+                            ), p
+
+    def __setattr__(self, name, value):
+        raise AttributeError(f'{type(self).__name__} is immutable')
+
+    def __delattr__(self, name):
+        raise AttributeError(f'{type(self).__name__} is immutable')
+
+    def __reduce__(self):
+        return (VerbInflection.from_id, (self.id,))
+
+    def __repr__(self) -> str:
+        return (
+            f'VerbInflection(base_form={self.base_form}, tense={self.tense},'
+            + f' polarity={self.polarity})'
+        )
+
+    @classmethod
+    def from_id(cls, inflection_id: int) -> 'VerbInflection':
+        """Return the inflection with the given id."""
+        return cls._instances_by_id[inflection_id]
+
+    @classmethod
+    def all(cls) -> tuple['VerbInflection', ...]:
+        """Return every inflection verbs can be conjugated to, in order of id.
+
+        That's every inflection with at least 1 nondefault feature; generate_random()
+        only draws some of them.
+        """
+        return cls._valid_inflections
+
+    def is_nondefault(self) -> bool:
+        """Return whether at least 1 of the features has a nondefault value."""
+        return (
+            self.base_form is not VerbInflection.BaseForm.PLAIN
+            or self.tense is not VerbInflection.Tense.NONPAST
+            or self.polarity is not VerbInflection.Polarity.POSITIVE
+        )
 
     def formatted(self):
         """Return each nondefault feature inside brackets, separated by spaces."""
@@ -203,30 +481,11 @@ class VerbInflection:
         or else there'd be no inflection at all.
 
         Verbs with BaseForm.TE never have Tense (it'll be None).
+
+        The inflections are drawn with the probabilities of _random_outcomes(), from
+        a table built at import time.
         """
-        base_form = random.choice(list(VerbInflection.BaseForm))
-        tense = random.choice(list(VerbInflection.Tense))
-        polarity = random.choice(list(VerbInflection.Polarity))
-        valid_features = ['base_form', 'polarity']
-
-        required_nondefault_feature = random.choice(valid_features)
-        match required_nondefault_feature:
-            case 'base_form':
-                base_form = random.choice(
-                    (
-                        VerbInflection.BaseForm.POLITE,
-                        VerbInflection.BaseForm.TE,
-                    )
-                )
-            case 'tense':
-                tense = VerbInflection.Tense.PAST
-            case 'polarity':
-                polarity = VerbInflection.Polarity.NEGATIVE
+        return random.choice(VerbInflection._random_inflections)
 
-        accepts_tense = base_form is not VerbInflection.BaseForm.TE
-        if not accepts_tense:
-            tense = None
 
-        return VerbInflection(
-            base_form=base_form, tense=tense, polarity=polarity
-        )
+VerbInflection._create_instances()
@@ -1,22 +1,25 @@
 """Quiz adjective and verb conjugations on the command line."""
 
 import argparse
-import json
-import random
+import atexit
+from collections.abc import Sequence
 import sqlite3
+import sys
 from sys import exit
 from time import sleep
-import readline
-assert readline  # silence linter error
+from typing import NamedTuple
 import logging
 
-import conjugator
-
+from conjugation_table import ConjugationTable
+from deinflection import DeinflectionIndex
 from inflection import (
     AdjectiveType, AdjectiveInflection,
     VerbType, VerbInflection
 )
 import dbapi
+import quiz_vocab
+import scheduling
+from vocab import VocabWord
 from constants import DATABASE_PATH
 
 
@@ -48,6 +51,111 @@ def formatted_verb_question(
     )
 
 
+class Question(NamedTuple):
+    """A word to conjugate and everything needed to grade the answer."""
+    vocab_word: VocabWord
+    """The word to conjugate."""
+    word_index: int
+    """The index of the word in the words the table and the index were built from."""
+    index: DeinflectionIndex
+    """Every form of the word, among others maybe, to tell which one a wrong answer
+    is."""
+    inflection: VerbInflection | AdjectiveInflection
+    """The inflection to conjugate the word to."""
+    text: str
+    """The question, as shown to the user."""
+    correct_answer: str
+    """The correctly conjugated word."""
+    acceptable_answers: frozenset[str]
+    """Every correct answer: the correctly conjugated word, and its kana reading."""
+
+
+def inflection_question(
+    words: Sequence[VocabWord],
+    table: ConjugationTable,
+    index: DeinflectionIndex,
+    word_index: int,
+    inflection: VerbInflection | AdjectiveInflection,
+    hide_kana: bool = False,
+    hide_word_type: bool = False,
+) -> Question:
+    """Return a question for the word at the given index in the given inflection.
+
+    The words must be the ones the table and the index were built from.
+    """
+    asked_word = words[word_index]
+    kana_reading = asked_word.kana if not hide_kana else None
+    word_type = asked_word.type
+    if isinstance(word_type, VerbType):
+        assert isinstance(inflection, VerbInflection)
+        text = formatted_verb_question(
+            asked_word.word,
+            kana_reading,
+            word_type if not hide_word_type else None,
+            inflection,
+        )
+    else:
+        assert isinstance(inflection, AdjectiveInflection)
+        text = formatted_adjective_question(
+            asked_word.word,
+            kana_reading,
+            word_type if not hide_word_type else None,
+            inflection,
+        )
+    return Question(
+        asked_word,
+        word_index,
+        index,
+        inflection,
+        text,
+        table.answer(word_index, inflection),
+        table.acceptable_answers(word_index, inflection),
+    )
+
+
+def random_inflection(
+    word_type: VerbType | AdjectiveType
+) -> VerbInflection | AdjectiveInflection:
+    """Return a random inflection to ask a word of the given type in."""
+    if isinstance(word_type, VerbType):
+        return VerbInflection.generate_random()
+    return AdjectiveInflection.generate_random(word_type)
+
+
+def random_question(
+    quiz: quiz_vocab.QuizVocab,
+    due: tuple[scheduling.ReviewItem, int] | None = None,
+    hide_kana: bool = False,
+    hide_word_type: bool = False,
+) -> Question:
+    """Return a question for the given item due for review, with the index of its word
+    in the quiz (see quiz_vocab.next_due_word()), or else for a word drawn from the
+    quiz in a random inflection.
+
+    Words in SQLite vocab files are drawn one at a time, so only the word being asked
+    is conjugated; the answers of the other words are already in the quiz.
+    """
+    word_index = due[1] if due is not None else quiz.draw()
+    words, table, index = quiz.words, quiz.table, quiz.index
+    if table is None or index is None:
+        words = (quiz.words[word_index],)
+        table = ConjugationTable(words)
+        index = DeinflectionIndex(words, table)
+        word_index = 0
+    return inflection_question(
+        words,
+        table,
+        index,
+        word_index,
+        (
+            due[0].inflection if due is not None
+            else random_inflection(words[word_index].type)
+        ),
+        hide_kana,
+        hide_word_type,
+    )
+
+
 def formatted_scores(current_streak: int, highest_streak: int) -> str:
     return (
         f'current streak: {current_streak}'
@@ -64,13 +172,7 @@ if __name__ == '__main__':
         description='Japanese verb & adjective conjugation trainer (CLI).',
         formatter_class=argparse.ArgumentDefaultsHelpFormatter
     )
-    parser.add_argument(
-        '-i',
-        '--vocab-file',
-        help='path to the JSON with verbs and adjectives for the quiz',
-        type=str,
-        default='vocab.json',
-    )
+    quiz_vocab.add_vocab_arguments(parser)
     parser.add_argument(
         '-K',
         '--hide-kana',
@@ -91,96 +193,50 @@ if __name__ == '__main__':
     )
     args = parser.parse_args()
 
-    words: list[dict]
-    try:
-        with open(args.vocab_file) as vocab_file:
-            words = json.load(vocab_file)
-    except FileNotFoundError:
-        logging.error(
-            f'"{args.vocab_file}" does not exist. run `python3 gen-vocab.py`'
-            + ' to build a vocab file.'
-        )
-        exit(1)
-    except OSError:
-        logging.error(f'could not open "{args.vocab_file}".')
-        raise
-    except json.decoder.JSONDecodeError:
-        logging.error(
-            f'{args.vocab_file} is malformed. run `python3 gen-vocab.py`'
-            + ' to build a new vocab file.'
-        )
-        exit(2)
+    # taken before the file is read, so that changes made meanwhile are reloaded
+    watcher = quiz_vocab.VocabFileWatcher(args.vocab_file)
+    words = quiz_vocab.load_quiz_words(args)
+    logging.info(f'{len(words)} words loaded.')
 
-    if not words:
-        logging.error(
-            f'{args.vocab_file} is malformed. run `python3 gen-vocab.py`'
-            + ' to build a new vocab file.'
-        )
-        exit(2)
+    quiz = quiz_vocab.prepare_quiz(words, args.frequency_weight)
+    if args.reload_interval > 0:
+        reloader = quiz_vocab.VocabReloader(args, quiz, watcher)
+        reloader.start()
 
-    logging.info(f'{len(words)} words loaded.')
+    if sys.stdin.isatty():
+        # line editing for input(), which is of no use when the answers are piped in
+        import readline
+        assert readline  # silence linter error
 
     conn = sqlite3.connect(DATABASE_PATH)
     dbapi.create_table_and_user_if_nexists(conn)
 
+    scheduler = None
+    if not args.no_reviews:
+        scheduler = scheduling.Scheduler(conn)
+        # however the quiz is quit, the reviews not written yet are kept
+        atexit.register(scheduler.flush)
+
     current_streak = 0
     highest_streak = dbapi.get_highest_streak(conn)
     print(formatted_scores(current_streak, highest_streak) + '\n')
 
     while True:
-        random_word: dict = random.choice(words)
-        kana_reading: str | None = random_word['kana']
-        dictionary_form_word: str = random_word['word']
-        type_str: str = random_word['type']
-
-        correctly_conjugated_word = None
-        question = None
-        if type_str.startswith('verb'):
-            try:
-                verb_type = VerbType(type_str)
-            except ValueError:
-                logging.error(
-                    f'verb {dictionary_form_word} of illegal type "{type_str}".'
-                )
-                exit(4)
-
-            random_inflection = VerbInflection.generate_random()
-            correctly_conjugated_word = conjugator.conjugate_verb(
-                dictionary_form_word, verb_type, random_inflection,
-            )
-            question = formatted_verb_question(
-                dictionary_form_word,
-                kana_reading if not args.hide_kana else None,
-                verb_type if not args.hide_word_type else None,
-                random_inflection,
-            )
-        elif type_str.startswith('adjective'):
-            try:
-                adjective_type = AdjectiveType(type_str)
-            except ValueError:
-                logging.error(
-                    f'adjective {dictionary_form_word} of illegal type "{type_str}".'
-                )
-                exit(4)
-            random_inflection = AdjectiveInflection.generate_random(adjective_type)
-            correctly_conjugated_word = conjugator.conjugate_adjective(
-                dictionary_form_word, adjective_type, random_inflection,
-            )
-            question = formatted_adjective_question(
-                dictionary_form_word,
-                kana_reading if not args.hide_kana else None,
-                adjective_type if not args.hide_word_type else None,
-                random_inflection,
-            )
-        else:
-            logging.error(
-                f'word {dictionary_form_word} of illegal type "{type_str}".'
-            )
-            exit(4)
+        # a reloaded vocab is only swapped in between questions
+        if args.reload_interval > 0:
+            quiz = reloader.take_reloaded() or quiz
+        # items due of words not in the quiz are left for the sessions asking them
+        due = None
+        if scheduler is not None:
+            due = quiz_vocab.next_due_word(quiz, scheduler)
+        question = random_question(quiz, due, args.hide_kana, args.hide_word_type)
+        item = scheduling.ReviewItem.of(question.vocab_word, question.inflection)
+        # only the first attempt counts towards the item's schedule
+        first_attempt = True
 
         while True:
             try:
-                print(question)
+                print(question.text)
                 user_answer = input('your answer: ').strip().lower()
             except KeyboardInterrupt:
                 print('\nenter "q" or hit CTRL+D to quit.\n')
@@ -192,7 +248,12 @@ if __name__ == '__main__':
             if user_answer == 'q':
                 exit(0)
 
-            if user_answer == correctly_conjugated_word:
+            is_correct = user_answer in question.acceptable_answers
+            if scheduler is not None and first_attempt:
+                scheduler.review(item, is_correct)
+                first_attempt = False
+
+            if is_correct:
                 current_streak += 1
                 beat_highest_streak = highest_streak < current_streak
                 if beat_highest_streak:
@@ -205,9 +266,14 @@ if __name__ == '__main__':
                 break
 
             current_streak = 0
+            mistake = question.index.diagnose(question.word_index, user_answer)
+            if mistake is not None:
+                print(
+                    f'that is the {mistake.formatted() or "[DICTIONARY FORM]"} form.'
+                )
             if args.reveal_answer:
                 print(
-                    f'the correct answer is 「{correctly_conjugated_word}」. try again.\n'
+                    f'the correct answer is 「{question.correct_answer}」. try again.\n'
                 )
             else:
                 print('wrong answer! try again.\n')
@@ -3,26 +3,31 @@
 # documentation
 
 import argparse
-from collections.abc import Sequence
-import json
 import logging
-import random
-from typing import Any
 from sys import exit
 import sqlite3
+import time
+from typing import NamedTuple
+
+# taken before the Qt imports, which are most of the startup time
+STARTED_AT = time.perf_counter()
 
 from PySide6.QtWidgets import QDialog, QMainWindow, QApplication
-from PySide6.QtCore import QTranslator, Slot, QTimer
-from PySide6.QtGui import QScreen
+from PySide6.QtCore import QThread, QTranslator, Signal, Slot, QTimer
+from PySide6.QtGui import QPaintEvent, QScreen
 
 from ui.ui_kaeru import Ui_MainWindow
 from ui.ui_about import Ui_Dialog
 from inflection import (
-    AdjectiveType, AdjectiveInflection,
+    AdjectiveInflection,
     VerbType, VerbInflection
 )
-import conjugator
+from conjugation_table import ConjugationTable
+from deinflection import DeinflectionIndex
 import dbapi
+import prefetch
+import quiz_vocab
+import scheduling
 from constants import DATABASE_PATH
 
 
@@ -37,13 +42,84 @@ class AboutKaeru(QDialog):
         self.ui.setupUi(self)
 
 
+class VocabLoader(QThread):
+    """Loads the words to ask and precomputes their answers on a worker thread, so that
+    the window shows up right away whatever the vocab size.
+    """
+    loaded = Signal(object, object)
+    """Emitted with the quiz_vocab.QuizVocab once the quiz can start, and with the
+    quiz_vocab.VocabReloader watching the vocab file, or None if it isn't watched."""
+    failed = Signal(str, int)
+    """Emitted with an error message and the exit status if the words couldn't be
+    loaded."""
+    args: argparse.Namespace
+    """The options picking the words (see quiz_vocab.add_vocab_arguments())."""
+
+    def __init__(self, args: argparse.Namespace):
+        super().__init__()
+        self.args = args
+
+    def run(self) -> None:
+        """Load the words, then emit either loaded or failed."""
+        # taken before the file is read, so that changes made meanwhile are reloaded
+        watcher = quiz_vocab.VocabFileWatcher(self.args.vocab_file)
+        try:
+            words = quiz_vocab.read_quiz_words(
+                self.args.vocab_file,
+                self.args.word_type,
+                self.args.min_frequency,
+                self.args.max_frequency,
+            )
+        except quiz_vocab.VocabLoadError as error:
+            self.failed.emit(str(error), error.status)
+            return
+        except OSError as error:
+            self.failed.emit(f'could not open "{self.args.vocab_file}": {error}', 1)
+            return
+        logging.info(f'{len(words)} words loaded.')
+
+        quiz = quiz_vocab.prepare_quiz(words, self.args.frequency_weight)
+        reloader = None
+        if self.args.reload_interval > 0:
+            reloader = quiz_vocab.VocabReloader(self.args, quiz, watcher)
+            reloader.start()
+        self.loaded.emit(quiz, reloader)
+
+
+class PreparedQuestion(NamedTuple):
+    """A question made by Kaeru.make_question(), ahead of time for random words."""
+    item: scheduling.ReviewItem
+    """The word to conjugate, and the inflection to conjugate it to."""
+    index: DeinflectionIndex
+    """Every form of the word, among others maybe, to tell which one a wrong answer
+    is."""
+    word_index: int
+    """The index of the word in the index."""
+    inflection_text: str
+    """The nondefault features of the inflection, as shown."""
+    correct_answer: str
+    """The correctly conjugated word."""
+    acceptable_answers: frozenset[str]
+    """Every correct answer: the correctly conjugated word, and its kana reading."""
+
+
 class Kaeru(QMainWindow):
     ui: Ui_MainWindow
     """Loaded from the compiled kaeru.ui."""
-    words: Sequence[dict[str, Any]]
-    """Words available for the quiz."""
-    correct_answer: str
-    """The correctly conjugated word."""
+    quiz: quiz_vocab.QuizVocab
+    """Words available for the quiz, and their answers if they're precomputed; swapped
+    for the reloaded vocab by prepare_question() once the quiz starts."""
+    reloader: quiz_vocab.VocabReloader | None
+    """Reloads the vocab file when it changes, if it's watched."""
+    scheduler: scheduling.Scheduler | None
+    """Picks the words due for review, unless only random words are asked."""
+    prefetcher: prefetch.Prefetcher[PreparedQuestion] | None
+    """Prepares the next random questions in the background, once the quiz starts."""
+    question: PreparedQuestion
+    """The question being asked."""
+    first_attempt: bool
+    """Whether the word being asked wasn't answered yet; only the first attempt counts
+    towards its schedule."""
     reveal_answer_on_failure: bool
     """Whether the correct answer should be revealed when the user gets it wrong."""
     current_streak: int
@@ -52,16 +128,28 @@ class Kaeru(QMainWindow):
     """The highest number of words the user has conjugated correctly in a row."""
     conn: sqlite3.Connection
     """The database connection."""
+    first_paint_seconds: float | None
+    """How long after startup the window was first painted, once it has been."""
 
     SCORE_COLOUR_FLASH_DURATION = 700
     """For how many milliseconds the score colour changes to indicate a score change."""
     FEEDBACK_DURATION = 2_000
     """For how many milliseconds the feedback is displayed."""
+    PREFETCHED_QUESTIONS = 4
+    """How many random questions to prepare ahead of time; a reloaded vocab is asked
+    from the random question after them on."""
 
-    def __init__(self, words: Sequence[dict[str, Any]]):
+    def __init__(self, schedule_reviews: bool = True):
+        """Set the window up in its loading state; the quiz starts with start_quiz().
+
+        Unless told not to schedule reviews, the words due for review are asked before
+        random ones.
+        """
         super().__init__()
         self.ui = Ui_MainWindow()
         self.ui.setupUi(self)
+        self.first_paint_seconds = None
+        self.reloader = None
 
         feedback_size_policy = self.ui.feedback.sizePolicy()
         feedback_size_policy.setRetainSizeWhenHidden(True)
@@ -73,6 +161,10 @@ class Kaeru(QMainWindow):
 
         self.conn = sqlite3.connect(DATABASE_PATH)
         dbapi.create_table_and_user_if_nexists(self.conn)
+        self.scheduler = None
+        if schedule_reviews:
+            self.scheduler = scheduling.Scheduler(sqlite3.connect(DATABASE_PATH))
+        self.prefetcher = None
 
         self.ui.option_show_kana_reading.toggled.connect(
             self.toggle_showing_kana_reading
@@ -99,8 +191,55 @@ class Kaeru(QMainWindow):
         self.current_streak = 0
         self.highest_streak = dbapi.get_highest_streak(self.conn)
         self.update_scores()
-        self.words = words
+        self.show_loading()
+
+    def paintEvent(self, event: QPaintEvent) -> None:
+        """Log how long after startup the window is first painted."""
+        if self.first_paint_seconds is None:
+            self.first_paint_seconds = time.perf_counter() - STARTED_AT
+            logging.info(f'first paint {self.first_paint_seconds:.2f}s after startup.')
+        super().paintEvent(event)
+
+    def show_loading(self) -> None:
+        """Show that the words are being loaded, and keep answers from being entered
+        until they are.
+        """
+        self.ui.word_to_conjugate.setText(self.tr('Loading…'))
+        self.ui.kana_reading.setText('　')  # still occupy space
+        self.ui.word_type.setText('')
+        self.ui.conjugation.setText('')
+        self.ui.answer.setEnabled(False)
+        self.ui.answer_button.setEnabled(False)
+
+    @Slot(object, object)
+    def start_quiz(
+        self,
+        quiz: quiz_vocab.QuizVocab,
+        reloader: quiz_vocab.VocabReloader | None,
+    ) -> None:
+        """Start quizzing the loaded words, swapping in the ones reloaded by the given
+        reloader, if any, between questions.
+        """
+        self.quiz = quiz
+        self.reloader = reloader
+        self.prefetcher = prefetch.Prefetcher(
+            self.prepare_question, Kaeru.PREFETCHED_QUESTIONS
+        )
+        self.ui.answer.setEnabled(True)
+        self.ui.answer_button.setEnabled(True)
+        # the first question is made right away, the next ones in the background
         self.ask_new_random_word()
+        self.prefetcher.start()
+        self.ui.answer.setFocus()
+        logging.info(
+            f'ready to quiz {time.perf_counter() - STARTED_AT:.2f}s after startup.'
+        )
+
+    @Slot(str, int)
+    def fail_to_load(self, message: str, status: int) -> None:
+        """Log why the words couldn't be loaded, and quit with the given status."""
+        logging.error(f'{message}.')
+        QApplication.exit(status)
 
     @Slot()
     def show_about_dialog(self) -> None:
@@ -108,8 +247,8 @@ class Kaeru(QMainWindow):
         dialog = AboutKaeru()
         dialog.exec()
 
-    def show_verb_inflection(self, inflection: VerbInflection) -> None:
-        """Show the nondefault features of the given verb inflection."""
+    def verb_inflection_text(self, inflection: VerbInflection) -> str:
+        """Return the nondefault features of the given verb inflection."""
         nondefault_features = []
         if inflection.base_form is VerbInflection.BaseForm.POLITE:
             nondefault_features.append(self.tr('POLITE'))
@@ -120,10 +259,10 @@ class Kaeru(QMainWindow):
             nondefault_features.append(self.tr('PAST'))
         if inflection.polarity is VerbInflection.Polarity.NEGATIVE:
             nondefault_features.append(self.tr('NEGATIVE'))
-        self.ui.conjugation.setText(' '.join(nondefault_features))
+        return ' '.join(nondefault_features)
 
-    def show_adjective_inflection(self, inflection: AdjectiveInflection) -> None:
-        """Show the nondefault features of the given adjective inflection."""
+    def adjective_inflection_text(self, inflection: AdjectiveInflection) -> str:
+        """Return the nondefault features of the given adjective inflection."""
         nondefault_features = []
         if inflection.polarity is AdjectiveInflection.Polarity.NEGATIVE:
             nondefault_features.append(self.tr('NEGATIVE'))
@@ -131,61 +270,95 @@ class Kaeru(QMainWindow):
             nondefault_features.append(self.tr('PAST'))
         if inflection.politeness is AdjectiveInflection.Politeness.POLITE:
             nondefault_features.append(self.tr('POLITE'))
-        self.ui.conjugation.setText(' '.join(nondefault_features))
+        return ' '.join(nondefault_features)
+
+    def inflection_text(self, inflection: VerbInflection | AdjectiveInflection) -> str:
+        """Return the nondefault features of the given inflection."""
+        if isinstance(inflection, VerbInflection):
+            return self.verb_inflection_text(inflection)
+        return self.adjective_inflection_text(inflection)
+
+    def make_question(
+        self,
+        quiz: quiz_vocab.QuizVocab,
+        word_index: int,
+        inflection: VerbInflection | AdjectiveInflection | None = None,
+    ) -> PreparedQuestion:
+        """Return a question for the word at the given index of the given quiz, in the
+        given inflection, or else in a random one.
+        """
+        vocab_word = quiz.words[word_index]
+        if quiz.table is not None and quiz.index is not None:
+            table = quiz.table
+            index = quiz.index
+        else:
+            table = ConjugationTable((vocab_word,))
+            index = DeinflectionIndex((vocab_word,), table)
+            word_index = 0
+
+        if inflection is None:
+            word_type = vocab_word.type
+            if isinstance(word_type, VerbType):
+                inflection = VerbInflection.generate_random()
+            else:
+                inflection = AdjectiveInflection.generate_random(word_type)
+        return PreparedQuestion(
+            scheduling.ReviewItem.of(vocab_word, inflection),
+            index,
+            word_index,
+            self.inflection_text(inflection),
+            table.answer(word_index, inflection),
+            table.acceptable_answers(word_index, inflection),
+        )
+
+    def prepare_question(self) -> PreparedQuestion:
+        """Return a question for a new random word in a random inflection, from the
+        reloaded vocab if there's one.
+
+        Called by the prefetcher, on its own thread, and when its buffer is empty.
+        """
+        reloaded = self.reloader and self.reloader.take_reloaded()
+        if reloaded is not None:
+            self.quiz = reloaded
+            logging.info('preparing questions from the reloaded vocab.')
+        quiz = self.quiz
+        return self.make_question(quiz, quiz.draw())
+
+    def next_question(self) -> PreparedQuestion:
+        """Return a question for the word due for review the longest, in the inflection
+        it was asked in, or else the next random question prepared by the prefetcher,
+        making one right away if none is ready.
+
+        Due words are picked only now, so that the reviews graded meanwhile are taken
+        into account.
+        """
+        assert self.prefetcher is not None
+        # items due of words not in the quiz are left for the sessions asking them
+        if self.scheduler is not None:
+            quiz = self.quiz
+            due = quiz_vocab.next_due_word(quiz, self.scheduler)
+            if due is not None:
+                item, word_index = due
+                return self.make_question(quiz, word_index, item.inflection)
+        question = self.prefetcher.take_nowait()
+        if question is None:
+            question = self.prepare_question()
+        return question
 
     def ask_new_random_word(self) -> None:
-        """Ask to conjugate a new random word."""
-        random_word = random.choice(self.words)
-        dictionary_form_word: str = random_word['word']
-        word_kana_reading: str | None = random_word['kana']
+        """Ask the next question."""
+        self.question = question = self.next_question()
+        self.first_attempt = True
+        word_kana_reading = question.item.kana
 
-        self.ui.word_to_conjugate.setText(dictionary_form_word)
+        self.ui.word_to_conjugate.setText(question.item.word)
         self.ui.kana_reading.setText(
             f'（{word_kana_reading}）'
             if word_kana_reading is not None else '　'  # still occupy space
         )
         self.ui.answer.setText('')
-
-        type_str = random_word['type']
-        if type_str.startswith('verb'):
-            try:
-                verb_type = VerbType(type_str)
-            except ValueError:
-                logging.error(
-                    f'verb {dictionary_form_word} of illegal type "{type_str}"'
-                )
-                exit(4)
-            random_inflection = VerbInflection.generate_random()
-
-            self.correct_answer = conjugator.conjugate_verb(
-                dictionary_form_word,
-                verb_type,
-                random_inflection
-            )
-            self.ui.word_type.setText(verb_type.label)
-            self.show_verb_inflection(random_inflection)
-        elif type_str.startswith('adjective'):
-            try:
-                adjective_type = AdjectiveType(type_str)
-            except ValueError:
-                logging.error(
-                    f'adjective {dictionary_form_word} of illegal type "{type_str}"'
-                )
-                exit(4)
-            random_inflection = AdjectiveInflection.generate_random(adjective_type)
-
-            self.correct_answer = conjugator.conjugate_adjective(
-                dictionary_form_word,
-                adjective_type,
-                random_inflection
-            )
-            self.ui.word_type.setText(adjective_type.label)
-            self.show_adjective_inflection(random_inflection)
-        else:
-            logging.error(
-                f'word {dictionary_form_word} of illegal type "{type_str}".'
-            )
-            exit(4)
+        self.ui.conjugation.setText(question.inflection_text)
+        self.ui.word_type.setText(question.item.type.label)
 
     def notify_answer_was_correct(self) -> None:
         """Flash the current streak's value green to indicate the answer was correct."""
@@ -196,21 +369,41 @@ class Kaeru(QMainWindow):
             self.reset_score_colour_change
         )
 
-    def notify_answer_was_incorrect(self) -> None:
+    def mistake_text(self, answer: str) -> str:
+        """Return which form of the word being asked the given answer is, or an empty
+        string if it's not a form of that word.
+        """
+        mistake = self.question.index.diagnose(self.question.word_index, answer)
+        if mistake is None:
+            return ''
+
+        features = self.inflection_text(mistake)
+        if not features:
+            return self.tr('That is the dictionary form.')
+        return self.tr('That is the {} form.').format(f'<b>{features}</b>')
+
+    def notify_answer_was_incorrect(self, answer: str) -> None:
         """Temporarily flash the current streak's value red and show error feedback.
-        Include the correct answer if 'Reveal answer on failure' is checked.
+        Say which form the answer is if it's another form of the word, and include the
+        correct answer if 'Reveal answer on failure' is checked.
         """
         self.ui.current_streak.setStyleSheet('color: #ff4b3e')
         QTimer.singleShot(
             Kaeru.SCORE_COLOUR_FLASH_DURATION, self.reset_score_colour_change
         )
+        mistake_text = self.mistake_text(answer)
+        if mistake_text:
+            mistake_text += ' '
         if self.reveal_answer_on_failure:
             self.ui.feedback.setText(
-                self.tr(f'The correct answer is')
-                + f' <b>{self.correct_answer}</b>.'
+                mistake_text
+                + self.tr(f'The correct answer is')
+                + f' <b>{self.question.correct_answer}</b>.'
             )
         else:
-            self.ui.feedback.setText(self.tr('Incorrect answer; try again.'))
+            self.ui.feedback.setText(
+                mistake_text + self.tr('Incorrect answer; try again.')
+            )
         self.ui.feedback.show()
         QTimer.singleShot(
             Kaeru.FEEDBACK_DURATION, self.hide_feedback
@@ -243,14 +436,17 @@ class Kaeru(QMainWindow):
         answer = self.ui.answer.text().strip()
         if not answer:
             return
-        is_correct = answer == self.correct_answer
+        is_correct = answer in self.question.acceptable_answers
+        if self.scheduler is not None and self.first_attempt:
+            self.scheduler.review(self.question.item, is_correct)
+            self.first_attempt = False
         if is_correct:
             self.current_streak += 1
             self.notify_answer_was_correct()
             self.ask_new_random_word()
         else:
             self.current_streak = 0
-            self.notify_answer_was_incorrect()
+            self.notify_answer_was_incorrect(answer)
 
         beat_highest_streak = self.highest_streak < self.current_streak
         if beat_highest_streak:
@@ -296,51 +492,16 @@ if __name__ == "__main__":
         description='Japanese verb & adjective conjugation trainer (GUI).',
         formatter_class=argparse.ArgumentDefaultsHelpFormatter
     )
-    parser.add_argument(
-        '-i',
-        '--vocab-file',
-        help='path to the JSON with verbs and adjectives for the quiz',
-        type=str,
-        default='vocab.json',
-    )
+    quiz_vocab.add_vocab_arguments(parser)
     args = parser.parse_args()
 
-    words: list[dict]
-    try:
-        with open(args.vocab_file) as vocab_file:
-            words = json.load(vocab_file)
-    except FileNotFoundError:
-        logging.error(
-            f'"{args.vocab_file}" does not exist. run `python3 gen-vocab.py`'
-            + ' to build a vocab file.'
-        )
-        exit(1)
-    except OSError:
-        logging.error(f'could not open "{args.vocab_file}".')
-        raise
-    except json.decoder.JSONDecodeError:
-        logging.error(
-            f'{args.vocab_file} is malformed. run `python3 gen-vocab.py`'
-            + ' to build a new vocab file.'
-        )
-        exit(2)
-
-    if not words:
-        logging.error(
-            f'{args.vocab_file} is malformed. run `python3 gen-vocab.py`'
-            + ' to build a new vocab file.'
-        )
-        exit(2)
-
-    logging.info(f'{len(words)} words loaded.')
-
     app = QApplication([])
 
     translator = QTranslator()
     translator.load('i18n/pt_BR')
     app.installTranslator(translator)
 
-    kaeru = Kaeru(words)
+    kaeru = Kaeru(schedule_reviews=not args.no_reviews)
     kaeru.resize(800, 700)
     kaeru.show()
 
@@ -349,4 +510,17 @@ if __name__ == "__main__":
     geometry.moveCenter(center)
     kaeru.move(geometry.topLeft())
 
-    exit(app.exec())
+    # the window shows up in its loading state while the words are loaded
+    loader = VocabLoader(args)
+    loader.loaded.connect(kaeru.start_quiz)
+    loader.failed.connect(kaeru.fail_to_load)
+    loader.start()
+
+    status = app.exec()
+    # the loader can't be interrupted; quitting while it runs waits for it
+    loader.wait()
+    if kaeru.scheduler is not None:
+        kaeru.scheduler.flush()
+    if kaeru.prefetcher is not None:
+        logging.info(f'question buffer: {kaeru.prefetcher.metrics().formatted()}.')
+    exit(status)
@@ -0,0 +1,164 @@
+"""Preparing the next questions ahead of time, so that asking one only takes it from a
+buffer.
+
+A Prefetcher makes questions on a daemon thread until its bounded buffer is full, and
+makes another every time one is taken. It measures how long each question took to make
+(the refill latency), and how often taking one found the buffer empty, and waited
+for a question or went without one; as long as making a question is faster than
+answering one, the buffer is never empty after the first question.
+"""
+
+from collections.abc import Callable
+import queue
+import threading
+import time
+from typing import Generic, NamedTuple, TypeVar
+
+
+T = TypeVar('T')
+
+
+class PrefetchMetrics(NamedTuple):
+    """How well a Prefetcher keeps up."""
+    depth: int
+    """How many questions are ready in the buffer."""
+    capacity: int
+    """How many questions the buffer holds at most."""
+    made: int
+    """How many questions were made."""
+    mean_refill_seconds: float
+    """How long making a question took on average."""
+    max_refill_seconds: float
+    """How long the slowest question took to make."""
+    waits: int
+    """How many times taking a question found the buffer empty."""
+    wait_seconds: float
+    """How long taking questions waited in all."""
+    misses: int
+    """How many times taking a question without waiting found the buffer empty."""
+
+    def formatted(self) -> str:
+        """Return the metrics on a line, for logging."""
+        return (
+            f'{self.depth}/{self.capacity} ready, {self.made} made in'
+            + f' {self.mean_refill_seconds * 1e3:.2f}ms on average'
+            + f' ({self.max_refill_seconds * 1e3:.2f}ms at most), {self.waits}'
+            + f' waited for ({self.wait_seconds * 1e3:.2f}ms in all), {self.misses}'
+            + ' missed'
+        )
+
+
+class _Failure(NamedTuple):
+    """Put in the buffer in place of a question that couldn't be made."""
+    error: BaseException
+    """What making the question raised."""
+
+
+class Prefetcher(Generic[T]):
+    """Keeps a bounded buffer of questions made ahead of time on a daemon thread.
+
+    If making a question raises, the thread stops, and taking the question raises the
+    same error.
+    """
+    _make: Callable[[], T]
+    """Makes the next question; called on the prefetching thread only."""
+    _buffer: 'queue.Queue[T | _Failure]'
+    """The questions made and not taken yet, oldest first."""
+    _thread: threading.Thread
+    """Makes the questions."""
+    _lock: threading.Lock
+    """Guards the counters below."""
+    _made: int
+    """How many questions were made."""
+    _refill_seconds: float
+    """How long making the questions took in all."""
+    _max_refill_seconds: float
+    """How long the slowest question took to make."""
+    _waits: int
+    """How many times taking a question found the buffer empty."""
+    _wait_seconds: float
+    """How long taking questions waited in all."""
+    _misses: int
+    """How many times taking a question without waiting found the buffer empty."""
+
+    def __init__(self, make: Callable[[], T], capacity: int):
+        """Buffer up to the given number of questions made by the given function;
+        none is made until start() is called.
+        """
+        self._make = make
+        self._buffer = queue.Queue(capacity)
+        self._thread = threading.Thread(
+            target=self._fill, name='Prefetcher', daemon=True
+        )
+        self._lock = threading.Lock()
+        self._made = 0
+        self._refill_seconds = 0.0
+        self._max_refill_seconds = 0.0
+        self._waits = 0
+        self._wait_seconds = 0.0
+        self._misses = 0
+
+    def start(self) -> None:
+        """Start making questions."""
+        self._thread.start()
+
+    def _fill(self) -> None:
+        """Make questions forever, waiting for room in the buffer for each."""
+        while True:
+            start = time.perf_counter()
+            try:
+                question = self._make()
+            except BaseException as error:
+                self._buffer.put(_Failure(error))
+                return
+            seconds = time.perf_counter() - start
+            with self._lock:
+                self._made += 1
+                self._refill_seconds += seconds
+                self._max_refill_seconds = max(self._max_refill_seconds, seconds)
+            self._buffer.put(question)
+
+    def take(self) -> T:
+        """Return the oldest question in the buffer, waiting for one if it's empty."""
+        try:
+            question = self._buffer.get_nowait()
+        except queue.Empty:
+            start = time.perf_counter()
+            question = self._buffer.get()
+            with self._lock:
+                self._waits += 1
+                self._wait_seconds += time.perf_counter() - start
+        return self._unwrap(question)
+
+    def take_nowait(self) -> T | None:
+        """Return the oldest question in the buffer, or None if it's empty."""
+        try:
+            question = self._buffer.get_nowait()
+        except queue.Empty:
+            with self._lock:
+                self._misses += 1
+            return None
+        return self._unwrap(question)
+
+    def _unwrap(self, question: 'T | _Failure') -> T:
+        """Return the given question taken from the buffer, or raise the error it
+        failed with.
+        """
+        if isinstance(question, _Failure):
+            self._buffer.put(question)  # for the next take to raise too
+            raise question.error
+        return question
+
+    def metrics(self) -> PrefetchMetrics:
+        """Return how well the buffer keeps up so far."""
+        with self._lock:
+            return PrefetchMetrics(
+                self._buffer.qsize(),
+                self._buffer.maxsize,
+                self._made,
+                self._refill_seconds / self._made if self._made else 0.0,
+                self._max_refill_seconds,
+                self._waits,
+                self._wait_seconds,
+                self._misses,
+            )
@@ -0,0 +1,453 @@
+"""Loading the words the quizzers ask, shared by kaeru.py and kaeru-cli.py.
+
+The vocab file is checked once, when it's loaded, and its words are turned into
+vocab.VocabWord records with their type already resolved, so that asking a question
+neither parses a type string nor looks a key up in a dict.
+
+Words in SQLite and binary vocab files stay in the file and are only turned into
+records when they're fetched; their types can't be illegal, since only the words of
+the types in vocab.WORD_TYPES are ever read, and the binary format can't store others.
+
+While a quiz runs, a VocabReloader can watch the vocab file and prepare its new words
+in the background whenever it changes, reusing the answers of the words that didn't;
+the quizzers swap them in before asking their next question.
+"""
+
+import argparse
+from collections.abc import Iterator, Sequence
+import logging
+import os
+import random
+from sys import exit
+import threading
+import time
+from typing import Any, NamedTuple, overload
+
+from conjugation_table import ConjugationTable
+from deinflection import DeinflectionIndex
+from inflection import AdjectiveType, VerbType
+from sampling import DEFAULT_EXPONENT, Sampler, vocab_sampler
+import scheduling
+import vocab
+from vocab import VocabWord
+
+
+def add_vocab_arguments(parser: argparse.ArgumentParser) -> None:
+    """Add the options to pick the vocab file and the words to ask from it."""
+    parser.add_argument(
+        '-i',
+        '--vocab-file',
+        help="""path to the vocab file (JSON, binary or SQLite) with the words for
+        the quiz""",
+        type=str,
+        default='vocab.json',
+    )
+    parser.add_argument(
+        '--word-type',
+        help='only ask words of this type; can be repeated (SQLite vocab files only)',
+        choices=[word_type.value for word_type in vocab.WORD_TYPES],
+        action='append',
+    )
+    parser.add_argument(
+        '--min-frequency',
+        help="""only ask words ranked at least this in frequency, 1 being the most
+        frequent word (SQLite vocab files only)""",
+        type=int,
+        default=None,
+    )
+    parser.add_argument(
+        '--max-frequency',
+        help="""only ask words ranked at most this in frequency (SQLite vocab files
+        only)""",
+        type=int,
+        default=None,
+    )
+    parser.add_argument(
+        '-w',
+        '--frequency-weight',
+        help="""how much more often to ask common words: words are weighted by their
+        frequency rank to the power of minus this, so 0 asks every word as often""",
+        type=float,
+        default=DEFAULT_EXPONENT,
+    )
+    parser.add_argument(
+        '--no-reviews',
+        help="""only ask random words, rather than the words due for review in the
+        inflections they were asked in first""",
+        action='store_true',
+    )
+    parser.add_argument(
+        '--reload-interval',
+        help="""how often, in seconds, to check whether the vocab file changed, to
+        reload it before the next question; 0 to never""",
+        type=float,
+        default=2.0,
+    )
+
+
+class LazyWords(Sequence[VocabWord]):
+    """The words of a SQLite or binary vocab file, as records fetched and decoded when
+    they're accessed.
+    """
+    _words: vocab.SQLiteVocab | vocab.BinaryVocab
+    """The words in the file."""
+
+    def __init__(self, words: vocab.SQLiteVocab | vocab.BinaryVocab):
+        self._words = words
+
+    def __len__(self) -> int:
+        return len(self._words)
+
+    @overload
+    def __getitem__(self, index: int) -> VocabWord: ...
+    @overload
+    def __getitem__(self, index: slice) -> list[VocabWord]: ...
+
+    def __getitem__(self, index: int | slice) -> VocabWord | list[VocabWord]:
+        """Return the word at the given index, or a list of the words in the given
+        slice.
+        """
+        if isinstance(index, slice):
+            return [VocabWord.from_dict(word_info) for word_info in self._words[index]]
+        return VocabWord.from_dict(self._words[index])
+
+    def __iter__(self) -> Iterator[VocabWord]:
+        for word_info in self._words:
+            yield VocabWord.from_dict(word_info)
+
+    def frequencies(self) -> list[int | None]:
+        """Return the frequency rank of every word, without fetching them."""
+        return self._words.frequencies()
+
+
+class SQLiteWords(LazyWords):
+    """The words of a SQLite vocab file, fetched through its indices."""
+    _words: vocab.SQLiteVocab
+
+    def frequency(self, index: int) -> int:
+        """Return the frequency rank of the word at the given index, without fetching
+        it.
+        """
+        return self._words.frequency(index)
+
+    def frequency_bands(self) -> list[tuple[int, int, int]]:
+        """Return the first and last indices and the lowest frequency rank of the
+        words in each band of ranks (see sampling.BandSampler).
+        """
+        return self._words.frequency_bands()
+
+    def index_of(
+        self, word: str, kana: str | None, word_type: VerbType | AdjectiveType
+    ) -> int | None:
+        """Return the index of the word with the given spelling, kana reading and type,
+        or None if it's not one of these words.
+        """
+        return self._words.index_of(word, kana, word_type.value)
+
+
+class BinaryWords(LazyWords):
+    """The words of a memory-mapped binary vocab file."""
+    _words: vocab.BinaryVocab
+    _indices: dict[tuple[str, str | None, str], int] | None
+    """The index of every word, by spelling, kana reading and type; built the first
+    time a word is looked up."""
+
+    def __init__(self, words: vocab.BinaryVocab):
+        super().__init__(words)
+        self._indices = None
+
+    def index_of(
+        self, word: str, kana: str | None, word_type: VerbType | AdjectiveType
+    ) -> int | None:
+        """Return the index of the word with the given spelling, kana reading and type,
+        or None if it's not one of these words.
+        """
+        if self._indices is None:
+            self._indices = {
+                (word_info['word'], word_info['kana'], word_info['type']): word_index
+                for word_index, word_info in enumerate(self._words)
+            }
+        return self._indices.get((word, kana, word_type.value))
+
+
+def quiz_words(words: Sequence[dict[str, Any]]) -> Sequence[VocabWord]:
+    """Return the records of the given words, as loaded by vocab.load_vocab().
+
+    Words in a SQLite or binary vocab are fetched when accessed; every other word is
+    decoded and checked right away.
+
+    Raise ValueError if any of the words is malformed or of an illegal type.
+    """
+    if isinstance(words, vocab.SQLiteVocab):
+        return SQLiteWords(words)
+    if isinstance(words, vocab.BinaryVocab):
+        return BinaryWords(words)
+    return [VocabWord.from_dict(word_info) for word_info in words]
+
+
+class VocabLoadError(Exception):
+    """The words to ask couldn't be loaded; the quizzers log the message and exit with
+    the status.
+    """
+    status: int
+    """The exit status: 1 if the vocab file is missing, 2 if it's malformed, 3 if no
+    word matches the filters, 4 if any word is of an illegal type."""
+
+    def __init__(self, message: str, status: int):
+        super().__init__(message)
+        self.status = status
+
+
+def read_quiz_words(
+    file_path: str,
+    word_types: Sequence[str] | None = None,
+    min_frequency: int | None = None,
+    max_frequency: int | None = None,
+) -> Sequence[VocabWord]:
+    """Return the words of the given types (every type if None) whose frequency rank
+    is within the given bounds in the vocab file at the given path.
+
+    Raise VocabLoadError if they can't be loaded, and OSError if the file can't be
+    read.
+    """
+    words: Sequence[dict[str, Any]]
+    try:
+        words = vocab.load_vocab(file_path)
+    except FileNotFoundError:
+        raise VocabLoadError(
+            f'"{file_path}" does not exist. run `python3 gen-vocab.py`'
+            + ' to build a vocab file',
+            1,
+        ) from None
+    except ValueError:
+        words = []
+    if not words:
+        raise VocabLoadError(
+            f'{file_path} is malformed. run `python3 gen-vocab.py`'
+            + ' to build a new vocab file',
+            2,
+        )
+
+    if word_types or min_frequency is not None or max_frequency is not None:
+        if not isinstance(words, vocab.SQLiteVocab):
+            raise VocabLoadError(
+                '--word-type, --min-frequency and --max-frequency need a SQLite'
+                + ' vocab file. run `python3 gen-vocab.py -f sqlite` to build one',
+                2,
+            )
+        words = words.filtered(word_types, min_frequency, max_frequency)
+        if not words:
+            raise VocabLoadError(f'no word in {file_path} matches the filters', 3)
+
+    try:
+        return quiz_words(words)
+    except ValueError as error:
+        raise VocabLoadError(str(error), 4) from None
+
+
+def load_quiz_words(args: argparse.Namespace) -> Sequence[VocabWord]:
+    """Return the words to ask, as picked by the options of add_vocab_arguments().
+
+    Log an error and exit if they can't be loaded (see VocabLoadError).
+    """
+    try:
+        return read_quiz_words(
+            args.vocab_file, args.word_type, args.min_frequency, args.max_frequency
+        )
+    except VocabLoadError as error:
+        logging.error(f'{error}.')
+        exit(error.status)
+    except OSError:
+        logging.error(f'could not open "{args.vocab_file}".')
+        raise
+
+
+class QuizVocab(NamedTuple):
+    """Everything a quiz needs: the words and what's derived from them."""
+    words: Sequence[VocabWord]
+    """Words available for the quiz."""
+    table: ConjugationTable | None
+    """The precomputed answers for every word, or None to conjugate each word when
+    it's asked."""
+    index: DeinflectionIndex | None
+    """Every form of every word, or None to index each word when it's asked."""
+    sampler: Sampler | None
+    """Draws the index of the next word to ask, weighted by frequency; None to draw
+    every word as often."""
+    word_indices: dict[tuple[str, str | None, VerbType | AdjectiveType], int] | None
+    """The index of every word, by spelling, kana reading and type; None if the words
+    can look their indices up themselves (see SQLiteWords.index_of() and
+    BinaryWords.index_of())."""
+
+    def draw(self) -> int:
+        """Return the index of a random word to ask."""
+        if self.sampler is None:
+            return random.randrange(len(self.words))
+        return self.sampler.draw()
+
+    def index_of(
+        self, word: str, kana: str | None, word_type: VerbType | AdjectiveType
+    ) -> int | None:
+        """Return the index of the word with the given spelling, kana reading and type,
+        or None if it's not in the quiz.
+        """
+        if self.word_indices is None:
+            assert isinstance(self.words, (SQLiteWords, BinaryWords))
+            return self.words.index_of(word, kana, word_type)
+        return self.word_indices.get((word, kana, word_type))
+
+
+def prepare_quiz(
+    words: Sequence[VocabWord],
+    frequency_weight: float,
+    previous: QuizVocab | None = None,
+) -> QuizVocab:
+    """Return the quiz of the given words, weighted by frequency with the given
+    exponent (see sampling.py).
+
+    Words in SQLite vocab files are drawn one at a time through the index, so only the
+    word being asked is conjugated; every other word is conjugated right away, except
+    the ones already in the given previous quiz, whose answers are reused.
+    """
+    sampler = vocab_sampler(words, frequency_weight)
+    if isinstance(words, SQLiteWords):
+        return QuizVocab(words, None, None, sampler, None)
+
+    previous_table = None
+    if previous is not None and previous.table is not None:
+        previous_table = (previous.words, previous.table)
+    table = ConjugationTable(words, previous_table)
+    logging.info(
+        f'{len(table)} answers precomputed in {table.build_seconds:.2f}s'
+        + f' ({table.nbytes / 1024:.0f} KiB'
+        + (f'; {table.reused_count} words reused)' if table.reused_count else ')')
+        + '.'
+    )
+    index = DeinflectionIndex(words, table)
+    logging.info(f'{len(index)} forms indexed in {index.build_seconds:.2f}s.')
+    if isinstance(words, BinaryWords):
+        return QuizVocab(words, table, index, sampler, None)
+    word_indices = {
+        (vocab_word.word, vocab_word.kana, vocab_word.type): word_index
+        for word_index, vocab_word in enumerate(words)
+    }
+    return QuizVocab(words, table, index, sampler, word_indices)
+
+
+def next_due_word(
+    quiz: QuizVocab, scheduler: scheduling.Scheduler
+) -> tuple[scheduling.ReviewItem, int] | None:
+    """Return the item due for review the longest whose word is in the given quiz, and
+    the index of its word, or None if there's none.
+
+    The items due of other words, left out by the filters or by a new vocab file, are
+    skipped for the rest of the session; their reviews are kept for the sessions that
+    ask them.
+    """
+    while (item := scheduler.next_due()) is not None:
+        word_index = quiz.index_of(item.word, item.kana, item.type)
+        if word_index is not None:
+            return item, word_index
+    return None
+
+
+class VocabFileWatcher:
+    """Tells whether a vocab file changed since it was last checked, by its status:
+    gen-vocab.py replaces the whole file, which changes its inode, and editing it in
+    place changes its modification time or size.
+    """
+    _file_path: str
+    """The path to the vocab file."""
+    _signature: tuple[int, int, int] | None
+    """The inode, modification time and size of the file when it was last checked;
+    None if it didn't exist."""
+
+    def __init__(self, file_path: str):
+        self._file_path = file_path
+        self._signature = self._current_signature()
+
+    def _current_signature(self) -> tuple[int, int, int] | None:
+        try:
+            status = os.stat(self._file_path)
+        except OSError:
+            return None
+        return (status.st_ino, status.st_mtime_ns, status.st_size)
+
+    def changed(self) -> bool:
+        """Return whether the file changed since the last check, and didn't vanish."""
+        signature = self._current_signature()
+        if signature == self._signature:
+            return False
+        self._signature = signature
+        return signature is not None
+
+
+class VocabReloader(threading.Thread):
+    """Watches the vocab file on a daemon thread, and prepares a new quiz in the
+    background every time it changes. The quizzers take it with take_reloaded()
+    between questions, so the question being asked is never affected.
+
+    A file that can't be loaded is reported and skipped; the quiz goes on with the
+    words it has until the file changes again.
+    """
+    _args: argparse.Namespace
+    """The options picking the words (see add_vocab_arguments())."""
+    _quiz: QuizVocab
+    """The latest quiz, whose answers the next one reuses."""
+    _watcher: VocabFileWatcher
+    """Tells whether the vocab file changed since the latest quiz was loaded."""
+    _reloaded: QuizVocab | None
+    """The quiz prepared since take_reloaded() was last called, if any."""
+    _lock: threading.Lock
+    """Guards _reloaded."""
+
+    def __init__(
+        self,
+        args: argparse.Namespace,
+        quiz: QuizVocab,
+        watcher: VocabFileWatcher | None = None,
+    ):
+        """Watch the vocab file picked by the given options, the given quiz being the
+        one loaded from it.
+
+        The watcher should be created before the file was read, so that the changes
+        made while the quiz was loaded and prepared are picked up; by default, the
+        file is watched from now on.
+        """
+        super().__init__(name='VocabReloader', daemon=True)
+        self._args = args
+        self._quiz = quiz
+        self._watcher = watcher or VocabFileWatcher(args.vocab_file)
+        self._reloaded = None
+        self._lock = threading.Lock()
+
+    def run(self) -> None:
+        while True:
+            time.sleep(self._args.reload_interval)
+            if self._watcher.changed():
+                self.reload()
+
+    def reload(self) -> None:
+        """Load the vocab file again, and prepare the quiz of its words."""
+        try:
+            words = read_quiz_words(
+                self._args.vocab_file,
+                self._args.word_type,
+                self._args.min_frequency,
+                self._args.max_frequency,
+            )
+        except (VocabLoadError, OSError) as error:
+            logging.warning(f'could not reload the vocab: {error}.')
+            return
+
+        quiz = prepare_quiz(words, self._args.frequency_weight, self._quiz)
+        self._quiz = quiz
+        with self._lock:
+            self._reloaded = quiz
+        logging.info(f'vocab reloaded: {len(words)} words.')
+
+    def take_reloaded(self) -> QuizVocab | None:
+        """Return the quiz prepared since the last call, if any."""
+        with self._lock:
+            quiz, self._reloaded = self._reloaded, None
+        return quiz
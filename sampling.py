@@ -0,0 +1,184 @@
+"""Drawing random words so that common words come up more often.
+
+Words are weighted by their frequency rank to the power of minus an exponent (1 is the
+most frequent word): with an exponent of 0, every word is as likely as any other; with
+1, the weights follow Zipf's law, which makes the most frequent words dominate a large
+vocab.
+
+Draws use Walker's alias method: building the sampler costs O(n) once, then each draw
+costs a couple of random numbers and list lookups, whatever the vocab size. Words in
+SQLite vocab files are drawn by bands of frequency ranks instead, so that the ranks of
+the words are never all read (see BandSampler). With an exponent of 0, no sampler is
+needed at all.
+"""
+
+from array import array
+from collections.abc import Callable, Sequence
+import random
+
+from vocab import VocabWord
+
+
+DEFAULT_EXPONENT = 0.0
+
+
+def frequency_weights(
+    frequencies: Sequence[int | None], exponent: float = DEFAULT_EXPONENT
+) -> list[float]:
+    """Return the weight of each of the words with the given frequency ranks.
+
+    Words without a frequency rank are weighted like the least frequent word.
+    """
+    known_ranks = [rank for rank in frequencies if rank is not None]
+    rarest = max(known_ranks, default=1)
+    return [
+        max(rank if rank is not None else rarest, 1) ** -exponent
+        for rank in frequencies
+    ]
+
+
+def word_frequencies(words: Sequence[VocabWord]) -> list[int | None]:
+    """Return the frequency rank of each of the given words, or None for the ones
+    without one.
+
+    Vocabs that can read their frequencies without fetching every word (see
+    quiz_vocab.SQLiteWords) are asked for them directly.
+    """
+    frequencies = getattr(words, 'frequencies', None)
+    if frequencies is not None:
+        return frequencies()
+    return [vocab_word.frequency for vocab_word in words]
+
+
+class AliasSampler:
+    """Draws indices with probabilities proportional to the given weights in constant
+    time, with Walker's alias method.
+
+    Each index owns a slot; a draw picks a slot uniformly, then keeps it with the
+    slot's probability, or else takes the slot's alias.
+    """
+    _probabilities: array
+    """The probability of keeping each slot rather than taking its alias (doubles,
+    so that the table stays compact)."""
+    _aliases: array
+    """The index drawn when a slot isn't kept."""
+
+    def __init__(self, weights: Sequence[float]):
+        """Build the tables for the given weights, which must be positive.
+
+        Raise ValueError if there are no weights.
+        """
+        count = len(weights)
+        if not count:
+            raise ValueError('cannot sample from no weights')
+        total = sum(weights)
+        scaled = [weight * count / total for weight in weights]
+        self._probabilities = array('d', bytes(8 * count))
+        self._aliases = array('q', range(count))
+
+        # Vose's variant: pair each slot below the average with one above it
+        small = [index for index, weight in enumerate(scaled) if weight < 1]
+        large = [index for index, weight in enumerate(scaled) if weight >= 1]
+        while small and large:
+            less, more = small.pop(), large[-1]
+            self._probabilities[less] = scaled[less]
+            self._aliases[less] = more
+            scaled[more] += scaled[less] - 1
+            if scaled[more] < 1:
+                small.append(large.pop())
+        # whatever's left is 1 but for rounding errors
+        for index in (*small, *large):
+            self._probabilities[index] = 1.0
+
+    def __len__(self) -> int:
+        return len(self._probabilities)
+
+    def draw(self, rng: random.Random | None = None) -> int:
+        """Return a random index, with the module's generator by default."""
+        uniform = (rng or random).random
+        slot = int(uniform() * len(self._probabilities))
+        if uniform() < self._probabilities[slot]:
+            return slot
+        return self._aliases[slot]
+
+    def probability(self, index: int) -> float:
+        """Return the probability of drawing the given index."""
+        count = len(self._probabilities)
+        probability = self._probabilities[index]
+        for slot, alias in enumerate(self._aliases):
+            if alias == index and slot != index:
+                probability += 1 - self._probabilities[slot]
+        return probability / count
+
+
+class BandSampler:
+    """Draws the indices of words sorted by frequency rank with the weights of
+    frequency_weights(), knowing the first and last index of each band of ranks and
+    the lowest rank in it rather than the rank of every word.
+
+    A band is drawn as if all its words had its lowest rank, with an AliasSampler, then
+    one of its words uniformly; the word is kept with the ratio of its weight to that
+    one, or else everything is drawn again (rejection sampling). With bands of ranks
+    from 2^k to 2^(k+1) - 1, a word is kept at least 2^-exponent of the time, so a draw
+    looks a couple of ranks up on average, whatever the vocab size.
+    """
+    _bands: list[tuple[int, int, int]]
+    """The (first index, last index, lowest rank) of each band."""
+    _band_sampler: AliasSampler
+    """Draws the index of a band."""
+    _rank: Callable[[int], int]
+    """Returns the frequency rank of the word at an index."""
+    _exponent: float
+    """The exponent of the weights."""
+
+    def __init__(
+        self,
+        bands: Sequence[tuple[int, int, int]],
+        rank: Callable[[int], int],
+        exponent: float,
+    ):
+        """Draw from the given (first index, last index, lowest rank) bands of words,
+        weighted with the given exponent, looking their ranks up with the given
+        function.
+
+        Raise ValueError if there are no bands.
+        """
+        self._bands = list(bands)
+        self._band_sampler = AliasSampler([
+            (last - first + 1) * max(lowest, 1) ** -exponent
+            for first, last, lowest in self._bands
+        ])
+        self._rank = rank
+        self._exponent = exponent
+
+    def draw(self, rng: random.Random | None = None) -> int:
+        """Return a random index, with the module's generator by default."""
+        uniform = (rng or random).random
+        while True:
+            first, last, lowest = self._bands[self._band_sampler.draw(rng)]
+            index = first + int(uniform() * (last - first + 1))
+            kept = (max(lowest, 1) / max(self._rank(index), 1)) ** self._exponent
+            if uniform() < kept:
+                return index
+
+
+Sampler = AliasSampler | BandSampler
+"""Draws the indices of weighted words."""
+
+
+def vocab_sampler(
+    words: Sequence[VocabWord], exponent: float = DEFAULT_EXPONENT
+) -> Sampler | None:
+    """Return a sampler of the indices of the given words, weighted by frequency, or
+    None if the exponent is 0, every word then being as likely as any other.
+
+    Vocabs that can tell the bands of their words' frequency ranks (see
+    quiz_vocab.SQLiteWords) get a BandSampler; the others, an AliasSampler.
+    """
+    if exponent == 0:
+        # no need to read the frequencies
+        return None
+    frequency_bands = getattr(words, 'frequency_bands', None)
+    if frequency_bands is not None:
+        return BandSampler(frequency_bands(), getattr(words, 'frequency'), exponent)
+    return AliasSampler(frequency_weights(word_frequencies(words), exponent))
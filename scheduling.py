@@ -0,0 +1,262 @@
+"""Spaced repetition: asking each (word, inflection) item again just before it would be
+forgotten, rather than at random.
+
+Items are scheduled with SM-2: an item answered right at the first attempt comes back
+after 1 day, then 6 days, then its last interval times its ease; an item answered
+wrong comes back within the session, and gets easier to come back later.
+
+The reviews are kept in the scores database, next to the user's settings. The items
+due soonest are read into a heap a page at a time, so picking the next one costs
+O(log n) whatever the number of reviews, and only as many are loaded as are due by the
+time they're asked; new reviews are written back in batches.
+"""
+
+from collections.abc import Iterator
+import heapq
+import math
+import sqlite3
+import threading
+import time
+from typing import NamedTuple
+
+import dbapi
+from inflection import (
+    AdjectiveType, AdjectiveInflection,
+    VerbType, VerbInflection
+)
+from vocab import VocabWord
+
+
+INITIAL_EASE = 2.5
+"""The ease of an item never reviewed."""
+MINIMUM_EASE = 1.3
+"""The lowest ease an item can get, so that its interval still grows."""
+RELEARN_SECONDS = 5 * 60
+"""How long after a wrong answer the item is asked again."""
+SECONDS_PER_DAY = 24 * 60 * 60
+
+
+class ReviewItem(NamedTuple):
+    """A word to be asked in an inflection."""
+    word: str
+    """The word, in dictionary form."""
+    kana: str | None
+    """The kana reading of the word, if it has kanji."""
+    type: VerbType | AdjectiveType
+    """The word's type."""
+    inflection: VerbInflection | AdjectiveInflection
+    """The inflection to conjugate the word to."""
+
+    @classmethod
+    def of(
+        cls, vocab_word: VocabWord, inflection: VerbInflection | AdjectiveInflection
+    ) -> 'ReviewItem':
+        """Return the item asking the given word in the given inflection."""
+        return cls(vocab_word.word, vocab_word.kana, vocab_word.type, inflection)
+
+    def vocab_word(self) -> VocabWord:
+        """Return the word of the item."""
+        return VocabWord(self.word, self.kana, self.type)
+
+
+class ReviewState(NamedTuple):
+    """When an item is due, and how its interval grows."""
+    repetitions: int
+    """How many times in a row the item was answered right at the first attempt."""
+    interval: float
+    """The number of days between the last review and the next."""
+    ease: float
+    """How much longer the next interval is than the last."""
+    due: float
+    """When the item should be asked again, in seconds since the epoch."""
+
+
+def next_state(state: ReviewState | None, correct: bool, now: float) -> ReviewState:
+    """Return the state of an item in the given state (None if it was never reviewed)
+    after answering it right or wrong at the first attempt at the given time.
+
+    SM-2 grades answers from 0 to 5; the quizzers only know right or wrong, graded 4
+    and 1.
+    """
+    if state is None:
+        state = ReviewState(0, 0.0, INITIAL_EASE, now)
+    quality = 4 if correct else 1
+    ease = max(
+        state.ease + 0.1 - (5 - quality) * (0.08 + (5 - quality) * 0.02),
+        MINIMUM_EASE,
+    )
+    if not correct:
+        return ReviewState(0, 0.0, ease, now + RELEARN_SECONDS)
+
+    if state.repetitions == 0:
+        interval = 1.0
+    elif state.repetitions == 1:
+        interval = 6.0
+    else:
+        interval = state.interval * ease
+    return ReviewState(
+        state.repetitions + 1, interval, ease, now + interval * SECONDS_PER_DAY
+    )
+
+
+class Scheduler:
+    """Tells which item is due next, and stores how each item was answered.
+
+    Every item due by `_loaded_until` is in the heap; the others are read from the
+    database when that time comes. An item rescheduled within that time is pushed
+    again, and its earlier entry is dropped when it's popped, since its due time no
+    longer matches the item's.
+
+    It can be used from several threads, if its connection can too (see the
+    check_same_thread argument of sqlite3.connect()).
+    """
+    _connection: sqlite3.Connection
+    """The scores database."""
+    _batch_size: int
+    """How many reviews to keep before writing them back."""
+    _page_size: int
+    """How many reviews to read at a time."""
+    _due: list[tuple[float, int, ReviewItem]]
+    """The (due, order, item) of the items due by _loaded_until, as a heap; the order
+    keeps items due at the same time from being compared."""
+    _states: dict[ReviewItem, ReviewState]
+    """The state of every item read or reviewed."""
+    _unsaved: dict[ReviewItem, ReviewState]
+    """The states not written back yet."""
+    _loaded_until: float
+    """The time by which every due item is in the heap."""
+    _pushed: int
+    """How many entries were ever pushed onto the heap."""
+    _lock: threading.RLock
+    """Held by every public method, so that they can be called from any thread."""
+
+    def __init__(
+        self,
+        connection: sqlite3.Connection,
+        batch_size: int = 20,
+        page_size: int = 1_000,
+    ):
+        """Schedule the items reviewed in the given database; nothing is read from it
+        until an item is asked for.
+        """
+        self._connection = connection
+        self._batch_size = batch_size
+        self._page_size = page_size
+        self._due = []
+        self._states = {}
+        self._unsaved = {}
+        self._loaded_until = -math.inf
+        self._pushed = 0
+        self._lock = threading.RLock()
+        dbapi.create_review_table_if_nexists(connection)
+
+    def _push(self, item: ReviewItem, due: float) -> None:
+        heapq.heappush(self._due, (due, self._pushed, item))
+        self._pushed += 1
+
+    def _load_page(self) -> None:
+        """Read the next page of the items due after _loaded_until into the heap."""
+        rows = dbapi.get_reviews_due_after(
+            self._connection, self._loaded_until, self._page_size
+        )
+        loaded_from = self._loaded_until
+        self._loaded_until = rows[-1][-1] if len(rows) >= self._page_size else math.inf
+        for word, kana, type_str, inflection_id, *values in rows:
+            try:
+                item = _review_item(word, kana, type_str, inflection_id)
+            except (ValueError, IndexError):
+                continue  # not asked by this version
+            if item in self._unsaved:
+                continue  # outdated; pushed below
+            state = ReviewState(*values)
+            self._states[item] = state
+            self._push(item, state.due)
+        for item, state in self._unsaved.items():
+            if loaded_from < state.due <= self._loaded_until:
+                self._push(item, state.due)
+
+    def next_due(self, now: float | None = None) -> ReviewItem | None:
+        """Return the item due the longest, taking it off the queue, or None if none
+        is due at the given time (now by default).
+        """
+        if now is None:
+            now = time.time()
+        with self._lock:
+            while True:
+                while self._due:
+                    due, _, item = self._due[0]
+                    if self._states[item].due != due:
+                        heapq.heappop(self._due)  # rescheduled since
+                        continue
+                    if due > now:
+                        return None
+                    heapq.heappop(self._due)
+                    return item
+                if self._loaded_until >= now:
+                    return None
+                self._load_page()
+
+    def state(self, item: ReviewItem) -> ReviewState | None:
+        """Return the state of the given item, or None if it was never reviewed."""
+        with self._lock:
+            state = self._states.get(item)
+            if state is None:
+                row = dbapi.get_review(self._connection, *_review_key(item))
+                if row is None:
+                    return None
+                state = self._states[item] = ReviewState(*row)
+            return state
+
+    def review(
+        self, item: ReviewItem, correct: bool, now: float | None = None
+    ) -> ReviewState:
+        """Reschedule the given item after answering it right or wrong at the first
+        attempt at the given time (now by default), and return its new state.
+        """
+        if now is None:
+            now = time.time()
+        with self._lock:
+            state = next_state(self.state(item), correct, now)
+            self._states[item] = state
+            self._unsaved[item] = state
+            if state.due <= self._loaded_until:
+                self._push(item, state.due)
+            if len(self._unsaved) >= self._batch_size:
+                self.flush()
+            return state
+
+    def flush(self) -> None:
+        """Write the reviews not written yet back to the database."""
+        with self._lock:
+            if self._unsaved:
+                dbapi.set_reviews(self._connection, _review_rows(self._unsaved))
+                self._unsaved = {}
+
+
+def _review_key(item: ReviewItem) -> tuple[str, str, str, int]:
+    """Return the (word, kana, type, inflection) columns of the given item."""
+    return (item.word, item.kana or '', item.type.value, item.inflection.id)
+
+def _review_rows(
+    states: dict[ReviewItem, ReviewState]
+) -> Iterator[tuple[str, str, str, int, int, float, float, float]]:
+    """Yield the row of each of the given items in the given state."""
+    for item, state in states.items():
+        yield (*_review_key(item), *state)
+
+def _review_item(
+    word: str, kana: str, type_str: str, inflection_id: int
+) -> ReviewItem:
+    """Return the item of the given columns.
+
+    Raise ValueError if the type is unknown, and IndexError if the inflection is.
+    """
+    word_type: VerbType | AdjectiveType
+    inflection: VerbInflection | AdjectiveInflection
+    if type_str.startswith('verb'):
+        word_type = VerbType(type_str)
+        inflection = VerbInflection.from_id(inflection_id)
+    else:
+        word_type = AdjectiveType(type_str)
+        inflection = AdjectiveInflection.from_id(inflection_id)
+    return ReviewItem(word, kana or None, word_type, inflection)
@@ -0,0 +1,97 @@
+import pytest
+
+import conjugator
+from inflection import (
+    AdjectiveType, AdjectiveInflection,
+    VerbType, VerbInflection,
+)
+
+
+sample_verbs = (
+    ('考える', VerbType.ICHIDAN),
+    ('書く', VerbType.GODAN),
+    ('勉強する', VerbType.ICHIDAN_IRREGULAR),
+    ('泳ぐ', VerbType.GODAN),
+    ('来る', VerbType.ICHIDAN_IRREGULAR),
+    ('信じる', VerbType.ICHIDAN),
+)
+
+sample_adjectives = (
+    ('強い', AdjectiveType.I),
+    ('有名', AdjectiveType.NA),
+    ('かっこいい', AdjectiveType.I_YOI_II),
+    ('美味しい', AdjectiveType.I),
+    ('綺麗', AdjectiveType.NA),
+)
+
+ITERATIONS = 20
+
+
+def test_conjugate_verbs_batch_matches_conjugate_verb():
+    verbs = []
+    verb_types = []
+    inflections = []
+    for _ in range(ITERATIONS):
+        for verb, verb_type in sample_verbs:
+            verbs.append(verb)
+            verb_types.append(verb_type)
+            inflections.append(VerbInflection.generate_random())
+
+    assert conjugator.conjugate_verbs_batch(verbs, verb_types, inflections) == [
+        conjugator.conjugate_verb(verb, verb_type, inflection)
+        for verb, verb_type, inflection in zip(verbs, verb_types, inflections)
+    ]
+
+def test_conjugate_verbs_batch_with_jvc_engine_matches_conjugate_verb():
+    engine = conjugator.get_verb_engine()
+    conjugator.set_verb_engine(conjugator.VerbEngine.JVC)
+    try:
+        verbs = [verb for verb, _ in sample_verbs]
+        verb_types = [verb_type for _, verb_type in sample_verbs]
+        inflections = [VerbInflection.generate_random() for _ in sample_verbs]
+        assert conjugator.conjugate_verbs_batch(verbs, verb_types, inflections) == [
+            conjugator.conjugate_verb(verb, verb_type, inflection)
+            for verb, verb_type, inflection in zip(verbs, verb_types, inflections)
+        ]
+    finally:
+        conjugator.set_verb_engine(engine)
+
+def test_conjugate_verbs_batch_empty():
+    assert conjugator.conjugate_verbs_batch((), (), ()) == []
+
+def test_conjugate_verbs_batch_different_lengths_raises_value_error():
+    with pytest.raises(ValueError):
+        conjugator.conjugate_verbs_batch(
+            ('書く', '読む'), (VerbType.GODAN,), (VerbInflection(),)
+        )
+
+
+def test_conjugate_adjectives_batch_matches_conjugate_adjective():
+    adjectives = []
+    adjective_types = []
+    inflections = []
+    for _ in range(ITERATIONS):
+        for adjective, adjective_type in sample_adjectives:
+            adjectives.append(adjective)
+            adjective_types.append(adjective_type)
+            inflections.append(AdjectiveInflection.generate_random(adjective_type))
+
+    assert conjugator.conjugate_adjectives_batch(
+        adjectives, adjective_types, inflections
+    ) == [
+        conjugator.conjugate_adjective(adjective, adjective_type, inflection)
+        for adjective, adjective_type, inflection
+        in zip(adjectives, adjective_types, inflections)
+    ]
+
+def test_conjugate_adjectives_batch_different_lengths_raises_value_error():
+    with pytest.raises(ValueError):
+        conjugator.conjugate_adjectives_batch(
+            ('強い',), (AdjectiveType.I, AdjectiveType.NA), (AdjectiveInflection(),)
+        )
+
+def test_conjugate_adjectives_batch_illegal_type_raises_value_error():
+    with pytest.raises(ValueError):
+        conjugator.conjugate_adjectives_batch(
+            ('書く',), (VerbType.GODAN,), (AdjectiveInflection(),)
+        )
@@ -0,0 +1,85 @@
+import pytest
+
+import conjugator
+from inflection import (
+    AdjectiveType, AdjectiveInflection,
+    VerbType, VerbInflection,
+)
+
+
+@pytest.fixture(autouse=True)
+def disable_cache_afterwards():
+    yield
+    conjugator.disable_cache()
+
+
+def test_cache_is_disabled_by_default():
+    assert conjugator.cache_stats() is None
+
+def test_cache_counts_hits_and_misses():
+    conjugator.enable_cache(maxsize=10)
+    inflection = VerbInflection(polarity=VerbInflection.Polarity.NEGATIVE)
+    for _ in range(3):
+        assert conjugator.conjugate_verb(
+            '書く', VerbType.GODAN, inflection
+        ) == '書かない'
+    assert conjugator.conjugate_adjective(
+        '強い',
+        AdjectiveType.I,
+        AdjectiveInflection(polarity=AdjectiveInflection.Polarity.NEGATIVE),
+    ) == '強くない'
+
+    stats = conjugator.cache_stats()
+    assert stats.hits == 2
+    assert stats.misses == 2
+    assert stats.evictions == 0
+    assert stats.size == 2
+    assert stats.hit_rate == 0.5
+
+def test_cache_evicts_least_recently_used():
+    conjugator.enable_cache(maxsize=2)
+    negative, past, polite = (
+        VerbInflection(polarity=VerbInflection.Polarity.NEGATIVE),
+        VerbInflection(tense=VerbInflection.Tense.PAST),
+        VerbInflection(base_form=VerbInflection.BaseForm.POLITE),
+    )
+    conjugator.conjugate_verb('書く', VerbType.GODAN, negative)
+    conjugator.conjugate_verb('書く', VerbType.GODAN, past)
+    conjugator.conjugate_verb('書く', VerbType.GODAN, negative)  # past is now the LRU
+    conjugator.conjugate_verb('書く', VerbType.GODAN, polite)  # evicts past
+    conjugator.conjugate_verb('書く', VerbType.GODAN, negative)
+
+    stats = conjugator.cache_stats()
+    assert stats.evictions == 1
+    assert stats.size == 2
+    assert stats.hits == 2
+
+    conjugator.conjugate_verb('書く', VerbType.GODAN, past)
+    assert conjugator.cache_stats().misses == 4
+
+def test_cache_keys_include_the_word_type():
+    conjugator.enable_cache()
+    inflection = VerbInflection(polarity=VerbInflection.Polarity.NEGATIVE)
+    assert conjugator.conjugate_verb('切る', VerbType.GODAN, inflection) == '切らない'
+    assert conjugator.conjugate_verb('切る', VerbType.ICHIDAN, inflection) == '切ない'
+
+def test_enable_cache_invalid_maxsize_raises_value_error():
+    with pytest.raises(ValueError):
+        conjugator.enable_cache(maxsize=0)
+
+def test_set_verb_engine_empties_the_cache_and_keeps_its_counters():
+    engine = conjugator.get_verb_engine()
+    conjugator.enable_cache(maxsize=10)
+    for _ in range(2):
+        conjugator.conjugate_verb('書く', VerbType.GODAN, VerbInflection.all()[0])
+    try:
+        conjugator.set_verb_engine(conjugator.VerbEngine.JVC)
+        stats = conjugator.cache_stats()
+        assert stats.size == 0
+        assert stats.maxsize == 10
+        assert (stats.hits, stats.misses) == (1, 1)
+
+        conjugator.conjugate_verb('書く', VerbType.GODAN, VerbInflection.all()[0])
+        assert conjugator.cache_stats().misses == 2
+    finally:
+        conjugator.set_verb_engine(engine)
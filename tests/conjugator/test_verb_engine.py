@@ -0,0 +1,85 @@
+import json
+from os import path
+
+import pytest
+
+import conjugator
+from inflection import (
+    VerbType, VerbInflection,
+)
+
+
+# a sample of a generated vocab: verbs of every ending and type, compounds, and
+# words with their kana readings
+VOCAB_PATH = path.join(path.dirname(__file__), 'sample_vocab.json')
+
+every_verb_inflection = tuple(
+    VerbInflection.from_id(inflection_id)
+    for inflection_id in range(VerbInflection.COUNT)
+)
+
+# every ending, plus the verbs japanese_verb_conjugator_v2 treats specially
+sample_verbs = (
+    *(
+        (verb, VerbType.GODAN) for verb in (
+            '言う', '問う', '書く', '泳ぐ', '話す', '待つ', '死ぬ', '遊ぶ', '読む',
+            '分かる', 'わかる', '入る', 'ある', '有る', '行く', 'いく', '出て行く',
+            'なさる', '下さる', 'いらっしゃる', 'おっしゃる', 'ござる',
+        )
+    ),
+    *(
+        (verb, VerbType.ICHIDAN) for verb in (
+            '食べる', '見る', 'いる', '出る', '考える', '信じる',
+        )
+    ),
+    *(
+        (verb, VerbType.ICHIDAN_IRREGULAR) for verb in (
+            'する', '勉強する', 'インストールする', 'くる', '来る', '持って来る',
+            '連れてくる',
+        )
+    ),
+)
+
+
+def assert_engines_agree(verb: str, verb_type: VerbType) -> None:
+    for inflection in every_verb_inflection:
+        conjugator.set_verb_engine(conjugator.VerbEngine.JVC)
+        expected = conjugator.conjugate_verb(verb, verb_type, inflection)
+        conjugator.set_verb_engine(conjugator.VerbEngine.NATIVE)
+        actual = conjugator.conjugate_verb(verb, verb_type, inflection)
+        assert actual == expected, (verb, inflection.formatted())
+
+
+@pytest.fixture(autouse=True)
+def restore_verb_engine():
+    engine = conjugator.get_verb_engine()
+    yield
+    conjugator.set_verb_engine(engine)
+
+
+def test_native_verb_engine_matches_jvc_on_sample_verbs():
+    for verb, verb_type in sample_verbs:
+        assert_engines_agree(verb, verb_type)
+
+def test_native_verb_engine_matches_jvc_on_vocab():
+    with open(VOCAB_PATH) as vocab_file:
+        words = json.load(vocab_file)
+    verbs = [word_info for word_info in words if word_info['type'].startswith('verb')]
+    assert verbs
+    for word_info in verbs:
+        verb_type = VerbType(word_info['type'])
+        assert_engines_agree(word_info['word'], verb_type)
+        if word_info['kana'] is not None:
+            assert_engines_agree(word_info['kana'], verb_type)
+
+def test_native_verb_engine_rejects_invalid_endings():
+    conjugator.set_verb_engine(conjugator.VerbEngine.NATIVE)
+    inflection = VerbInflection(polarity=VerbInflection.Polarity.NEGATIVE)
+    with pytest.raises(ValueError):
+        conjugator.conjugate_verb('食べろ', VerbType.GODAN, inflection)
+    with pytest.raises(ValueError):
+        conjugator.conjugate_verb('る', VerbType.ICHIDAN, inflection)
+    with pytest.raises(ValueError):
+        conjugator.conjugate_verb('書く', VerbType.ICHIDAN, inflection)
+    with pytest.raises(ValueError):
+        conjugator.conjugate_verb('食べる', VerbType.ICHIDAN_IRREGULAR, inflection)
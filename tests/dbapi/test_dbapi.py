@@ -111,3 +111,69 @@ def test_set_reveal_answer_on_failure(connection: sqlite3.Connection) -> None:
     row = result.fetchone()
     reveal_answer_on_failure = row[0]
     assert not reveal_answer_on_failure
+
+
+def test_insert_vocab_words_sorts_by_type_then_frequency(
+    connection_empty_db: sqlite3.Connection
+):
+    dbapi.create_vocab_table_if_nexists(connection_empty_db)
+    dbapi.insert_vocab_words(connection_empty_db, (
+        ('強い', 'つよい', 'adjective-i', 20),
+        ('書く', 'かく', 'verb-godan', 30),
+        ('話す', 'はなす', 'verb-godan', 10),
+        ('読む', 'よむ', 'verb-godan', 30),
+    ))
+    assert [dbapi.get_vocab_word(connection_empty_db, i) for i in (1, 2, 3, 4)] == [
+        ('強い', 'つよい', 'adjective-i', 20),
+        ('話す', 'はなす', 'verb-godan', 10),
+        ('書く', 'かく', 'verb-godan', 30),
+        ('読む', 'よむ', 'verb-godan', 30),
+    ]
+
+    # inserting again replaces the words
+    dbapi.insert_vocab_words(connection_empty_db, (('話す', 'はなす', 'verb-godan', 1),))
+    assert dbapi.get_vocab_word(connection_empty_db, 2) is None
+
+def test_get_vocab_id_range(connection_empty_db: sqlite3.Connection):
+    dbapi.create_vocab_table_if_nexists(connection_empty_db)
+    dbapi.insert_vocab_words(connection_empty_db, (
+        (str(frequency), None, word_type, frequency)
+        for word_type in ('verb-godan', 'adjective-i')
+        for frequency in (10, 20, 30, 40)
+    ))
+    assert dbapi.get_vocab_id_range(connection_empty_db, 'adjective-i', 0, 100) \
+        == (1, 4)
+    assert dbapi.get_vocab_id_range(connection_empty_db, 'verb-godan', 15, 30) \
+        == (6, 7)
+    assert dbapi.get_vocab_id_range(connection_empty_db, 'verb-godan', 41, 50) is None
+    assert dbapi.get_vocab_id_range(connection_empty_db, 'adjective-na', 0, 100) \
+        is None
+
+def test_set_reviews_replaces_the_same_item(connection_empty_db: sqlite3.Connection):
+    dbapi.create_review_table_if_nexists(connection_empty_db)
+    dbapi.set_reviews(connection_empty_db, (
+        ('書く', 'かく', 'verb-godan', 1, 0, 0.0, 2.5, 300.0),
+        ('書く', 'かく', 'verb-godan', 2, 0, 0.0, 2.5, 300.0),
+    ))
+    dbapi.set_reviews(connection_empty_db, (
+        ('書く', 'かく', 'verb-godan', 1, 1, 1.0, 2.5, 86400.0),
+    ))
+    assert dbapi.get_review(connection_empty_db, '書く', 'かく', 'verb-godan', 1) \
+        == (1, 1.0, 2.5, 86400.0)
+    assert dbapi.get_review(connection_empty_db, '書く', 'かく', 'verb-godan', 3) \
+        is None
+
+def test_get_reviews_due_after_keeps_equal_due_times_together(
+    connection_empty_db: sqlite3.Connection
+):
+    dbapi.create_review_table_if_nexists(connection_empty_db)
+    dbapi.set_reviews(connection_empty_db, (
+        (word, '', 'verb-godan', 1, 0, 0.0, 2.5, float(due))
+        for word, due in zip('abcde', (30, 10, 20, 20, 40))
+    ))
+    rows = dbapi.get_reviews_due_after(connection_empty_db, 10.0, 2)
+    assert [row[-1] for row in rows] == [20.0, 20.0]
+    rows = dbapi.get_reviews_due_after(connection_empty_db, 0.0, 2)
+    assert [row[-1] for row in rows] == [10.0, 20.0, 20.0]
+    rows = dbapi.get_reviews_due_after(connection_empty_db, 20.0, 10)
+    assert [row[0] for row in rows] == ['a', 'e']
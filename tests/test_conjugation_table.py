@@ -0,0 +1,121 @@
+import pytest
+
+import conjugator
+from conjugation_table import ConjugationTable, _SPACE_INFLECTIONS, _TYPE_SPACES
+from inflection import (
+    AdjectiveType, AdjectiveInflection,
+    VerbType, VerbInflection,
+)
+from vocab import VocabWord
+
+
+sample_words = tuple(map(VocabWord.from_dict, (
+    {'word': '考える', 'kana': 'かんがえる', 'type': 'verb-ichidan'},
+    {'word': '書く', 'kana': 'かく', 'type': 'verb-godan'},
+    {'word': '勉強する', 'kana': 'べんきょうする', 'type': 'verb-ichidan-irregular'},
+    {'word': '強い', 'kana': 'つよい', 'type': 'adjective-i'},
+    {'word': 'かっこいい', 'kana': None, 'type': 'adjective-i-yoi-ii'},
+    {'word': '有名', 'kana': 'ゆうめい', 'type': 'adjective-na'},
+)))
+
+
+def test_conjugation_table_answers_match_conjugator():
+    table = ConjugationTable(sample_words)
+    for word_index, vocab_word in enumerate(sample_words):
+        word = vocab_word.word
+        if isinstance(vocab_word.type, VerbType):
+            verb_type = vocab_word.type
+            for inflection in _SPACE_INFLECTIONS[_TYPE_SPACES[verb_type]]:
+                assert table.answer(word_index, inflection) \
+                    == conjugator.conjugate_verb(word, verb_type, inflection)
+        else:
+            adjective_type = vocab_word.type
+            for inflection in _SPACE_INFLECTIONS[_TYPE_SPACES[adjective_type]]:
+                assert table.answer(word_index, inflection) \
+                    == conjugator.conjugate_adjective(word, adjective_type, inflection)
+
+def test_conjugation_table_answer_accepts_any_equal_inflection():
+    table = ConjugationTable(sample_words)
+    assert table.answer(
+        1, VerbInflection(tense=VerbInflection.Tense.PAST)
+    ) == '書いた'
+    assert table.answer(
+        5,
+        AdjectiveInflection(
+            polarity=AdjectiveInflection.Polarity.NEGATIVE,
+            politeness=AdjectiveInflection.Politeness.PLAIN,
+        )
+    ) == '有名じゃない'
+
+def test_conjugation_table_kana_answers_match_conjugator():
+    table = ConjugationTable(sample_words)
+    for word_index, vocab_word in enumerate(sample_words):
+        kana_reading = vocab_word.kana
+        if isinstance(vocab_word.type, VerbType):
+            verb_type = vocab_word.type
+            for inflection in _SPACE_INFLECTIONS[_TYPE_SPACES[verb_type]]:
+                assert table.kana_answer(word_index, inflection) \
+                    == conjugator.conjugate_verb(kana_reading, verb_type, inflection)
+        else:
+            adjective_type = vocab_word.type
+            for inflection in _SPACE_INFLECTIONS[_TYPE_SPACES[adjective_type]]:
+                if kana_reading is None:
+                    assert table.kana_answer(word_index, inflection) is None
+                else:
+                    assert table.kana_answer(word_index, inflection) \
+                        == conjugator.conjugate_adjective(
+                            kana_reading, adjective_type, inflection
+                        )
+
+def test_conjugation_table_acceptable_answers():
+    table = ConjugationTable(sample_words)
+    past = VerbInflection(tense=VerbInflection.Tense.PAST)
+    assert table.acceptable_answers(1, past) == {'書いた', 'かいた'}
+    negative = AdjectiveInflection(polarity=AdjectiveInflection.Polarity.NEGATIVE)
+    assert table.acceptable_answers(4, negative) == {'かっこよくない'}
+
+def test_conjugation_table_kana_reading_equal_to_word_is_not_repeated():
+    table = ConjugationTable((VocabWord('いる', 'いる', VerbType.ICHIDAN),))
+    past = VerbInflection(tense=VerbInflection.Tense.PAST)
+    assert table.kana_answer(0, past) is None
+    assert table.acceptable_answers(0, past) == {'いた'}
+    assert [answer for _, _, answer in table.items()].count('いた') == 1
+
+def test_conjugation_table_unasked_inflection_raises_key_error():
+    table = ConjugationTable(sample_words)
+    with pytest.raises(KeyError):
+        table.acceptable_answers(3, AdjectiveInflection())
+
+def test_conjugation_table_covers_every_generated_inflection():
+    table = ConjugationTable(sample_words)
+    for _ in range(1_000):
+        table.answer(0, VerbInflection.generate_random())
+        table.answer(3, AdjectiveInflection.generate_random(AdjectiveType.I))
+        table.answer(4, AdjectiveInflection.generate_random(AdjectiveType.I_YOI_II))
+        table.answer(5, AdjectiveInflection.generate_random(AdjectiveType.NA))
+
+def test_conjugation_table_size():
+    table = ConjugationTable(sample_words)
+    assert len(table) == 3*9 + 3*7
+    assert table.nbytes > 0
+    assert table.build_seconds >= 0
+
+def test_conjugation_table_reuses_previous_answers():
+    previous_words = sample_words[:4]
+    previous = ConjugationTable(previous_words)
+    words = (
+        sample_words[5],
+        sample_words[1],
+        VocabWord('考える', None, VerbType.ICHIDAN),  # its kana reading changed
+        sample_words[3],
+        sample_words[4],
+    )
+    table = ConjugationTable(words, (previous_words, previous))
+    assert table.reused_count == 2
+
+    fresh = ConjugationTable(words)
+    assert len(table) == len(fresh)
+    for word_index, vocab_word in enumerate(words):
+        for inflection in _SPACE_INFLECTIONS[_TYPE_SPACES[vocab_word.type]]:
+            assert table.acceptable_answers(word_index, inflection) \
+                == fresh.acceptable_answers(word_index, inflection)
@@ -0,0 +1,65 @@
+from conjugation_table import ConjugationTable
+from deinflection import DeinflectionIndex
+from inflection import (
+    AdjectiveInflection,
+    VerbInflection,
+)
+from vocab import VocabWord
+
+
+sample_words = tuple(map(VocabWord.from_dict, (
+    {'word': '書く', 'kana': 'かく', 'type': 'verb-godan'},
+    {'word': 'ある', 'kana': None, 'type': 'verb-godan'},
+    {'word': 'ない', 'kana': None, 'type': 'adjective-i'},
+    {'word': '有名', 'kana': 'ゆうめい', 'type': 'adjective-na'},
+)))
+
+
+def build_index() -> DeinflectionIndex:
+    table = ConjugationTable(sample_words)
+    return DeinflectionIndex(sample_words, table)
+
+
+def test_deinflection_index_lookup_finds_every_answer():
+    table = ConjugationTable(sample_words)
+    index = DeinflectionIndex(sample_words, table)
+    for word_index, inflection, answer in table.items():
+        assert (word_index, inflection) in index.lookup(answer)
+
+def test_deinflection_index_lookup_finds_default_inflections():
+    index = build_index()
+    assert index.lookup('書く') == ((0, VerbInflection()),)
+    assert (3, AdjectiveInflection()) in index.lookup('有名')
+    assert index.lookup('有名だ') == (
+        (3, AdjectiveInflection(politeness=AdjectiveInflection.Politeness.PLAIN)),
+    )
+
+def test_deinflection_index_lookup_finds_kana_readings():
+    index = build_index()
+    assert index.lookup('かく') == ((0, VerbInflection()),)
+    assert index.lookup('かかない') == (
+        (0, VerbInflection(polarity=VerbInflection.Polarity.NEGATIVE)),
+    )
+    assert index.lookup('ゆうめいだ') == (
+        (3, AdjectiveInflection(politeness=AdjectiveInflection.Politeness.PLAIN)),
+    )
+
+def test_deinflection_index_lookup_returns_every_word_with_the_form():
+    index = build_index()
+    # negative of ある, and the adjective ない itself
+    assert set(index.lookup('ない')) == {
+        (1, VerbInflection(polarity=VerbInflection.Polarity.NEGATIVE)),
+        (2, AdjectiveInflection()),
+    }
+
+def test_deinflection_index_lookup_unknown_form():
+    assert build_index().lookup('書けない') == ()
+
+def test_deinflection_index_diagnose():
+    index = build_index()
+    assert index.diagnose(0, '書いた') is VerbInflection(
+        tense=VerbInflection.Tense.PAST
+    )
+    assert index.diagnose(2, 'ない') is AdjectiveInflection()
+    assert index.diagnose(0, 'ない') is None
+    assert index.diagnose(0, '書けない') is None
@@ -0,0 +1,64 @@
+import csv
+import importlib
+import io
+import json
+
+import pytest
+
+export_paradigms = importlib.import_module('export-paradigms')
+
+
+sample_words = (
+    {'word': '考える', 'kana': 'かんがえる', 'type': 'verb-ichidan'},
+    {'word': '書く', 'kana': 'かく', 'type': 'verb-godan'},
+    {'word': '勉強する', 'kana': 'べんきょうする', 'type': 'verb-ichidan-irregular'},
+    {'word': '強い', 'kana': 'つよい', 'type': 'adjective-i'},
+    {'word': 'かっこいい', 'kana': None, 'type': 'adjective-i-yoi-ii'},
+    {'word': '有名', 'kana': 'ゆうめい', 'type': 'adjective-na'},
+)
+
+
+def export(output_format: str, jobs: int, chunk_size: int) -> tuple[int, str]:
+    output_file = io.StringIO(newline='')
+    row_count = export_paradigms.export_paradigms(
+        sample_words, output_file, output_format, jobs, chunk_size
+    )
+    return row_count, output_file.getvalue()
+
+
+def test_export_paradigms_csv():
+    row_count, output = export('csv', 1, 500)
+    rows = list(csv.reader(io.StringIO(output)))
+    assert rows[0] == list(export_paradigms.COLUMNS)
+    assert row_count == len(rows) - 1 == 3*9 + 3*7
+    assert ['書く', 'かく', 'verb-godan', '[PAST]', '書いた', 'かいた'] in rows
+    assert [
+        'かっこいい', '', 'adjective-i-yoi-ii', '[NEGATIVE]', 'かっこよくない', ''
+    ] in rows
+
+def test_export_paradigms_jsonl():
+    row_count, output = export('jsonl', 1, 500)
+    rows = [json.loads(line) for line in output.splitlines()]
+    assert row_count == len(rows) == 3*9 + 3*7
+    assert {
+        'word': '有名',
+        'kana': 'ゆうめい',
+        'type': 'adjective-na',
+        'inflection': '[NEGATIVE]',
+        'answer': '有名じゃない',
+        'kana_answer': 'ゆうめいじゃない',
+    } in rows
+
+@pytest.mark.parametrize('output_format', export_paradigms.FORMATS)
+def test_export_paradigms_parallel_output_matches_serial(output_format):
+    serial = export(output_format, 1, 500)
+    assert export(output_format, 2, 1) == serial
+    assert export(output_format, 3, 4) == serial
+
+def test_export_paradigms_illegal_type_raises_value_error():
+    with pytest.raises(ValueError):
+        export_paradigms.export_paradigms(
+            ({'word': '書く', 'kana': 'かく', 'type': 'noun'},),
+            io.StringIO(),
+            'csv',
+        )
@@ -0,0 +1,389 @@
+import argparse
+import importlib
+import io
+import json
+import os
+import subprocess
+import sys
+import urllib.request
+import zipfile
+
+import pytest
+
+from inflection import AdjectiveType, VerbType
+import vocab
+
+gen_vocab = importlib.import_module('gen-vocab')
+
+
+def jmdict_entry(kanji: str | None, kana: str, tag: str) -> dict:
+    return {
+        'id': kanji or kana,
+        'kanji': [{'common': True, 'text': kanji}] if kanji else [],
+        'kana': [{'common': True, 'text': kana}],
+        'sense': [{'partOfSpeech': [tag]}],
+    }
+
+
+sample_jmdict = {
+    'version': '3.6.1',
+    'tags': {'v5k': 'Godan verb with \'ku\' ending', 'words': '[not the words]'},
+    'words': [
+        jmdict_entry('書く', 'かく', 'v5k'),
+        jmdict_entry('食べる', 'たべる', 'v1'),
+        jmdict_entry('強い', 'つよい', 'adj-i'),
+        jmdict_entry('有名', 'ゆうめい', 'adj-na'),
+        jmdict_entry('分かる', 'わかる', 'v5r'),
+        # a homograph of 書く; only the first entry with a spelling gets it
+        jmdict_entry('書く', 'かく', 'v5k'),
+        jmdict_entry('本', 'ほん', 'n'),
+        jmdict_entry(None, 'ゆっくり', 'adv'),
+    ],
+}
+
+sample_jpdb = [
+    ['書く', 'freq', {'value': 30, 'displayValue': '30'}],
+    ['食べる', 'freq', {'reading': 'たべる', 'frequency': {'value': 10}}],
+    ['強い', 'freq', {'value': 20}],
+    ['ゆうめい', 'freq', {'value': 40}],
+    ['本', 'freq', {'value': 1}],
+    ['ゆっくり', 'freq', {'value': 50}],
+    ['分かる', 'freq', {'value': 60}],
+    ['わかる', 'freq', {'value': 15}],
+]
+
+
+GEN_VOCAB_PATH = os.path.join(os.path.dirname(__file__), '..', 'gen-vocab.py')
+
+
+def archive(member: str, document: object) -> io.BytesIO:
+    archive_file = io.BytesIO()
+    with zipfile.ZipFile(archive_file, 'w', zipfile.ZIP_DEFLATED) as zip_file:
+        zip_file.writestr(member, json.dumps(document, ensure_ascii=False))
+    archive_file.seek(0)
+    return archive_file
+
+
+def write_archive(file_path, member: str, document: object) -> str:
+    file_path.write_bytes(archive(member, document).getvalue())
+    return str(file_path)
+
+
+@pytest.mark.parametrize('chunk_size', (1, 2, 7, 1 << 16))
+def test_iter_json_array_across_chunk_boundaries(chunk_size):
+    document = json.dumps(sample_jmdict, ensure_ascii=False, indent=1)
+    items = gen_vocab.iter_json_array(io.StringIO(document), 'words', chunk_size)
+    assert list(items) == sample_jmdict['words']
+
+    numbers = [1, 22, 333, -4.5e10, 'x', None, [], {}]
+    items = gen_vocab.iter_json_array(
+        io.StringIO(json.dumps(numbers)), chunk_size=chunk_size
+    )
+    assert list(items) == numbers
+
+def test_iter_json_array_empty():
+    assert list(gen_vocab.iter_json_array(io.StringIO(' [ ] '))) == []
+    assert list(gen_vocab.iter_json_array(io.StringIO('{"a": 1, "b": []}'), 'b')) == []
+
+def test_iter_json_array_malformed():
+    with pytest.raises(ValueError):
+        list(gen_vocab.iter_json_array(io.StringIO('{"words": 1}'), 'words'))
+    with pytest.raises(ValueError):
+        list(gen_vocab.iter_json_array(io.StringIO('{"version": 1}'), 'words'))
+    with pytest.raises(ValueError):
+        list(gen_vocab.iter_json_array(io.StringIO('[{"a": 1}, {"b": '), chunk_size=4))
+
+def test_read_jpdb_frequencies():
+    frequencies = gen_vocab.read_jpdb_frequencies(
+        archive(gen_vocab.JPDB_MEMBER, sample_jpdb)
+    )
+    # 1-character words are skipped
+    assert frequencies == {
+        '書く': 30, '食べる': 10, '強い': 20, 'ゆうめい': 40, 'ゆっくり': 50,
+        '分かる': 60, 'わかる': 15,
+    }
+
+def test_iter_simplified_jmdict_words_streams_entries():
+    words = gen_vocab.iter_simplified_jmdict_words(
+        archive(gen_vocab.JMDICT_MEMBER, sample_jmdict)
+    )
+    assert next(words) == sample_jmdict['words'][0]
+    assert list(words) == sample_jmdict['words'][1:]
+
+def test_iter_merged_words():
+    frequencies = gen_vocab.read_jpdb_frequencies(
+        archive(gen_vocab.JPDB_MEMBER, sample_jpdb)
+    )
+    words = gen_vocab.iter_merged_words(
+        gen_vocab.iter_simplified_jmdict_words(
+            archive(gen_vocab.JMDICT_MEMBER, sample_jmdict)
+        ),
+        frequencies,
+    )
+    assert list(words) == [
+        {'word': '書く', 'kana': 'かく', 'type': VerbType.GODAN, 'frequency': 30},
+        {'word': '食べる', 'kana': 'たべる', 'type': VerbType.ICHIDAN, 'frequency': 10},
+        {'word': '強い', 'kana': 'つよい', 'type': AdjectiveType.I, 'frequency': 20},
+        {'word': 'ゆうめい', 'kana': None, 'type': AdjectiveType.NA, 'frequency': 40},
+        # the most frequent spelling of the entry
+        {'word': 'わかる', 'kana': None, 'type': VerbType.GODAN, 'frequency': 15},
+    ]
+
+@pytest.mark.parametrize('chunk_size', (1, 50, 1 << 20))
+def test_iter_simplified_jmdict_text_chunks_splits_between_entries(chunk_size):
+    chunks = list(gen_vocab.iter_simplified_jmdict_text_chunks(
+        archive(gen_vocab.JMDICT_MEMBER, sample_jmdict), chunk_size
+    ))
+    document = json.dumps(sample_jmdict, ensure_ascii=False)
+    assert ''.join(chunks) == document[document.index('"words": [') + 10:]
+    assert len(chunks) == (1 if chunk_size == 1 << 20 else len(sample_jmdict['words']))
+    for chunk in chunks[1:]:
+        assert chunk.startswith('{"id": ')
+
+@pytest.mark.parametrize('jobs, chunk_size', ((1, 1), (2, 1), (3, 50), (2, 1 << 20)))
+def test_iter_merged_words_parallel_matches_serial(jobs, chunk_size):
+    frequencies = gen_vocab.read_jpdb_frequencies(
+        archive(gen_vocab.JPDB_MEMBER, sample_jpdb)
+    )
+    serial = list(gen_vocab.iter_merged_words(
+        gen_vocab.iter_simplified_jmdict_words(
+            archive(gen_vocab.JMDICT_MEMBER, sample_jmdict)
+        ),
+        frequencies,
+    ))
+    parallel = list(gen_vocab.iter_merged_words_parallel(
+        archive(gen_vocab.JMDICT_MEMBER, sample_jmdict), frequencies, jobs, chunk_size
+    ))
+    assert parallel == serial
+
+def word(frequency: int, word_type: VerbType | AdjectiveType) -> dict:
+    return {
+        'word': str(frequency), 'kana': None, 'type': word_type, 'frequency': frequency
+    }
+
+def test_word_selection_keeps_the_most_frequent_per_category():
+    selection = gen_vocab.WordSelection(3)
+    for frequency in (50, 10, 40, 30, 20, 60):
+        selection.add(word(frequency, VerbType.GODAN))
+        selection.add(word(frequency + 1, VerbType.ICHIDAN))
+        selection.add(word(frequency, AdjectiveType.I))
+    assert [verb['frequency'] for verb in selection.verbs()] == [10, 11, 20]
+    assert [adjective['frequency'] for adjective in selection.adjectives()] \
+        == [10, 20, 30]
+
+def test_word_selection_breaks_ties_in_order():
+    selection = gen_vocab.WordSelection(2)
+    first, second, third = (word(10, VerbType.GODAN) for _ in range(3))
+    for verb in (first, second, third):
+        selection.add(verb)
+    assert selection.verbs() == [first, second]
+
+def test_word_selection_quotas():
+    selection = gen_vocab.WordSelection(
+        3, {VerbType.GODAN: 1, AdjectiveType.NA: 0}
+    )
+    for frequency in (10, 20, 30, 40):
+        selection.add(word(frequency, VerbType.GODAN))
+        selection.add(word(frequency + 1, VerbType.ICHIDAN))
+        selection.add(word(frequency, AdjectiveType.NA))
+    assert [verb['frequency'] for verb in selection.verbs()] == [10, 11, 21]
+    assert selection.adjectives() == []
+
+def test_parse_quota():
+    assert gen_vocab.parse_quota('verb-godan=50') == (VerbType.GODAN, 50)
+    assert gen_vocab.parse_quota('adjective-na=0') == (AdjectiveType.NA, 0)
+    for quota in ('verb-godan', 'verb-yodan=1', 'noun=1', 'adjective-i=-1',
+                  'adjective-i=x'):
+        with pytest.raises(argparse.ArgumentTypeError):
+            gen_vocab.parse_quota(quota)
+
+def test_cached_download_reuses_intact_copies(tmp_path, monkeypatch):
+    archive_path = write_archive(
+        tmp_path / 'jpdb.zip', gen_vocab.JPDB_MEMBER, sample_jpdb
+    )
+    url = 'file://' + archive_path
+    cache_directory = str(tmp_path / 'cache')
+
+    cached_path = gen_vocab.cached_download(url, cache_directory)
+    sha256 = gen_vocab.file_sha256(archive_path)
+    assert os.path.basename(cached_path) == f'{sha256}.zip'
+
+    def urlopen(*args, **kwargs):
+        raise AssertionError('the archive was downloaded again')
+    with monkeypatch.context() as patch:
+        patch.setattr(urllib.request, 'urlopen', urlopen)
+        assert gen_vocab.cached_download(url, cache_directory) == cached_path
+
+    # a corrupt copy is downloaded again
+    with open(cached_path, 'ab') as cached_file:
+        cached_file.write(b'garbage')
+    assert gen_vocab.cached_download(url, cache_directory) == cached_path
+    assert gen_vocab.file_sha256(cached_path) == sha256
+
+def test_open_archive_prefers_local_path(tmp_path):
+    archive_path = write_archive(
+        tmp_path / 'jpdb.zip', gen_vocab.JPDB_MEMBER, sample_jpdb
+    )
+    with gen_vocab.open_archive('file:///nonexistent', archive_path, None) as file:
+        assert len(gen_vocab.read_jpdb_frequencies(file)) == 7
+    with gen_vocab.open_archive('file://' + archive_path, None, None) as file:
+        assert len(gen_vocab.read_jpdb_frequencies(file)) == 7
+
+def run_gen_vocab(tmp_path, *args: str) -> bytes:
+    output_path = tmp_path / 'vocab.json'
+    if '--update' not in args:
+        output_path.unlink(missing_ok=True)
+    subprocess.run(
+        [
+            sys.executable, GEN_VOCAB_PATH,
+            '--jmdict-path', write_archive(
+                tmp_path / 'jmdict.zip', gen_vocab.JMDICT_MEMBER, sample_jmdict
+            ),
+            '--jpdb-path', write_archive(
+                tmp_path / 'jpdb.zip', gen_vocab.JPDB_MEMBER, sample_jpdb
+            ),
+            '--no-cache',
+            '-o', str(output_path),
+            *args,
+        ],
+        check=True,
+        capture_output=True,
+    )
+    return output_path.read_bytes()
+
+def test_gen_vocab_from_local_archives(tmp_path):
+    assert json.loads(run_gen_vocab(tmp_path, '-n', '1', '-j', '1')) == [
+        {'word': '食べる', 'kana': 'たべる', 'type': 'verb-ichidan', 'frequency': 10},
+        {'word': '強い', 'kana': 'つよい', 'type': 'adjective-i', 'frequency': 20},
+    ]
+
+def test_gen_vocab_parallel_output_is_identical(tmp_path):
+    serial = run_gen_vocab(tmp_path, '-j', '1')
+    assert run_gen_vocab(tmp_path, '-j', '3') == serial
+
+def test_gen_vocab_sqlite_keeps_frequencies(tmp_path):
+    run_gen_vocab(tmp_path, '-f', 'sqlite', '-j', '1')
+    words = vocab.SQLiteVocab(str(tmp_path / 'vocab.json'), max_frequency=20)
+    assert list(words) == [
+        {'word': '食べる', 'kana': 'たべる', 'type': 'verb-ichidan', 'frequency': 10},
+        {'word': 'わかる', 'kana': None, 'type': 'verb-godan', 'frequency': 15},
+        {'word': '強い', 'kana': 'つよい', 'type': 'adjective-i', 'frequency': 20},
+    ]
+
+def vocab_entry(word: str, kana: str | None, word_type: str) -> dict:
+    return {'word': word, 'kana': kana, 'type': word_type}
+
+old_vocab = [
+    vocab_entry('書く', 'かく', 'verb-godan'),
+    vocab_entry('来る', 'くる', 'verb-ichidan'),
+    vocab_entry('話す', 'はなす', 'verb-godan'),
+]
+new_vocab = [
+    vocab_entry('食べる', 'たべる', 'verb-ichidan'),
+    vocab_entry('来る', 'くる', 'verb-ichidan-irregular'),
+    vocab_entry('書く', 'かく', 'verb-godan'),
+]
+
+def test_diff_vocab():
+    diff = gen_vocab.diff_vocab(old_vocab, new_vocab)
+    assert diff.added == [new_vocab[0]]
+    assert diff.removed == [old_vocab[2]]
+    assert diff.retyped == [(old_vocab[1], new_vocab[1])]
+    assert diff.formatted().splitlines() == [
+        '+ 食べる (たべる) verb-ichidan',
+        '- 話す (はなす) verb-godan',
+        '~ 来る (くる) verb-ichidan → verb-ichidan-irregular',
+        '1 added, 1 removed, 1 retyped.',
+    ]
+    assert not gen_vocab.diff_vocab(old_vocab, reversed(old_vocab))
+
+def test_patch_vocab_keeps_the_old_order():
+    assert gen_vocab.patch_vocab(old_vocab, new_vocab) \
+        == [new_vocab[2], new_vocab[1], new_vocab[0]]
+
+@pytest.mark.parametrize('output_format', ('json', 'binary', 'sqlite'))
+def test_write_vocab_replaces_the_file(tmp_path, output_format):
+    vocab_path = tmp_path / 'vocab'
+    vocab_path.write_text('old')
+    words = [{**word_info, 'frequency': 1} for word_info in new_vocab]
+    gen_vocab.write_vocab(words, str(vocab_path), output_format)
+    # SQLite vocab files are sorted by type
+    by_word = lambda word_info: word_info['word']  # noqa: E731
+    assert sorted(vocab.load_vocab(str(vocab_path)), key=by_word) \
+        == sorted(words, key=by_word)
+    assert os.listdir(tmp_path) == ['vocab']
+
+def test_write_vocab_leaves_the_file_alone_on_failure(tmp_path):
+    vocab_path = tmp_path / 'vocab'
+    vocab_path.write_text('old')
+    with pytest.raises(ValueError):
+        gen_vocab.write_vocab(
+            [vocab_entry('本', 'ほん', 'noun')], str(vocab_path), 'binary'
+        )
+    assert vocab_path.read_text() == 'old'
+    assert os.listdir(tmp_path) == ['vocab']
+
+def test_gen_vocab_update(tmp_path):
+    run_gen_vocab(tmp_path, '-n', '1', '-j', '1')
+    diff_path = tmp_path / 'diff.json'
+    updated = run_gen_vocab(
+        tmp_path, '-n', '2', '-j', '1', '--update', '--diff-output', str(diff_path)
+    )
+    assert json.loads(updated) == [
+        {'word': '食べる', 'kana': 'たべる', 'type': 'verb-ichidan', 'frequency': 10},
+        {'word': '強い', 'kana': 'つよい', 'type': 'adjective-i', 'frequency': 20},
+        {'word': 'わかる', 'kana': None, 'type': 'verb-godan', 'frequency': 15},
+        {'word': 'ゆうめい', 'kana': None, 'type': 'adjective-na', 'frequency': 40},
+    ]
+    assert json.loads(diff_path.read_text()) == {
+        'added': [
+            {'word': 'わかる', 'kana': None, 'type': 'verb-godan', 'frequency': 15},
+            {'word': 'ゆうめい', 'kana': None, 'type': 'adjective-na', 'frequency': 40},
+        ],
+        'removed': [],
+        'retyped': [],
+    }
+
+validated_words = [
+    vocab_entry('書く', 'かく', 'verb-godan'),
+    vocab_entry('来い', 'こい', 'verb-godan'),
+    vocab_entry('強い', 'つよい', 'adjective-i'),
+    vocab_entry('本', 'ほん', 'noun'),
+    vocab_entry('有名', 'ゆうめい', 'adjective-na'),
+]
+
+def test_validation_error():
+    assert gen_vocab.validation_error(validated_words[0]) is None
+    assert gen_vocab.validation_error(validated_words[2]) is None
+    assert 'not a godan verb' in gen_vocab.validation_error(validated_words[1])
+    assert 'illegal type' in gen_vocab.validation_error(validated_words[3])
+
+@pytest.mark.parametrize('jobs, chunk_size', ((1, 200), (1, 1), (2, 1), (3, 2)))
+def test_validate_words(jobs, chunk_size):
+    failures = gen_vocab.validate_words(validated_words, jobs, chunk_size)
+    assert [failure.word_info for failure in failures] \
+        == [validated_words[1], validated_words[3]]
+
+def test_gen_vocab_validation_summary(tmp_path):
+    summary_path = tmp_path / 'validation.json'
+    run_gen_vocab(tmp_path, '-j', '1', '--validation-output', str(summary_path))
+    summary = json.loads(summary_path.read_text())
+    assert (summary['checked'], summary['invalid'], summary['dropped']) == (5, 0, 0)
+    assert summary['failures'] == []
+
+def test_gen_vocab_stats(tmp_path):
+    stats_path = tmp_path / 'stats.json'
+    run_gen_vocab(tmp_path, '-j', '2', '--stats', str(stats_path))
+    stats = json.loads(stats_path.read_text())
+    assert [stage['stage'] for stage in stats['stages']] == [
+        'fetch', 'parse frequencies', 'parse & merge', 'sort & trim', 'validate',
+        'write',
+    ]
+    items = {stage['stage']: stage['items'] for stage in stats['stages']}
+    assert items['parse frequencies'] == 7
+    assert items['parse & merge'] == items['sort & trim'] == items['write'] == 5
+    for stage in stats['stages']:
+        assert stage['wall_seconds'] >= 0 and stage['cpu_seconds'] >= 0
+        assert stage['peak_rss_mib'] > 0
+    assert stats['total']['peak_rss_mib'] \
+        >= max(stage['peak_rss_mib'] for stage in stats['stages'])
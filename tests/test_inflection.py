@@ -1,3 +1,11 @@
+from collections import Counter, defaultdict
+from fractions import Fraction
+import pickle
+import random
+
+import japanese_verb_conjugator_v2 as jvc
+import pytest
+
 from inflection import (
     AdjectiveType, AdjectiveInflection,
     VerbInflection,
@@ -66,3 +74,168 @@ def test_verb_inflection_generate_random_tense_is_None_only_when_base_form_is_TE
             assert inflection.tense is None
         else:
             assert inflection.tense is not None
+
+
+# -- interning --
+
+def test_adjective_inflection_is_interned():
+    assert AdjectiveInflection(
+        tense=AdjectiveInflection.Tense.PAST
+    ) is AdjectiveInflection(tense=AdjectiveInflection.Tense.PAST)
+
+def test_verb_inflection_is_interned():
+    assert VerbInflection(
+        base_form=VerbInflection.BaseForm.TE,
+        polarity=VerbInflection.Polarity.NEGATIVE,
+    ) is VerbInflection(
+        base_form=VerbInflection.BaseForm.TE,
+        polarity=VerbInflection.Polarity.NEGATIVE,
+    )
+
+def test_verb_inflection_without_tense_is_nonpast():
+    assert VerbInflection() is VerbInflection(tense=VerbInflection.Tense.NONPAST)
+
+def test_inflections_are_immutable():
+    with pytest.raises(AttributeError):
+        VerbInflection().tense = VerbInflection.Tense.PAST
+    with pytest.raises(AttributeError):
+        AdjectiveInflection().politeness = AdjectiveInflection.Politeness.POLITE
+
+def test_inflection_ids_are_unique_and_round_trip():
+    for inflection_class in (AdjectiveInflection, VerbInflection):
+        inflections = [
+            inflection_class.from_id(inflection_id)
+            for inflection_id in range(inflection_class.COUNT)
+        ]
+        assert [inflection.id for inflection in inflections] \
+            == list(range(inflection_class.COUNT))
+        assert len(set(inflections)) == inflection_class.COUNT
+
+def test_inflections_survive_pickling_as_the_same_instance():
+    for inflection in (*VerbInflection.all(), AdjectiveInflection()):
+        assert pickle.loads(pickle.dumps(inflection)) is inflection
+
+
+# -- enumeration --
+
+def test_verb_inflection_all():
+    inflections = VerbInflection.all()
+    assert len(inflections) == 9
+    assert all(inflection.is_nondefault() for inflection in inflections)
+    assert VerbInflection(tense=VerbInflection.Tense.PAST) in inflections
+
+def test_adjective_inflection_all():
+    for adjective_type in AdjectiveType:
+        inflections = AdjectiveInflection.all(adjective_type)
+        assert len(inflections) == 7
+        assert all(inflection.is_nondefault() for inflection in inflections)
+
+    assert AdjectiveInflection(
+        polarity=AdjectiveInflection.Polarity.NEGATIVE
+    ) in AdjectiveInflection.all(AdjectiveType.I)
+    assert AdjectiveInflection(
+        polarity=AdjectiveInflection.Polarity.NEGATIVE,
+        politeness=AdjectiveInflection.Politeness.PLAIN,
+    ) in AdjectiveInflection.all(AdjectiveType.NA)
+
+def test_generate_random_only_returns_inflections_from_all():
+    for _ in range(ITERATIONS):
+        assert VerbInflection.generate_random() in VerbInflection.all()
+        for adjective_type in AdjectiveType:
+            assert AdjectiveInflection.generate_random(adjective_type) \
+                in AdjectiveInflection.all(adjective_type)
+
+def baseline_adjective_inflection(choice, adjective_type):
+    """The feature-by-feature drawing generate_random() was written with."""
+    tense = choice(list(AdjectiveInflection.Tense))
+    polarity = choice(list(AdjectiveInflection.Polarity))
+    politeness_choices = [AdjectiveInflection.Politeness.POLITE]
+    if adjective_type is AdjectiveType.NA:
+        politeness_choices.append(AdjectiveInflection.Politeness.PLAIN)
+    politeness = choice(politeness_choices)
+    match choice(['tense', 'polarity', 'politeness']):
+        case 'tense':
+            tense = AdjectiveInflection.Tense.PAST
+        case 'polarity':
+            polarity = AdjectiveInflection.Polarity.NEGATIVE
+        case 'politeness':
+            politeness = AdjectiveInflection.Politeness.POLITE
+    return AdjectiveInflection(tense=tense, polarity=polarity, politeness=politeness)
+
+def baseline_verb_inflection(choice):
+    """The feature-by-feature drawing generate_random() was written with."""
+    base_form = choice(list(VerbInflection.BaseForm))
+    tense = choice(list(VerbInflection.Tense))
+    polarity = choice(list(VerbInflection.Polarity))
+    match choice(['base_form', 'polarity']):
+        case 'base_form':
+            base_form = choice(
+                (VerbInflection.BaseForm.POLITE, VerbInflection.BaseForm.TE)
+            )
+        case 'polarity':
+            polarity = VerbInflection.Polarity.NEGATIVE
+    if base_form is VerbInflection.BaseForm.TE:
+        tense = None
+    return VerbInflection(base_form=base_form, tense=tense, polarity=polarity)
+
+def exact_distribution(draw):
+    """Return the probability of every result of draw(choice), walking every sequence
+    of choices it can make.
+    """
+    distribution = defaultdict(Fraction)
+    pending = [[]]
+    while pending:
+        path = pending.pop()
+        probability = Fraction(1)
+        depth = 0
+
+        def choice(options):
+            nonlocal probability, depth
+            options = tuple(options)
+            if depth == len(path):
+                pending.extend(path + [index] for index in range(1, len(options)))
+                path.append(0)
+            probability /= len(options)
+            depth += 1
+            return options[path[depth - 1]]
+
+        distribution[draw(choice)] += probability
+    return dict(distribution)
+
+def drawn_distribution(monkeypatch, generate_random):
+    """Return the probability of every inflection in the sequence generate_random()
+    draws from uniformly.
+    """
+    drawn_from = []
+
+    def choice(options):
+        drawn_from.append(options)
+        return options[0]
+
+    monkeypatch.setattr(random, 'choice', choice)
+    generate_random()
+    monkeypatch.undo()
+    assert len(drawn_from) == 1
+    return {
+        inflection: Fraction(count, len(drawn_from[0]))
+        for inflection, count in Counter(drawn_from[0]).items()
+    }
+
+def test_generate_random_keeps_the_baseline_distribution(monkeypatch):
+    assert drawn_distribution(monkeypatch, VerbInflection.generate_random) \
+        == exact_distribution(baseline_verb_inflection)
+    for adjective_type in AdjectiveType:
+        assert drawn_distribution(
+            monkeypatch, lambda: AdjectiveInflection.generate_random(adjective_type)
+        ) == exact_distribution(
+            lambda choice: baseline_adjective_inflection(choice, adjective_type)
+        )
+
+def test_verb_inflection_features_have_the_values_of_jvc():
+    for features, jvc_features in (
+        (VerbInflection.BaseForm, jvc.BaseForm),
+        (VerbInflection.Tense, jvc.Tense),
+        (VerbInflection.Polarity, jvc.Polarity),
+    ):
+        for feature in features:
+            assert feature.value == jvc_features[feature.name].value
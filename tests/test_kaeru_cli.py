@@ -0,0 +1,119 @@
+import importlib
+import random
+import subprocess
+import sys
+
+from conjugation_table import ConjugationTable
+from deinflection import DeinflectionIndex
+from inflection import AdjectiveInflection, VerbInflection, VerbType
+import quiz_vocab
+from sampling import AliasSampler
+import scheduling
+import vocab
+from vocab import VocabWord
+
+kaeru_cli = importlib.import_module('kaeru-cli')
+
+
+sample_words = tuple(map(VocabWord.from_dict, (
+    {'word': '書く', 'kana': 'かく', 'type': 'verb-godan'},
+    {'word': 'かっこいい', 'kana': None, 'type': 'adjective-i-yoi-ii'},
+    {'word': '有名', 'kana': 'ゆうめい', 'type': 'adjective-na'},
+)))
+
+
+def test_random_question_matches_table():
+    quiz = quiz_vocab.prepare_quiz(sample_words, 0)
+    table = quiz.table
+    random.seed(0)
+    for _ in range(100):
+        question = kaeru_cli.random_question(quiz)
+        vocab_word = sample_words[question.word_index]
+        assert question.vocab_word == vocab_word
+        assert question.index is quiz.index
+        expected_class = (
+            VerbInflection if isinstance(vocab_word.type, VerbType)
+            else AdjectiveInflection
+        )
+        assert isinstance(question.inflection, expected_class)
+        assert question.correct_answer \
+            == table.answer(question.word_index, question.inflection)
+        assert question.acceptable_answers \
+            == table.acceptable_answers(question.word_index, question.inflection)
+        assert question.text.startswith(f'word: {vocab_word.word}')
+        assert question.inflection.formatted() in question.text
+
+def test_random_question_hides_kana_and_word_type():
+    quiz = quiz_vocab.prepare_quiz(sample_words[:1], 0)
+    question = kaeru_cli.random_question(quiz)
+    assert '(かく)' in question.text
+    assert '5-dan verb' in question.text
+    question = kaeru_cli.random_question(quiz, hide_kana=True, hide_word_type=True)
+    assert '(かく)' not in question.text
+    assert '5-dan verb' not in question.text
+
+def test_random_question_draws_with_the_sampler():
+    quiz = quiz_vocab.prepare_quiz(sample_words, 0)._replace(
+        sampler=AliasSampler([0.0, 0.0, 1.0])
+    )
+    for _ in range(20):
+        question = kaeru_cli.random_question(quiz)
+        assert question.word_index == 2
+
+def test_random_question_asks_the_due_item():
+    quiz = quiz_vocab.prepare_quiz(sample_words, 0)
+    inflection = AdjectiveInflection(
+        tense=AdjectiveInflection.Tense.PAST,
+        polarity=AdjectiveInflection.Polarity.NEGATIVE,
+        politeness=AdjectiveInflection.Politeness.PLAIN,
+    )
+    item = scheduling.ReviewItem.of(sample_words[2], inflection)
+    question = kaeru_cli.random_question(quiz, (item, 2))
+    assert question.vocab_word == sample_words[2]
+    assert question.inflection is inflection
+    # the quiz's answers are reused
+    assert question.index is quiz.index
+    assert question.correct_answer == quiz.table.answer(2, inflection)
+
+def test_random_question_conjugates_sqlite_words_when_asked(tmp_path):
+    vocab_path = str(tmp_path / 'vocab.sqlite3')
+    vocab.write_sqlite_vocab(
+        [{**word.to_dict(), 'frequency': 1} for word in sample_words], vocab_path
+    )
+    quiz = quiz_vocab.prepare_quiz(
+        quiz_vocab.SQLiteWords(vocab.SQLiteVocab(vocab_path)), 0
+    )
+    question = kaeru_cli.random_question(quiz)
+    # the drawn word is conjugated on its own, at index 0 of a one-word table
+    assert question.word_index == 0
+    assert question.vocab_word.word in {word.word for word in sample_words}
+    assert question.correct_answer in question.acceptable_answers
+
+def test_inflection_question_asks_the_given_inflection():
+    table = ConjugationTable(sample_words)
+    index = DeinflectionIndex(sample_words, table)
+    inflection = AdjectiveInflection(
+        tense=AdjectiveInflection.Tense.PAST,
+        politeness=AdjectiveInflection.Politeness.POLITE,
+    )
+    question = kaeru_cli.inflection_question(
+        sample_words, table, index, 2, inflection
+    )
+    assert question.word_index == 2
+    assert question.inflection is inflection
+    assert question.correct_answer == table.answer(2, inflection)
+    assert question.text.startswith('word: 有名 (ゆうめい)')
+
+def test_import_leaves_heavy_dependencies_unloaded():
+    loaded = subprocess.run(
+        [
+            sys.executable, '-c',
+            "import importlib, sys; importlib.import_module('kaeru-cli');"
+            + " print(*sorted(sys.modules))",
+        ],
+        capture_output=True,
+        text=True,
+        check=True,
+    ).stdout.split()
+    assert 'japanese_verb_conjugator_v2' not in loaded
+    assert 'readline' not in loaded
@@ -0,0 +1,79 @@
+import itertools
+import threading
+
+import pytest
+
+from prefetch import Prefetcher
+
+
+def test_prefetcher_returns_questions_in_order():
+    counter = itertools.count()
+    prefetcher = Prefetcher(lambda: next(counter), 3)
+    prefetcher.start()
+    assert [prefetcher.take() for _ in range(10)] == list(range(10))
+
+def test_prefetcher_fills_up_to_capacity():
+    counter = itertools.count()
+    made = threading.Semaphore(0)
+
+    def make() -> int:
+        made.release()
+        return next(counter)
+
+    prefetcher = Prefetcher(make, 2)
+    prefetcher.start()
+    # 2 questions fill the buffer, and a 3rd waits for room
+    for _ in range(3):
+        assert made.acquire(timeout=5)
+    assert not made.acquire(timeout=0.1)
+    metrics = prefetcher.metrics()
+    assert metrics.depth == 2 and metrics.capacity == 2
+    assert metrics.made == 3
+
+    assert prefetcher.take() == 0
+    assert made.acquire(timeout=5)
+
+def test_prefetcher_metrics_count_waits():
+    release = threading.Event()
+
+    def make() -> str:
+        release.wait()
+        return 'question'
+
+    prefetcher = Prefetcher(make, 1)
+    assert prefetcher.metrics().mean_refill_seconds == 0.0
+    prefetcher.start()
+    threading.Timer(0.05, release.set).start()
+    assert prefetcher.take() == 'question'
+    metrics = prefetcher.metrics()
+    assert metrics.waits == 1
+    assert metrics.wait_seconds > 0
+    assert metrics.max_refill_seconds >= metrics.mean_refill_seconds > 0
+    assert 'waited for' in metrics.formatted()
+
+def test_prefetcher_takes_without_waiting():
+    release = threading.Event()
+
+    def make() -> str:
+        release.wait()
+        return 'question'
+
+    prefetcher = Prefetcher(make, 1)
+    prefetcher.start()
+    assert prefetcher.take_nowait() is None
+    assert prefetcher.metrics().misses == 1
+    release.set()
+    assert prefetcher.take() == 'question'
+    assert prefetcher.metrics().misses == 1
+
+def test_prefetcher_raises_what_making_raised():
+    def make() -> int:
+        raise ValueError('no words')
+
+    prefetcher = Prefetcher(make, 2)
+    prefetcher.start()
+    for _ in range(2):
+        with pytest.raises(ValueError, match='no words'):
+            prefetcher.take()
+    with pytest.raises(ValueError, match='no words'):
+        prefetcher.take_nowait()
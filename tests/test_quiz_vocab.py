@@ -0,0 +1,210 @@
+import argparse
+import json
+import sqlite3
+import time
+
+import pytest
+
+from inflection import AdjectiveInflection, AdjectiveType, VerbInflection, VerbType
+import quiz_vocab
+import sampling
+import scheduling
+import vocab
+from vocab import VocabWord
+
+
+sample_words = (
+    {'word': '書く', 'kana': 'かく', 'type': 'verb-godan', 'frequency': 2},
+    {'word': '強い', 'kana': 'つよい', 'type': 'adjective-i', 'frequency': 1},
+    {'word': 'かっこいい', 'kana': None, 'type': 'adjective-i-yoi-ii'},
+)
+
+sample_records = (
+    VocabWord('書く', 'かく', VerbType.GODAN, 2),
+    VocabWord('強い', 'つよい', AdjectiveType.I, 1),
+    VocabWord('かっこいい', None, AdjectiveType.I_YOI_II),
+)
+
+
+def parse_args(*args: str) -> argparse.Namespace:
+    parser = argparse.ArgumentParser()
+    quiz_vocab.add_vocab_arguments(parser)
+    return parser.parse_args(args)
+
+
+def test_quiz_words_json(tmp_path):
+    vocab_path = tmp_path / 'vocab.json'
+    vocab_path.write_text(json.dumps(sample_words, ensure_ascii=False))
+    words = quiz_vocab.load_quiz_words(parse_args('-i', str(vocab_path)))
+    assert isinstance(words, list)
+    assert words == list(sample_records)
+
+def test_quiz_words_binary(tmp_path):
+    vocab_path = tmp_path / 'vocab.bin'
+    with open(vocab_path, 'wb') as vocab_file:
+        vocab.write_binary_vocab(sample_words, vocab_file)
+    words = quiz_vocab.load_quiz_words(parse_args('-i', str(vocab_path)))
+    assert isinstance(words, quiz_vocab.BinaryWords)
+    assert list(words) == list(sample_records)
+    assert words[-1] == sample_records[2]
+    assert words[1:] == list(sample_records[1:])
+    assert words.frequencies() == [2, 1, None]
+    for word_index, vocab_word in enumerate(sample_records):
+        assert words.index_of(
+            vocab_word.word, vocab_word.kana, vocab_word.type
+        ) == word_index
+    assert words.index_of('書く', 'かく', VerbType.ICHIDAN) is None
+
+def test_quiz_words_sqlite_are_fetched_when_accessed(tmp_path):
+    vocab_path = str(tmp_path / 'vocab.sqlite3')
+    vocab.write_sqlite_vocab(sample_words[:2], vocab_path)
+    words = quiz_vocab.load_quiz_words(parse_args('-i', vocab_path))
+    assert isinstance(words, quiz_vocab.SQLiteWords)
+    assert list(words) == list(sample_records[:2])
+    assert words[-1] == sample_records[1]
+    assert words[:1] == [sample_records[0]]
+    assert words.frequencies() == [2, 1]
+
+    words = quiz_vocab.load_quiz_words(
+        parse_args('-i', vocab_path, '--word-type', 'adjective-i')
+    )
+    assert list(words) == [sample_records[1]]
+
+@pytest.mark.parametrize(('contents', 'args', 'status'), [
+    (None, (), 1),
+    ('[{"word": ', (), 2),
+    ('[]', (), 2),
+    (json.dumps([{'word': '本', 'kana': 'ほん', 'type': 'noun'}]), (), 4),
+    (json.dumps([{'word': '本'}]), (), 4),
+    (json.dumps(sample_words), ('--max-frequency', '5'), 2),
+])
+def test_load_quiz_words_exits_on_errors(tmp_path, contents, args, status):
+    vocab_path = tmp_path / 'vocab.json'
+    if contents is not None:
+        vocab_path.write_text(contents)
+    with pytest.raises(SystemExit) as excinfo:
+        quiz_vocab.load_quiz_words(parse_args('-i', str(vocab_path), *args))
+    assert excinfo.value.code == status
+
+def test_load_quiz_words_no_match_exits_with_status_3(tmp_path):
+    vocab_path = str(tmp_path / 'vocab.sqlite3')
+    vocab.write_sqlite_vocab(sample_words[:2], vocab_path)
+    with pytest.raises(SystemExit) as excinfo:
+        quiz_vocab.load_quiz_words(
+            parse_args('-i', vocab_path, '--min-frequency', '3')
+        )
+    assert excinfo.value.code == 3
+
+def test_vocab_file_watcher(tmp_path):
+    vocab_path = tmp_path / 'vocab.json'
+    vocab_path.write_text('[]')
+    watcher = quiz_vocab.VocabFileWatcher(str(vocab_path))
+    assert not watcher.changed()
+
+    # replaced, as gen-vocab.py does
+    new_path = tmp_path / 'new.json'
+    new_path.write_text('[]')
+    new_path.replace(vocab_path)
+    assert watcher.changed()
+    assert not watcher.changed()
+
+    vocab_path.unlink()
+    assert not watcher.changed()
+    vocab_path.write_text('[{}]')
+    assert watcher.changed()
+
+def test_prepare_quiz_sqlite_is_conjugated_per_question(tmp_path):
+    vocab_path = str(tmp_path / 'vocab.sqlite3')
+    vocab.write_sqlite_vocab(sample_words[:2], vocab_path)
+    words = quiz_vocab.load_quiz_words(parse_args('-i', vocab_path))
+    quiz = quiz_vocab.prepare_quiz(words, 1.0)
+    assert quiz.table is None and quiz.index is None
+    # weighted through the frequency index, without reading every rank
+    assert isinstance(quiz.sampler, sampling.BandSampler)
+    assert quiz.draw() in range(2)
+    quiz = quiz_vocab.prepare_quiz(words, 0)
+    assert quiz.sampler is None
+    assert quiz.draw() in range(2)
+
+def due_scheduler(*items: scheduling.ReviewItem) -> scheduling.Scheduler:
+    """Return a scheduler for which the given items are due, in order."""
+    scheduler = scheduling.Scheduler(sqlite3.connect(':memory:'))
+    an_hour_ago = time.time() - 60 * 60
+    for order, item in enumerate(items):
+        scheduler.review(item, False, an_hour_ago + order)
+    return scheduler
+
+def test_next_due_word_skips_words_not_in_the_quiz(tmp_path):
+    verb_item = scheduling.ReviewItem.of(
+        sample_records[0], VerbInflection.generate_random()
+    )
+    adjective_item = scheduling.ReviewItem.of(
+        sample_records[1], AdjectiveInflection.generate_random(AdjectiveType.I)
+    )
+
+    # filtered out by the word type
+    vocab_path = str(tmp_path / 'vocab.sqlite3')
+    vocab.write_sqlite_vocab(sample_words[:2], vocab_path)
+    quiz = quiz_vocab.prepare_quiz(
+        quiz_vocab.load_quiz_words(
+            parse_args('-i', vocab_path, '--word-type', 'adjective-i')
+        ),
+        1.0,
+    )
+    scheduler = due_scheduler(verb_item, adjective_item)
+    assert quiz_vocab.next_due_word(quiz, scheduler) == (adjective_item, 0)
+    assert quiz_vocab.next_due_word(quiz, scheduler) is None
+
+    # left out of the vocab file
+    vocab_path = tmp_path / 'vocab.json'
+    vocab_path.write_text(json.dumps(sample_words[1:], ensure_ascii=False))
+    quiz = quiz_vocab.prepare_quiz(
+        quiz_vocab.load_quiz_words(parse_args('-i', str(vocab_path))), 1.0
+    )
+    scheduler = due_scheduler(verb_item, adjective_item)
+    assert quiz_vocab.next_due_word(quiz, scheduler) == (adjective_item, 0)
+    assert quiz_vocab.next_due_word(quiz, scheduler) is None
+
+def test_vocab_reloader_picks_up_changes_made_before_it_starts(tmp_path):
+    vocab_path = tmp_path / 'vocab.json'
+    vocab_path.write_text(json.dumps(sample_words[:2], ensure_ascii=False))
+    args = parse_args('-i', str(vocab_path), '--reload-interval', '0.01')
+    watcher = quiz_vocab.VocabFileWatcher(str(vocab_path))
+    quiz = quiz_vocab.prepare_quiz(
+        quiz_vocab.load_quiz_words(args), args.frequency_weight
+    )
+    reloader = quiz_vocab.VocabReloader(args, quiz, watcher)
+
+    # edited while the quiz was prepared, before the reloader started
+    vocab_path.write_text(json.dumps(sample_words, ensure_ascii=False))
+    reloader.start()
+    deadline = time.monotonic() + 5
+    while (reloaded := reloader.take_reloaded()) is None:
+        assert time.monotonic() < deadline, 'the change was never reloaded'
+        time.sleep(0.01)
+    assert list(reloaded.words) == list(sample_records)
+
+def test_vocab_reloader_reuses_unchanged_words(tmp_path):
+    vocab_path = tmp_path / 'vocab.json'
+    vocab_path.write_text(json.dumps(sample_words[:2], ensure_ascii=False))
+    args = parse_args('-i', str(vocab_path))
+    quiz = quiz_vocab.prepare_quiz(
+        quiz_vocab.load_quiz_words(args), args.frequency_weight
+    )
+    assert quiz.table is not None and quiz.table.reused_count == 0
+    reloader = quiz_vocab.VocabReloader(args, quiz)
+    assert reloader.take_reloaded() is None
+
+    vocab_path.write_text(json.dumps(sample_words[1:], ensure_ascii=False))
+    reloader.reload()
+    reloaded = reloader.take_reloaded()
+    assert reloaded is not None
+    assert list(reloaded.words) == list(sample_records[1:])
+    assert reloaded.table is not None and reloaded.table.reused_count == 1
+    assert reloaded.index is not None
+    assert reloader.take_reloaded() is None
+
+    # a malformed file is skipped, and the quiz goes on with the words it has
+    vocab_path.write_text('[{"word": ')
+    reloader.reload()
+    assert reloader.take_reloaded() is None
@@ -0,0 +1,70 @@
+import random
+
+import pytest
+
+from inflection import AdjectiveType, VerbType
+import sampling
+from vocab import VocabWord
+
+
+def test_alias_sampler_probabilities_match_the_weights():
+    weights = [5.0, 1.0, 0.5, 2.5, 1.0, 0.0, 10.0]
+    sampler = sampling.AliasSampler(weights)
+    assert len(sampler) == len(weights)
+    for index, weight in enumerate(weights):
+        assert sampler.probability(index) == pytest.approx(weight / sum(weights))
+
+def test_alias_sampler_draws():
+    weights = [1.0, 0.0, 3.0]
+    sampler = sampling.AliasSampler(weights)
+    rng = random.Random(0)
+    draws = [sampler.draw(rng) for _ in range(10_000)]
+    assert draws.count(1) == 0
+    assert draws.count(2) == pytest.approx(7_500, rel=0.05)
+
+    # the same seed draws the same indices
+    assert [sampler.draw(random.Random(1)) for _ in range(5)] \
+        == [sampler.draw(random.Random(1)) for _ in range(5)]
+
+def test_alias_sampler_needs_weights():
+    with pytest.raises(ValueError):
+        sampling.AliasSampler([])
+
+def test_frequency_weights():
+    assert sampling.frequency_weights([1, 4, None], 0) == [1.0, 1.0, 1.0]
+    assert sampling.frequency_weights([1, 4, None], 1) == [1.0, 0.25, 0.25]
+    assert sampling.frequency_weights([1, 4, 16], 0.5) == [1.0, 0.5, 0.25]
+    assert sampling.frequency_weights([None, None], 1) == [1.0, 1.0]
+
+def test_vocab_sampler_favours_common_words():
+    words = [
+        VocabWord('書く', 'かく', VerbType.GODAN, 10),
+        VocabWord('話す', 'はなす', VerbType.GODAN, 1000),
+        VocabWord('強い', 'つよい', AdjectiveType.I),
+    ]
+    sampler = sampling.vocab_sampler(words, 1)
+    assert sampler.probability(0) == pytest.approx(100 / 102)
+    assert sampler.probability(1) == sampler.probability(2)
+
+    # every word is as likely without a sampler
+    assert sampling.vocab_sampler(words, 0) is None
+
+def test_band_sampler_draws_with_the_weights():
+    ranks = [1, 2, 3, 3, 5, 7, 8, 20, 40, 1000]
+    bands = [(0, 0, 1), (1, 3, 2), (4, 5, 4), (6, 6, 8), (7, 7, 16), (8, 8, 32),
+             (9, 9, 512)]
+    looked_up = []
+
+    def rank(index):
+        looked_up.append(index)
+        return ranks[index]
+
+    sampler = sampling.BandSampler(bands, rank, 1)
+    rng = random.Random(0)
+    draws = [sampler.draw(rng) for _ in range(40_000)]
+    weights = sampling.frequency_weights(ranks, 1)
+    for index, weight in enumerate(weights):
+        assert draws.count(index) / len(draws) \
+            == pytest.approx(weight / sum(weights), abs=0.01)
+    # a word is kept at least half the time with an exponent of 1
+    assert len(looked_up) < 2 * len(draws)
@@ -0,0 +1,145 @@
+import sqlite3
+import threading
+
+import pytest
+
+import dbapi
+from inflection import AdjectiveType, AdjectiveInflection, VerbType, VerbInflection
+import scheduling
+from scheduling import ReviewItem, ReviewState, Scheduler, next_state
+from vocab import VocabWord
+
+
+DAY = scheduling.SECONDS_PER_DAY
+
+write = ReviewItem(
+    '書く', 'かく', VerbType.GODAN,
+    VerbInflection(tense=VerbInflection.Tense.PAST),
+)
+strong = ReviewItem(
+    '強い', 'つよい', AdjectiveType.I,
+    AdjectiveInflection(polarity=AdjectiveInflection.Polarity.NEGATIVE),
+)
+cool = ReviewItem(
+    'かっこいい', None, AdjectiveType.I_YOI_II,
+    AdjectiveInflection(tense=AdjectiveInflection.Tense.PAST),
+)
+
+
+@pytest.fixture
+def connection() -> sqlite3.Connection:
+    """Return a connection to an empty in-memory database."""
+    return sqlite3.connect(':memory:')
+
+
+def test_next_state_intervals_grow_with_right_answers():
+    state = next_state(None, True, 0)
+    assert state == ReviewState(1, 1.0, scheduling.INITIAL_EASE, DAY)
+    state = next_state(state, True, DAY)
+    assert state.interval == 6.0 and state.due == 7 * DAY
+    state = next_state(state, True, 7 * DAY)
+    assert state.repetitions == 3
+    assert state.interval == pytest.approx(6.0 * scheduling.INITIAL_EASE)
+
+def test_next_state_wrong_answer_relearns_and_lowers_ease():
+    state = next_state(next_state(None, True, 0), False, DAY)
+    assert state.repetitions == 0
+    assert state.due == DAY + scheduling.RELEARN_SECONDS
+    assert state.ease < scheduling.INITIAL_EASE
+    for _ in range(10):
+        state = next_state(state, False, 0)
+    assert state.ease == scheduling.MINIMUM_EASE
+
+def test_review_item_of_vocab_word():
+    vocab_word = VocabWord('書く', 'かく', VerbType.GODAN, 3)
+    item = ReviewItem.of(vocab_word, write.inflection)
+    assert item == write
+    assert item.vocab_word() == VocabWord('書く', 'かく', VerbType.GODAN)
+
+def test_scheduler_asks_due_items_soonest_first(connection):
+    scheduler = Scheduler(connection)
+    assert scheduler.next_due(now=0) is None
+    scheduler.review(write, True, now=0)
+    scheduler.review(strong, False, now=10)
+    scheduler.review(cool, False, now=0)
+    assert scheduler.next_due(now=1) is None
+    assert scheduler.next_due(now=DAY) == cool
+    assert scheduler.next_due(now=DAY) == strong
+    assert scheduler.next_due(now=DAY) == write
+    assert scheduler.next_due(now=DAY) is None
+
+def test_scheduler_drops_rescheduled_entries(connection):
+    scheduler = Scheduler(connection)
+    scheduler.review(write, False, now=0)
+    scheduler.review(write, True, now=0)
+    assert scheduler.next_due(now=scheduling.RELEARN_SECONDS) is None
+    assert scheduler.next_due(now=DAY) == write
+    assert scheduler.next_due(now=DAY) is None
+
+def test_scheduler_writes_reviews_in_batches(connection):
+    scheduler = Scheduler(connection, batch_size=2)
+    scheduler.review(write, True, now=0)
+    assert dbapi.get_reviews_due_after(connection, 0, 10) == []
+    scheduler.review(cool, True, now=0)
+    assert len(dbapi.get_reviews_due_after(connection, 0, 10)) == 2
+
+    scheduler.review(strong, True, now=0)
+    scheduler.flush()
+    assert dbapi.get_review(
+        connection, '強い', 'つよい', 'adjective-i', strong.inflection.id
+    ) == (1, 1.0, scheduling.INITIAL_EASE, DAY)
+    # stored with an empty kana reading, which reads back as None
+    assert dbapi.get_review(
+        connection, 'かっこいい', '', 'adjective-i-yoi-ii', cool.inflection.id
+    ) == (1, 1.0, scheduling.INITIAL_EASE, DAY)
+    assert Scheduler(connection).state(cool) == scheduler.state(cool)
+
+def test_scheduler_loads_reviews_a_page_at_a_time(connection):
+    earlier = Scheduler(connection)
+    for item, now in ((write, 0), (strong, 1), (cool, 2)):
+        earlier.review(item, False, now=now)
+    earlier.flush()
+
+    scheduler = Scheduler(connection, page_size=2)
+    assert scheduler.state(write) is not None
+    # rescheduled before it's read, so its stored review is outdated
+    scheduler.review(write, True, now=3)
+    assert scheduler.next_due(now=DAY - 1) == strong
+    assert scheduler.next_due(now=DAY - 1) == cool
+    assert scheduler.next_due(now=DAY - 1) is None
+    assert scheduler.next_due(now=DAY + 3) == write
+    assert scheduler.next_due(now=DAY + 3) is None
+
+def test_scheduler_continues_stored_schedule(connection):
+    earlier = Scheduler(connection)
+    earlier.review(write, True, now=0)
+    earlier.flush()
+    state = Scheduler(connection).review(write, True, now=DAY)
+    assert state.repetitions == 2 and state.interval == 6.0
+
+def test_scheduler_can_be_shared_between_threads():
+    connection = sqlite3.connect(':memory:', check_same_thread=False)
+    scheduler = Scheduler(connection, batch_size=3)
+    inflections = VerbInflection.all()
+    items = [
+        ReviewItem(f'{number}書く', None, VerbType.GODAN, inflection)
+        for number in range(50) for inflection in inflections
+    ]
+    asked = []
+
+    def ask() -> None:
+        for _ in range(len(items)):
+            item = scheduler.next_due(now=DAY)
+            if item is not None:
+                asked.append(item)
+
+    thread = threading.Thread(target=ask)
+    thread.start()
+    for item in items:
+        scheduler.review(item, False, now=0)
+    thread.join()
+    scheduler.flush()
+    while (item := scheduler.next_due(now=DAY)) is not None:
+        asked.append(item)
+    assert len(asked) == len(items)
+    assert set(asked) == set(items)
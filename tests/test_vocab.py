@@ -0,0 +1,240 @@
+import json
+import pickle
+import sqlite3
+import struct
+import threading
+
+import pytest
+
+from inflection import VerbType
+import vocab
+
+
+sample_words = (
+    {'word': '考える', 'kana': 'かんがえる', 'type': 'verb-ichidan'},
+    {'word': '書く', 'kana': 'かく', 'type': 'verb-godan'},
+    {'word': '勉強する', 'kana': 'べんきょうする', 'type': 'verb-ichidan-irregular'},
+    {'word': '強い', 'kana': 'つよい', 'type': 'adjective-i'},
+    {'word': 'かっこいい', 'kana': None, 'type': 'adjective-i-yoi-ii'},
+    {'word': '有名', 'kana': 'ゆうめい', 'type': 'adjective-na'},
+)
+
+ranked_words = tuple(
+    {**word_info, 'frequency': frequency}
+    for frequency, word_info in enumerate(sample_words, 1)
+)
+
+
+@pytest.fixture
+def binary_vocab_path(tmp_path):
+    vocab_path = tmp_path / 'vocab.bin'
+    with open(vocab_path, 'wb') as vocab_file:
+        vocab.write_binary_vocab(sample_words, vocab_file)
+    return str(vocab_path)
+
+
+def test_binary_vocab_round_trip(binary_vocab_path):
+    words = vocab.load_vocab(binary_vocab_path)
+    assert isinstance(words, vocab.BinaryVocab)
+    assert len(words) == len(sample_words)
+    assert list(words) == list(sample_words)
+    assert words[1] == sample_words[1]
+    assert words[-1] == sample_words[-1]
+    assert words[1:4] == list(sample_words[1:4])
+    assert words[::-2] == list(sample_words[::-2])
+
+def test_binary_vocab_frequencies(tmp_path):
+    vocab_path = tmp_path / 'vocab.bin'
+    with open(vocab_path, 'wb') as vocab_file:
+        vocab.write_binary_vocab((*ranked_words[:3], *sample_words[3:]), vocab_file)
+    words = vocab.BinaryVocab(str(vocab_path))
+    assert words[2] == ranked_words[2]
+    assert words[3] == sample_words[3]
+    assert words.frequencies() == [1, 2, 3, None, None, None]
+
+def test_binary_vocab_reads_version_1(tmp_path):
+    records = bytearray()
+    pool = bytearray()
+    for word_info in sample_words[:2]:
+        word = word_info['word'].encode()
+        kana_reading = word_info['kana'].encode()
+        records += struct.pack(
+            '<IIHHB3x',
+            len(pool),
+            len(pool) + len(word),
+            len(word),
+            len(kana_reading),
+            vocab.WORD_TYPES.index(VerbType(word_info['type'])),
+        )
+        pool += word + kana_reading
+    vocab_path = tmp_path / 'vocab.bin'
+    vocab_path.write_bytes(
+        struct.pack('<4sHHII', vocab.MAGIC, 1, 16, 2, len(pool)) + records + pool
+    )
+    words = vocab.BinaryVocab(str(vocab_path))
+    assert list(words) == list(sample_words[:2])
+    assert words.frequencies() == [None, None]
+
+def test_binary_vocab_index_out_of_range(binary_vocab_path):
+    words = vocab.BinaryVocab(binary_vocab_path)
+    with pytest.raises(IndexError):
+        words[len(sample_words)]
+    with pytest.raises(IndexError):
+        words[-len(sample_words) - 1]
+
+def test_binary_vocab_slices_can_be_sent_to_other_processes(binary_vocab_path):
+    words = vocab.BinaryVocab(binary_vocab_path)
+    assert pickle.loads(pickle.dumps(words[:2])) == list(sample_words[:2])
+
+def test_binary_vocab_empty(tmp_path):
+    vocab_path = tmp_path / 'vocab.bin'
+    with open(vocab_path, 'wb') as vocab_file:
+        vocab.write_binary_vocab((), vocab_file)
+    assert list(vocab.load_vocab(str(vocab_path))) == []
+
+def test_binary_vocab_rejects_malformed_files(tmp_path, binary_vocab_path):
+    with open(binary_vocab_path, 'rb') as vocab_file:
+        contents = vocab_file.read()
+
+    malformed_path = tmp_path / 'malformed.bin'
+    for malformed in (b'', b'KAE', contents[:-1], b'XXXX' + contents[4:]):
+        malformed_path.write_bytes(malformed)
+        with pytest.raises(ValueError):
+            vocab.BinaryVocab(str(malformed_path))
+
+def test_write_binary_vocab_illegal_type_raises_value_error(tmp_path):
+    with open(tmp_path / 'vocab.bin', 'wb') as vocab_file:
+        with pytest.raises(ValueError):
+            vocab.write_binary_vocab(
+                ({'word': '本', 'kana': 'ほん', 'type': 'noun'},), vocab_file
+            )
+
+def test_load_vocab_json(tmp_path):
+    vocab_path = tmp_path / 'vocab.json'
+    vocab_path.write_text(json.dumps(sample_words, ensure_ascii=False))
+    assert vocab.load_vocab(str(vocab_path)) == list(sample_words)
+
+    vocab_path.write_text('{"word": "書く"}')
+    with pytest.raises(ValueError):
+        vocab.load_vocab(str(vocab_path))
+    vocab_path.write_text('[{"word": ')
+    with pytest.raises(ValueError):
+        vocab.load_vocab(str(vocab_path))
+
+@pytest.fixture
+def sqlite_vocab_path(tmp_path):
+    vocab_path = str(tmp_path / 'vocab.sqlite3')
+    vocab.write_sqlite_vocab(
+        ranked_words, vocab_path
+    )
+    return vocab_path
+
+def test_sqlite_vocab(sqlite_vocab_path):
+    words = vocab.load_vocab(sqlite_vocab_path)
+    assert isinstance(words, vocab.SQLiteVocab)
+    assert len(words) == len(ranked_words)
+    assert list(words) == list(ranked_words)
+    assert words[1] == words[-len(words) + 1] == ranked_words[1]
+    assert words[2:4] == list(ranked_words[2:4])
+    with pytest.raises(IndexError):
+        words[len(words)]
+    assert words.frequencies() == [1, 2, 3, 4, 5, 6]
+
+def test_sqlite_vocab_filters(sqlite_vocab_path):
+    words = vocab.SQLiteVocab(sqlite_vocab_path)
+    # in the order of the given types
+    assert list(words.filtered(['verb-godan', 'adjective-na'])) \
+        == [ranked_words[1], ranked_words[5]]
+    assert list(words.filtered(min_frequency=3, max_frequency=4)) \
+        == [ranked_words[2], ranked_words[3]]
+    assert list(words.filtered(['verb-godan'], min_frequency=3)) == []
+    assert list(words.filtered(['adjective-i', 'verb-godan'], max_frequency=4)) \
+        == [ranked_words[3], ranked_words[1]]
+
+def test_sqlite_vocab_index_of(sqlite_vocab_path):
+    words = vocab.SQLiteVocab(sqlite_vocab_path)
+    for index, word_info in enumerate(words):
+        assert words.index_of(
+            word_info['word'], word_info['kana'], word_info['type']
+        ) == index
+    # filtered out
+    godan = ranked_words[1]
+    filtered = words.filtered(['adjective-na', 'verb-godan'])
+    assert filtered.index_of(godan['word'], godan['kana'], godan['type']) == 1
+    filtered = words.filtered(['adjective-na'])
+    assert filtered.index_of(godan['word'], godan['kana'], godan['type']) is None
+    assert words.index_of(godan['word'], None, godan['type']) is None
+
+def test_sqlite_vocab_frequency_bands(tmp_path):
+    vocab_path = str(tmp_path / 'vocab.sqlite3')
+    vocab.write_sqlite_vocab(
+        [
+            {'word': f'{rank}書く', 'kana': None, 'type': 'verb-godan',
+             'frequency': rank}
+            for rank in range(1, 21)
+        ] + [
+            {'word': f'{rank}強い', 'kana': None, 'type': 'adjective-i',
+             'frequency': rank}
+            for rank in range(3, 31, 3)
+        ],
+        vocab_path,
+    )
+    for min_frequency in (None, 5):
+        words = vocab.SQLiteVocab(vocab_path, min_frequency=min_frequency)
+        ranks = words.frequencies()
+        assert [words.frequency(index) for index in range(len(words))] == ranks
+        covered = []
+        for first, last, lowest in words.frequency_bands():
+            band_ranks = ranks[first:last + 1]
+            # every rank in a band is in the same power of 2, from the lowest rank
+            assert len({rank.bit_length() for rank in band_ranks}) == 1
+            assert max(lowest, 1) == max(
+                2 ** (band_ranks[0].bit_length() - 1), min_frequency or 1
+            )
+            assert min(band_ranks) >= lowest
+            covered.extend(range(first, last + 1))
+        assert covered == list(range(len(words)))
+
+def test_sqlite_vocab_can_be_opened_on_another_thread(sqlite_vocab_path):
+    opened = []
+    thread = threading.Thread(
+        target=lambda: opened.append(vocab.SQLiteVocab(sqlite_vocab_path))
+    )
+    thread.start()
+    thread.join()
+    assert opened[0][0] == ranked_words[0]
+
+def test_sqlite_vocab_rejects_other_databases(tmp_path):
+    database_path = tmp_path / 'db.sqlite3'
+    sqlite3.connect(database_path).execute('CREATE TABLE User (id INTEGER)')
+    with pytest.raises(ValueError):
+        vocab.load_vocab(str(database_path))
+
+def test_write_sqlite_vocab_illegal_type_raises_value_error(tmp_path):
+    with pytest.raises(ValueError):
+        vocab.write_sqlite_vocab(
+            ({'word': '本', 'kana': 'ほん', 'type': 'noun', 'frequency': 1},),
+            str(tmp_path / 'vocab.sqlite3'),
+        )
+
+def test_vocab_word_from_dict():
+    vocab_word = vocab.VocabWord.from_dict(ranked_words[1])
+    assert vocab_word == vocab.VocabWord('書く', 'かく', VerbType.GODAN, 2)
+    assert vocab_word.to_dict() == ranked_words[1]
+    assert vocab.VocabWord.from_dict(sample_words[4]).to_dict() == sample_words[4]
+
+def test_vocab_word_from_dict_rejects_malformed_words():
+    for word_info in (
+        ['書く', 'かく', 'verb-godan'],
+        {'word': '書く', 'type': 'verb-godan'},
+        {'word': '', 'kana': None, 'type': 'verb-godan'},
+        {'word': '書く', 'kana': 1, 'type': 'verb-godan'},
+        {'word': '書く', 'kana': 'かく', 'type': 'verb-godan', 'frequency': '1'},
+    ):
+        with pytest.raises(ValueError, match='malformed'):
+            vocab.VocabWord.from_dict(word_info)
+
+def test_vocab_word_from_dict_illegal_type_raises_value_error():
+    for type_str in ('verb-yodan', 'noun', None):
+        with pytest.raises(ValueError, match='illegal type'):
+            vocab.VocabWord.from_dict({'word': '書く', 'kana': 'かく', 'type': type_str})
@@ -0,0 +1,527 @@
+"""Reading and writing vocab files, in JSON, in a compact binary format or in SQLite.
+
+The binary format is made to be memory-mapped: opening it costs the same whatever the
+vocab size, words are only decoded when accessed, and processes reading the same file
+share its pages. It consists of, in little-endian order:
+
+- a header: the magic bytes b'KAEV', the format version (u16), the size of a record
+  (u16), the number of words (u32) and the size of the string pool (u32);
+- a record per word: the offset and length of the word and of its kana reading in the
+  string pool (u32, u32, u16, u16; a kana reading of length 0 is null), its type (u8,
+  an index into WORD_TYPES), 3 bytes of padding, and its frequency rank (u32; 0 if
+  unknown). Version 1 records stop before the frequency rank;
+- the string pool: every word and kana reading, encoded in UTF-8.
+
+SQLite vocab files also keep the frequency rank of each word, so that the quizzers can
+ask only words of some types or in some frequency band. Their words are sorted by type
+then frequency (see dbapi.insert_vocab_words()), so the words matching such a filter
+have consecutive ids, and a random one can be fetched through the primary key without
+ever reading the others.
+"""
+
+from bisect import bisect_right
+from collections.abc import Iterable, Iterator, Sequence
+import json
+import mmap
+import sqlite3
+import struct
+import sys
+import threading
+from typing import Any, BinaryIO, overload
+
+import dbapi
+from inflection import AdjectiveType, VerbType
+
+
+MAGIC = b'KAEV'
+SQLITE_MAGIC = b'SQLite format 3\x00'
+VERSION = 2
+
+# types are stored by index; new ones must only ever be appended
+WORD_TYPES: tuple[VerbType | AdjectiveType, ...] = (
+    VerbType.ICHIDAN,
+    VerbType.GODAN,
+    VerbType.ICHIDAN_IRREGULAR,
+    AdjectiveType.I,
+    AdjectiveType.I_YOI_II,
+    AdjectiveType.NA,
+)
+_TYPE_CODES = {word_type.value: code for code, word_type in enumerate(WORD_TYPES)}
+_TYPES_BY_VALUE = {word_type.value: word_type for word_type in WORD_TYPES}
+
+_HEADER = struct.Struct('<4sHHII')
+_RECORD = struct.Struct('<IIHHB3xI')
+_RECORDS_BY_VERSION = {1: struct.Struct('<IIHHB3x'), VERSION: _RECORD}
+
+
+class VocabWord:
+    """A word of a vocab, checked and with its type resolved, as the quizzers use it.
+
+    Records are much smaller than word dicts, and reading their fields doesn't hash
+    any key.
+    """
+    __slots__ = ('word', 'kana', 'type', 'frequency')
+
+    word: str
+    """The word, as written in the vocab."""
+    kana: str | None
+    """Its kana reading, or None if it's written in kana only."""
+    type: VerbType | AdjectiveType
+    """Its type."""
+    frequency: int | None
+    """Its frequency rank, 1 being the most frequent word, or None if unknown."""
+
+    def __init__(
+        self,
+        word: str,
+        kana: str | None,
+        type: VerbType | AdjectiveType,
+        frequency: int | None = None,
+    ):
+        self.word = word
+        self.kana = kana
+        self.type = type
+        self.frequency = frequency
+
+    @classmethod
+    def from_dict(cls, word_info: Any) -> 'VocabWord':
+        """Return the record of the given word dict, like the ones in a JSON vocab
+        file.
+
+        Raise ValueError if it's malformed or of an illegal type.
+        """
+        try:
+            word = word_info['word']
+            kana_reading = word_info['kana']
+            type_str = word_info['type']
+            frequency = word_info.get('frequency')
+        except (KeyError, TypeError, AttributeError):
+            raise ValueError(f'malformed word {word_info!r}') from None
+        if not isinstance(word, str) or not word \
+                or not isinstance(kana_reading, str | None) \
+                or not isinstance(frequency, int | None):
+            raise ValueError(f'malformed word {word_info!r}')
+        try:
+            word_type = _TYPES_BY_VALUE[type_str]
+        except (KeyError, TypeError):
+            raise ValueError(f'word {word} of illegal type "{type_str}"') from None
+        return cls(word, kana_reading, word_type, frequency)
+
+    def to_dict(self) -> dict[str, Any]:
+        """Return the word as a dict like the ones in a JSON vocab file."""
+        word_info = {'word': self.word, 'kana': self.kana, 'type': self.type.value}
+        if self.frequency is not None:
+            word_info['frequency'] = self.frequency
+        return word_info
+
+    def __eq__(self, other: object) -> bool:
+        if not isinstance(other, VocabWord):
+            return NotImplemented
+        return (self.word, self.kana, self.type, self.frequency) \
+            == (other.word, other.kana, other.type, other.frequency)
+
+    def __repr__(self) -> str:
+        return (
+            f'VocabWord({self.word!r}, {self.kana!r}, {self.type}, {self.frequency!r})'
+        )
+
+
+def write_binary_vocab(words: Sequence[dict[str, Any]], output_file: BinaryIO) -> None:
+    """Write the given words, with their 'frequency' if they have one, to the given
+    file in the binary vocab format.
+
+    Raise ValueError if any of the words has an illegal type.
+    """
+    pool = bytearray()
+    records = bytearray()
+    for word_info in words:
+        word = word_info['word'].encode()
+        kana_reading = (word_info['kana'] or '').encode()
+        try:
+            type_code = _TYPE_CODES[word_info['type']]
+        except KeyError:
+            raise ValueError(
+                f'word {word_info["word"]} of illegal type "{word_info["type"]}"'
+            ) from None
+        records += _RECORD.pack(
+            len(pool),
+            len(pool) + len(word),
+            len(word),
+            len(kana_reading),
+            type_code,
+            word_info.get('frequency') or 0,
+        )
+        pool += word
+        pool += kana_reading
+
+    output_file.write(
+        _HEADER.pack(MAGIC, VERSION, _RECORD.size, len(words), len(pool))
+    )
+    output_file.write(records)
+    output_file.write(pool)
+
+
+class BinaryVocab(Sequence[dict[str, Any]]):
+    """A memory-mapped vocab file in the binary format, read as a sequence of word
+    dicts like the ones in a JSON vocab file. Each word is decoded when it's accessed.
+    """
+    _mmap: mmap.mmap
+    """The whole file."""
+    _record: struct.Struct
+    """The layout of the records in the file's format version."""
+    _count: int
+    """The number of words."""
+    _pool_start: int
+    """Where the string pool starts in the file."""
+
+    def __init__(self, file_path: str):
+        """Map the vocab file at the given path.
+
+        Raise ValueError if it's not a binary vocab file, or it's malformed.
+        """
+        with open(file_path, 'rb') as vocab_file:
+            try:
+                self._mmap = mmap.mmap(vocab_file.fileno(), 0, access=mmap.ACCESS_READ)
+            except ValueError:
+                raise ValueError(f'"{file_path}" is empty') from None
+
+        try:
+            magic, version, record_size, count, pool_size = _HEADER.unpack_from(
+                self._mmap
+            )
+        except struct.error:
+            magic = None
+        if magic != MAGIC:
+            self._mmap.close()
+            raise ValueError(f'"{file_path}" is not a binary vocab file')
+        record = _RECORDS_BY_VERSION.get(version)
+        if record is None or record_size != record.size:
+            self._mmap.close()
+            raise ValueError(
+                f'"{file_path}" is in an unsupported format version ({version})'
+            )
+        self._record = record
+        self._count = count
+        self._pool_start = _HEADER.size + count*record.size
+        if len(self._mmap) != self._pool_start + pool_size:
+            self._mmap.close()
+            raise ValueError(f'"{file_path}" is truncated')
+
+    def _decode(self, index: int) -> dict[str, Any]:
+        """Return the word at the given index, which must be in range."""
+        record_start = _HEADER.size + index*self._record.size
+        word_offset, kana_offset, word_length, kana_length, type_code, *frequency = (
+            self._record.unpack_from(self._mmap, record_start)
+        )
+        word_start = self._pool_start + word_offset
+        kana_start = self._pool_start + kana_offset
+        word_info = {
+            'word': self._mmap[word_start:word_start + word_length].decode(),
+            'kana': (
+                self._mmap[kana_start:kana_start + kana_length].decode()
+                if kana_length else None
+            ),
+            'type': WORD_TYPES[type_code].value,
+        }
+        if frequency and frequency[0]:
+            word_info['frequency'] = frequency[0]
+        return word_info
+
+    def __len__(self) -> int:
+        return self._count
+
+    @overload
+    def __getitem__(self, index: int) -> dict[str, Any]: ...
+    @overload
+    def __getitem__(self, index: slice) -> list[dict[str, Any]]: ...
+
+    def __getitem__(
+        self, index: int | slice
+    ) -> dict[str, Any] | list[dict[str, Any]]:
+        """Return the word at the given index, or a list of the words in the given
+        slice.
+        """
+        if isinstance(index, slice):
+            return [self._decode(i) for i in range(*index.indices(self._count))]
+        if index < 0:
+            index += self._count
+        if not 0 <= index < self._count:
+            raise IndexError('vocab index out of range')
+        return self._decode(index)
+
+    def __iter__(self) -> Iterator[dict[str, Any]]:
+        for index in range(self._count):
+            yield self._decode(index)
+
+    def frequencies(self) -> list[int | None]:
+        """Return the frequency rank of every word, or None for the ones without one,
+        without decoding them.
+        """
+        if self._record is not _RECORD:
+            return [None] * self._count
+        records = memoryview(self._mmap)[_HEADER.size:self._pool_start]
+        try:
+            return [
+                fields[-1] or None for fields in _RECORD.iter_unpack(records)
+            ]
+        finally:
+            records.release()
+
+    def close(self) -> None:
+        """Unmap the file."""
+        self._mmap.close()
+
+
+def write_sqlite_vocab(words: Iterable[dict[str, Any]], file_path: str) -> None:
+    """Write the given words, with their 'frequency', to the SQLite vocab file at the
+    given path, replacing the words already in it.
+
+    Raise ValueError if any of the words has an illegal type.
+    """
+    rows = []
+    for word_info in words:
+        if word_info['type'] not in _TYPE_CODES:
+            raise ValueError(
+                f'word {word_info["word"]} of illegal type "{word_info["type"]}"'
+            )
+        rows.append((
+            word_info['word'],
+            word_info['kana'],
+            word_info['type'],
+            word_info['frequency'],
+        ))
+
+    connection = sqlite3.connect(file_path)
+    try:
+        dbapi.create_vocab_table_if_nexists(connection)
+        dbapi.insert_vocab_words(connection, rows)
+    finally:
+        connection.close()
+
+
+class SQLiteVocab(Sequence[dict[str, Any]]):
+    """The words of a SQLite vocab file matching some types and a frequency band, read
+    as a sequence of word dicts like the ones in a JSON vocab file. Each word is
+    fetched by its id when it's accessed.
+    """
+    _file_path: str
+    """The path to the vocab file."""
+    _connection: sqlite3.Connection
+    """The read-only connection to the vocab file."""
+    _lock: threading.Lock
+    """Guards the connection, which the quiz reads from several threads (see
+    kaeru.Kaeru)."""
+    _id_ranges: list[tuple[int, int]]
+    """The first and last ids of the matching words of each type."""
+    _range_types: list[str]
+    """The type of the words of each id range."""
+    _frequency_bounds: tuple[int, int]
+    """The lowest and highest frequency ranks of the matching words."""
+    _range_starts: list[int]
+    """The index of the first word of each id range."""
+    _count: int
+    """The number of matching words."""
+
+    def __init__(
+        self,
+        file_path: str,
+        word_types: Iterable[str] | None = None,
+        min_frequency: int | None = None,
+        max_frequency: int | None = None,
+    ):
+        """Open the vocab file at the given path, keeping only the words of the given
+        types (every type if None) whose frequency rank is within the given bounds.
+
+        Raise ValueError if it's not a SQLite vocab file.
+        """
+        # only needed here, and slow to import
+        import pathlib
+
+        self._file_path = file_path
+        # the vocab may be opened on a worker thread and read on others (see
+        # kaeru.VocabLoader)
+        self._lock = threading.Lock()
+        self._connection = sqlite3.connect(
+            pathlib.Path(file_path).absolute().as_uri() + '?mode=ro',
+            uri=True,
+            check_same_thread=False,
+        )
+        self._frequency_bounds = (
+            min_frequency if min_frequency is not None else -sys.maxsize,
+            max_frequency if max_frequency is not None else sys.maxsize,
+        )
+        try:
+            if word_types is None:
+                word_types = [word_type.value for word_type in WORD_TYPES]
+            self._id_ranges = []
+            self._range_types = []
+            for word_type in word_types:
+                id_range = dbapi.get_vocab_id_range(
+                    self._connection, word_type, *self._frequency_bounds
+                )
+                if id_range:
+                    self._id_ranges.append(id_range)
+                    self._range_types.append(word_type)
+        except sqlite3.DatabaseError:
+            self._connection.close()
+            raise ValueError(f'"{file_path}" is not a SQLite vocab file') from None
+
+        self._range_starts = []
+        self._count = 0
+        for first_id, last_id in self._id_ranges:
+            self._range_starts.append(self._count)
+            self._count += last_id - first_id + 1
+
+    def _word_id(self, index: int) -> int:
+        """Return the id of the word at the given index, which must be in range."""
+        range_index = bisect_right(self._range_starts, index) - 1
+        first_id, _ = self._id_ranges[range_index]
+        return first_id + index - self._range_starts[range_index]
+
+    def _fetch(self, index: int) -> dict[str, Any]:
+        """Return the word at the given index, which must be in range."""
+        with self._lock:
+            word, kana_reading, word_type, frequency = dbapi.get_vocab_word(
+                self._connection, self._word_id(index)
+            )
+        return {
+            'word': word,
+            'kana': kana_reading,
+            'type': word_type,
+            'frequency': frequency,
+        }
+
+    def __len__(self) -> int:
+        return self._count
+
+    @overload
+    def __getitem__(self, index: int) -> dict[str, Any]: ...
+    @overload
+    def __getitem__(self, index: slice) -> list[dict[str, Any]]: ...
+
+    def __getitem__(
+        self, index: int | slice
+    ) -> dict[str, Any] | list[dict[str, Any]]:
+        """Return the word at the given index, or a list of the words in the given
+        slice.
+        """
+        if isinstance(index, slice):
+            return [self._fetch(i) for i in range(*index.indices(self._count))]
+        if index < 0:
+            index += self._count
+        if not 0 <= index < self._count:
+            raise IndexError('vocab index out of range')
+        return self._fetch(index)
+
+    def __iter__(self) -> Iterator[dict[str, Any]]:
+        for index in range(self._count):
+            yield self._fetch(index)
+
+    def index_of(self, word: str, kana: str | None, type_str: str) -> int | None:
+        """Return the index of the word with the given spelling, kana reading and type,
+        or None if it's not one of the matching words.
+        """
+        with self._lock:
+            word_ids = dbapi.get_vocab_ids(self._connection, word, kana, type_str)
+        for word_id in word_ids:
+            for (first_id, last_id), range_start in zip(
+                self._id_ranges, self._range_starts
+            ):
+                if first_id <= word_id <= last_id:
+                    return range_start + word_id - first_id
+        return None
+
+    def frequencies(self) -> list[int | None]:
+        """Return the frequency rank of every word, without fetching them."""
+        return [
+            frequency
+            for first_id, last_id in self._id_ranges
+            for frequency in dbapi.get_vocab_frequencies(
+                self._connection, first_id, last_id
+            )
+        ]
+
+    def frequency(self, index: int) -> int:
+        """Return the frequency rank of the word at the given index, which must be in
+        range, without fetching it.
+        """
+        with self._lock:
+            return dbapi.get_vocab_frequency(self._connection, self._word_id(index))
+
+    def frequency_bands(self) -> list[tuple[int, int, int]]:
+        """Return the first and last indices and the lowest frequency rank allowed of
+        the words of each type in each band of ranks from 2^k to 2^(k+1) - 1 (up to 1
+        for the first band), looked up through the (type, frequency) index rather than
+        by reading every rank.
+
+        Words are sorted by frequency within a type, so each band is a run of indices.
+        """
+        min_frequency, max_frequency = self._frequency_bounds
+        bands = []
+        for word_type, (first_id, last_id), range_start in zip(
+            self._range_types, self._id_ranges, self._range_starts
+        ):
+            highest = dbapi.get_vocab_frequency(self._connection, last_id)
+            band_low, band_high = min_frequency, 1
+            while band_low <= highest:
+                lowest = max(band_low, min_frequency)
+                id_range = dbapi.get_vocab_id_range(
+                    self._connection,
+                    word_type,
+                    lowest,
+                    min(band_high, max_frequency),
+                )
+                if id_range:
+                    bands.append((
+                        range_start + id_range[0] - first_id,
+                        range_start + id_range[1] - first_id,
+                        lowest,
+                    ))
+                band_low, band_high = band_high + 1, band_high * 2 + 1
+        return bands
+
+    def filtered(
+        self,
+        word_types: Iterable[str] | None = None,
+        min_frequency: int | None = None,
+        max_frequency: int | None = None,
+    ) -> 'SQLiteVocab':
+        """Return the words of the same file of the given types (every type if None)
+        whose frequency rank is within the given bounds.
+        """
+        return SQLiteVocab(self._file_path, word_types, min_frequency, max_frequency)
+
+    def close(self) -> None:
+        """Close the connection to the file."""
+        self._connection.close()
+
+
+def is_binary_vocab(file_path: str) -> bool:
+    """Return whether the file at the given path starts like a binary vocab file."""
+    with open(file_path, 'rb') as vocab_file:
+        return vocab_file.read(len(MAGIC)) == MAGIC
+
+
+def is_sqlite_vocab(file_path: str) -> bool:
+    """Return whether the file at the given path starts like a SQLite database."""
+    with open(file_path, 'rb') as vocab_file:
+        return vocab_file.read(len(SQLITE_MAGIC)) == SQLITE_MAGIC
+
+
+def load_vocab(file_path: str) -> Sequence[dict[str, Any]]:
+    """Return the words in the vocab file at the given path, in any format.
+
+    Binary vocab files are memory-mapped rather than read, and the words in SQLite
+    vocab files are only fetched when accessed.
+
+    Raise ValueError if the file is malformed, and OSError if it can't be read.
+    """
+    if is_binary_vocab(file_path):
+        return BinaryVocab(file_path)
+    if is_sqlite_vocab(file_path):
+        return SQLiteVocab(file_path)
+    with open(file_path) as vocab_file:
+        words = json.load(vocab_file)
+    if not isinstance(words, list):
+        raise ValueError(f'"{file_path}" is not a list of words')
+    return words